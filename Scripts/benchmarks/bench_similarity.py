@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-Benchmark für die Ähnlichkeitsberechnung in semantic_segmentation.py.
+
+Misst die Kosten pro verglichenem Absatzpaar (benachbarte Absätze, einzeln aufgerufen wie in
+detect_logical_segments) für:
+  - die vorherige Version, die Konzeptkategorien und Projektion bei jedem Aufruf neu aufbaut
+  - calculate_semantic_similarities mit der beim Import vorberechneten Projektion
+  - calculate_semantic_similarities mit bereits berechneten Kategoriesummen
+
+Ohne --input werden reproduzierbare synthetische Absätze aus dem Schlüsselwortvokabular erzeugt.
+
+Aufruf:
+    python Scripts/benchmarks/bench_similarity.py [--input korpus.jsonl] [--paragraphs 400] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jsonl_io import JsonArrayReader, JsonlReader, split_compression_suffix
+from legal_patterns import PARAGRAPH_SPLIT_PATTERN
+from semantic_segmentation import (CONCEPT_CATEGORIES, FEATURE_DTYPE, SEMANTIC_KEYWORDS, SEMANTIC_VOCABULARY,
+                                   calculate_category_sums, calculate_semantic_similarities,
+                                   get_semantic_feature_matrix)
+
+def previous_calculate_semantic_similarities(matrix1, matrix2):
+    """Stand vor dem Vorberechnen der Projektion: Kategorien und Projektion werden bei jedem Aufruf aufgebaut."""
+    matrix1 = np.atleast_2d(matrix1)
+    matrix2 = np.atleast_2d(matrix2)
+    concept_categories = {category: list(terms) for category, terms in CONCEPT_CATEGORIES.items()}
+    term_to_category = {}
+    for category_index, terms in enumerate(concept_categories.values()):
+        for term in terms:
+            term_to_category[term] = category_index
+    other_index = len(concept_categories)
+    category_of_term = np.array([term_to_category.get(term, other_index) for term in SEMANTIC_VOCABULARY])
+    projection = np.zeros((len(SEMANTIC_VOCABULARY), other_index + 1), dtype=FEATURE_DTYPE)
+    projection[np.arange(len(SEMANTIC_VOCABULARY)), category_of_term] = 1.0
+
+    categories1 = matrix1 @ projection
+    categories2 = matrix2 @ projection
+    category_min_sum = np.minimum(categories1, categories2).sum(axis=1)
+    category_total_sum = categories1.sum(axis=1) + categories2.sum(axis=1)
+    term_min_sum = np.minimum(matrix1, matrix2).sum(axis=1)
+    term_total_sum = matrix1.sum(axis=1) + matrix2.sum(axis=1)
+    valid = (category_total_sum > 0) & (term_total_sum > 0)
+    similarities = np.zeros(len(valid), dtype=FEATURE_DTYPE)
+    category_similarity = (2 * category_min_sum[valid]) / category_total_sum[valid]
+    term_similarity = (2 * term_min_sum[valid]) / term_total_sum[valid]
+    similarities[valid] = (0.7 * term_similarity) + (0.3 * category_similarity)
+    return similarities
+
+def synthetic_paragraphs(count, seed=0):
+    """Erzeugt count Absätze aus Schlüsselwörtern und Füllwörtern."""
+    rng = random.Random(seed)
+    keywords = list(SEMANTIC_KEYWORDS)
+    filler = ['der', 'die', 'das', 'und', 'ist', 'nach', 'gemäß', '§ 433 BGB', 'Art. 21 EuErbVO', 'nicht', 'hier']
+    paragraphs = []
+    for _ in range(count):
+        words = [rng.choice(keywords) if rng.random() < 0.3 else rng.choice(filler) for _ in range(rng.randint(30, 150))]
+        paragraphs.append(' '.join(words).capitalize() + '.')
+    return paragraphs
+
+def corpus_paragraphs(input_path, count):
+    """Liest die ersten count Absätze aus den Texten einer JSON-/JSONL-Datei."""
+    base, _ = split_compression_suffix(input_path)
+    reader = JsonlReader(input_path) if base.lower().endswith('.jsonl') else JsonArrayReader(input_path)
+    paragraphs = []
+    for item in reader:
+        text = item.get('text', '') if isinstance(item, dict) else ''
+        paragraphs.extend(p.strip() for p in PARAGRAPH_SPLIT_PATTERN.split(text) if p.strip())
+        if len(paragraphs) >= count:
+            break
+    return paragraphs[:count]
+
+def per_pair_cost(compare, pairs, repeat):
+    """Beste Zeit aus repeat Durchläufen in Mikrosekunden pro Paar."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in pairs:
+            compare(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pairs) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-Benchmark der semantischen Ähnlichkeit pro Absatzpaar')
+    parser.add_argument('--input', help='Optionale JSON-/JSONL-Datei mit Gutachten (Feld "text")')
+    parser.add_argument('--paragraphs', type=int, default=400, help='Anzahl der Absätze (default: 400)')
+    parser.add_argument('--repeat', type=int, default=3, help='Anzahl der Wiederholungen, gemessen wird die beste (default: 3)')
+    args = parser.parse_args()
+
+    paragraphs = corpus_paragraphs(args.input, args.paragraphs) if args.input else synthetic_paragraphs(args.paragraphs)
+    if len(paragraphs) < 2:
+        print("Fehler: Es werden mindestens zwei Absätze benötigt.")
+        return 1
+    matrix = get_semantic_feature_matrix(paragraphs)
+    categories = calculate_category_sums(matrix)
+    rows = range(len(paragraphs) - 1)
+
+    # Alle Varianten müssen dieselben Ähnlichkeiten liefern
+    expected = previous_calculate_semantic_similarities(matrix[:-1], matrix[1:])
+    if not (np.allclose(expected, calculate_semantic_similarities(matrix[:-1], matrix[1:]))
+            and np.allclose(expected, calculate_semantic_similarities(matrix[:-1], matrix[1:], categories[:-1], categories[1:]))):
+        print("Fehler: Die Varianten liefern unterschiedliche Ähnlichkeiten.")
+        return 1
+
+    variants = (
+        ("vorherige Version (Projektion pro Aufruf)", previous_calculate_semantic_similarities,
+         [(matrix[i], matrix[i + 1]) for i in rows]),
+        ("Projektion vorberechnet", calculate_semantic_similarities,
+         [(matrix[i], matrix[i + 1]) for i in rows]),
+        ("mit vorberechneten Kategoriesummen", calculate_semantic_similarities,
+         [(matrix[i], matrix[i + 1], categories[i], categories[i + 1]) for i in rows]),
+    )
+    source = args.input or "synthetisch"
+    print(f"{len(paragraphs)} Absätze ({source}), {len(rows)} Paare, beste von {args.repeat} Wiederholungen")
+    for label, compare, pairs in variants:
+        print(f"  {label:<45} {per_pair_cost(compare, pairs, args.repeat):7.1f} us/Paar")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
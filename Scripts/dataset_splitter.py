@@ -6,16 +6,31 @@ Teilt den Datensatz in supervised und unsupervised learning datasets auf.
 
 Supervised: Rechtsbezug + Normen + nur Abschnitt I + II
 Unsupervised: Komplette Texte
+
+Die Eingabe wird gestreamt gelesen: Jedes Dokument wird beim Lesen über einen mit --seed
+verknüpften Hash seines Textes einer Seite zugeordnet, sein fertiger Eintrag in eine
+Auslagerungsdatei geschrieben. Im Speicher bleiben je Dokument nur Rechtsgebiet, Tokenanzahl und
+Hash-Priorität; daraus wird am Ende je Ausgabedatei eine Auswahl in Reihenfolge der Hash-Priorität
+bestimmt, die die Anteile der Rechtsgebiete beibehält (token_packing.pack_items_stratified).
+Die Rechtsgebiete bestimmt domain_classifier.DomainClassifier blockweise.
 """
 
-import json
 import argparse
+import hashlib
+import json
 import re
 from pathlib import Path
-from collections import defaultdict, Counter
-import random
-import math
-from typing import List, Dict, Tuple, Any
+from collections import Counter
+from array import array
+from itertools import islice
+from typing import List, Dict, Tuple, Any, Optional, Iterable, Iterator
+
+from domain_classifier import DEFAULT_LEGAL_DOMAIN, LEGAL_DOMAINS, DomainClassifier
+from token_packing import pack_items_stratified
+from section_outline import RomanOutline
+from jsonl_io import (JsonArrayError, JsonArrayReader, JsonlReader, JsonlSpillFile, check_compression_support,
+                      dumps_json_line, split_compression_suffix)
+from token_counter import TOKEN_COUNTER_CHOICES, TokenCounter, create_token_counter
 
 def estimate_tokens(text: str) -> int:
     """
@@ -43,50 +58,29 @@ def extract_legal_references(text: str) -> List[str]:
     
     return list(set(references))  # Duplikate entfernen
 
+# Rechtsgebiets-Klassifikator (alle Schlüsselwörter einmalig vorbereitet)
+_DOMAIN_CLASSIFIER = DomainClassifier(LEGAL_DOMAINS, DEFAULT_LEGAL_DOMAIN)
+
+# Anzahl der Dokumente, deren Rechtsgebiete beim Streamen gemeinsam klassifiziert werden
+CLASSIFY_BATCH_SIZE = 256
+
 def extract_legal_domain(text: str) -> str:
     """
     Bestimmt das Rechtsgebiet basierend auf Schlüsselwörtern im Text.
     """
-    domains = {
-        'Erbrecht': ['Nachlass', 'Erbe', 'Erbschaft', 'Testament', 'ENZ', 'Erbschein', 'Erblasser'],
-        'Zivilrecht': ['BGB', 'Vertrag', 'Schadensersatz', 'Anspruch', 'Klage'],
-        'Arbeitsrecht': ['Arbeitgeber', 'Arbeitnehmer', 'Kündigung', 'Arbeitsvertrag'],
-        'Familienrecht': ['Ehe', 'Scheidung', 'Unterhalt', 'Sorgerecht', 'FamFG'],
-        'Handelsrecht': ['HGB', 'Gesellschaft', 'Kaufmann', 'Handelsregister'],
-        'Verwaltungsrecht': ['Verwaltungsakt', 'Behörde', 'VwGO', 'Widerspruch'],
-        'Europarecht': ['EuGH', 'EU-Recht', 'Richtlinie', 'Verordnung', 'EuErbVO'],
-        'Prozessrecht': ['ZPO', 'Verfahren', 'Gericht', 'Urteil', 'Beschluss']
-    }
-    
-    text_lower = text.lower()
-    domain_scores = {}
-    
-    for domain, keywords in domains.items():
-        score = sum(text_lower.count(keyword.lower()) for keyword in keywords)
-        if score > 0:
-            domain_scores[domain] = score
-    
-    if domain_scores:
-        return max(domain_scores, key=domain_scores.get)
-    return 'Allgemeines Recht'
+    return _DOMAIN_CLASSIFIER.classify(text)
 
-def extract_roman_sections(text: str) -> Tuple[str, str]:
+def extract_roman_sections(text: str, outline: Optional[RomanOutline] = None) -> Tuple[str, str]:
     """
     Extrahiert nur die Abschnitte I. und II. aus dem Text.
+
+    Die Abschnitte werden über die oberste römische Gliederungsebene (RomanOutline) bestimmt;
+    ein bereits erstellter Index kann als outline übergeben werden.
     """
-    # Einfachere Pattern für römische Ziffern
-    # Suche nach "I. " gefolgt von Text bis zu "II. "
-    pattern_i = r'I\.\s+(.*?)(?=\s+II\.|$)'
-    # Suche nach "II. " gefolgt von Text bis zu "III. " oder Ende
-    pattern_ii = r'II\.\s+(.*?)(?=\s+III\.|$)'
-    
-    # Suche Abschnitt I
-    match_i = re.search(pattern_i, text, re.DOTALL)
-    section_i = match_i.group(1).strip() if match_i else ""
-    
-    # Suche Abschnitt II  
-    match_ii = re.search(pattern_ii, text, re.DOTALL)
-    section_ii = match_ii.group(1).strip() if match_ii else ""
+    if outline is None:
+        outline = RomanOutline(text)
+    section_i = outline.section(1)
+    section_ii = outline.section(2)
     
     # Füge Überschriften hinzu wenn Inhalt gefunden
     if section_i:
@@ -96,14 +90,26 @@ def extract_roman_sections(text: str) -> Tuple[str, str]:
     
     return section_i, section_ii
 
-def create_supervised_entry(text_data: Dict[str, Any]) -> Dict[str, Any]:
+def count_tokens(text: str, token_counter: Optional[TokenCounter] = None) -> int:
+    """
+    Zählt die Tokens eines Textes mit dem angegebenen Token-Zähler oder schätzt sie mit estimate_tokens.
+    """
+    if token_counter is None:
+        return estimate_tokens(text)
+    return token_counter.count(text)
+
+def create_supervised_entry(text_data: Dict[str, Any], token_counter: Optional[TokenCounter] = None,
+                            legal_domain: Optional[str] = None) -> Dict[str, Any]:
     """
     Erstellt einen Eintrag für supervised learning.
+
+    Ein bereits (z.B. mit classify_batch) bestimmtes Rechtsgebiet kann als legal_domain übergeben werden.
     """
     text = text_data['text']
     
     # Rechtsbezug extrahieren
-    legal_domain = extract_legal_domain(text)
+    if legal_domain is None:
+        legal_domain = extract_legal_domain(text)
     
     # Normen extrahieren
     legal_references = extract_legal_references(text)
@@ -118,10 +124,10 @@ def create_supervised_entry(text_data: Dict[str, Any]) -> Dict[str, Any]:
         'abschnitt_ii': section_ii,
         'original_length': len(text),
         'processed_length': len(section_i) + len(section_ii),
-        'token_count': estimate_tokens(section_i + " " + section_ii)
+        'token_count': count_tokens(section_i + " " + section_ii, token_counter)
     }
 
-def create_unsupervised_entry(text_data: Dict[str, Any]) -> Dict[str, Any]:
+def create_unsupervised_entry(text_data: Dict[str, Any], token_counter: Optional[TokenCounter] = None) -> Dict[str, Any]:
     """
     Erstellt einen Eintrag für unsupervised learning.
     """
@@ -129,174 +135,228 @@ def create_unsupervised_entry(text_data: Dict[str, Any]) -> Dict[str, Any]:
     
     return {
         'text': text,
-        'token_count': estimate_tokens(text)
+        'token_count': count_tokens(text, token_counter)
     }
 
-def split_by_legal_domain(data: List[Dict], test_ratio: float = 0.5) -> Tuple[List[Dict], List[Dict]]:
+def iter_documents(input_path: Path) -> Iterator[Dict]:
     """
-    Teilt den Datensatz nach Rechtsgebieten gleichmäßig auf.
+    Liest die Dokumente einer JSON-Datei (Array) oder JSONL-Datei (auch .gz/.zst) nacheinander ein.
     """
-    # Gruppiere nach Rechtsgebieten
-    domains = defaultdict(list)
-    
-    for item in data:
-        domain = extract_legal_domain(item['text'])
-        domains[domain].append(item)
-    
-    supervised_data = []
-    unsupervised_data = []
-    
-    # Für jedes Rechtsgebiet gleichmäßig aufteilen
-    for domain, items in domains.items():
-        random.shuffle(items)  # Zufällige Reihenfolge
-        
-        split_point = int(len(items) * test_ratio)
-        supervised_data.extend(items[:split_point])
-        unsupervised_data.extend(items[split_point:])
-    
-    return supervised_data, unsupervised_data
+    input_base, _ = split_compression_suffix(str(input_path))
+    if Path(input_base).suffix.lower() == '.jsonl':
+        return iter(JsonlReader(str(input_path)))
+    return iter(JsonArrayReader(str(input_path)))
 
-def write_supervised_jsonl_with_token_limit(data: List[Dict], output_path: Path, token_limit: int):
+def document_hash(text: str, seed: int) -> Tuple[float, float]:
     """
-    Schreibt supervised JSONL-Datei mit Token-Limit.
+    Bestimmt aus dem Text eines Dokuments und dem Seed zwei deterministische Zufallszahlen.
+
+    Returns:
+        (Wert für die Zuordnung zu supervised/unsupervised, Priorität bei gleicher Tokenanzahl),
+        beide gleichverteilt in [0, 1)
     """
-    current_tokens = 0
-    written_entries = 0
-    
-    print(f"\nSchreibe supervised Datei: {output_path}")
-    print(f"Token-Limit: {token_limit:,}")
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for item in data:
-            entry = create_supervised_entry(item)
-            entry_tokens = entry['token_count']
-            
-            # Prüfe Token-Limit nur für supervised
-            if current_tokens + entry_tokens > token_limit and written_entries > 0:
-                print(f"Token-Limit erreicht bei {current_tokens:,} Tokens")
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16, key=str(seed).encode('ascii')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2**64, int.from_bytes(digest[8:], 'big') / 2**64
+
+class SplitPart:
+    """
+    Dokumente einer Seite der Aufteilung (supervised oder unsupervised).
+
+    Die fertigen Einträge liegen als JSONL-Zeilen in einer Auslagerungsdatei; im Speicher bleiben
+    je Zeile nur Rechtsgebiet (Index in domain_names), Tokenanzahl und Hash-Priorität.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.spill = JsonlSpillFile(directory, prefix='.split-')
+        self.domain_codes = array('B')
+        self.tokens = array('q')
+        self.priorities = array('d')
+        self.domain_counts = Counter()
+
+    def __len__(self):
+        return len(self.domain_codes)
+
+    def add(self, entry: Dict[str, Any], domain_code: int, priority: float):
+        self.spill.append(dumps_json_line(entry))
+        self.domain_codes.append(domain_code)
+        self.tokens.append(entry['token_count'])
+        self.priorities.append(priority)
+        self.domain_counts[_DOMAIN_CLASSIFIER.domain_names[domain_code]] += 1
+
+    def discard(self):
+        self.spill.discard()
+
+def stream_split(documents: Iterable[Dict], split_ratio: float, seed: int,
+                 token_counter: Optional[TokenCounter] = None,
+                 spill_directory: Optional[Path] = None) -> Tuple[SplitPart, SplitPart, Counter]:
+    """
+    Teilt die Dokumente in einem Durchlauf auf supervised und unsupervised learning auf.
+
+    Jedes Dokument wird beim Lesen über document_hash zugeordnet, die Aufteilung ist damit
+    unabhängig von Reihenfolge und Umfang des Korpus reproduzierbar. Die Rechtsgebiete werden
+    blockweise mit classify_batch bestimmt.
+
+    Returns:
+        (supervised, unsupervised, Anzahl der Dokumente je Rechtsgebiet)
+    """
+    supervised = SplitPart(spill_directory)
+    unsupervised = SplitPart(spill_directory)
+    domain_counts = Counter()
+    try:
+        documents = iter(documents)
+        while True:
+            batch = list(islice(documents, CLASSIFY_BATCH_SIZE))
+            if not batch:
                 break
-            
-            # Schreibe Eintrag
-            json.dump(entry, f, ensure_ascii=False)
-            f.write('\n')
-            
-            current_tokens += entry_tokens
-            written_entries += 1
-            
-            if written_entries % 100 == 0:
-                print(f"  Geschrieben: {written_entries} Einträge, {current_tokens:,} Tokens")
-    
-    print(f"Fertig: {written_entries} Einträge, {current_tokens:,} Tokens")
-    return written_entries, current_tokens
+            domain_codes = _DOMAIN_CLASSIFIER.classify_batch([item['text'] for item in batch])
+            for item, domain_code in zip(batch, domain_codes.tolist()):
+                legal_domain = _DOMAIN_CLASSIFIER.domain_names[domain_code]
+                domain_counts[legal_domain] += 1
+                assignment, priority = document_hash(item['text'], seed)
+                if assignment < split_ratio:
+                    supervised.add(create_supervised_entry(item, token_counter, legal_domain), domain_code, priority)
+                else:
+                    unsupervised.add(create_unsupervised_entry(item, token_counter), domain_code, priority)
+    except BaseException:
+        supervised.discard()
+        unsupervised.discard()
+        raise
+    return supervised, unsupervised, domain_counts
 
-def write_unsupervised_jsonl_fixed_count(data: List[Dict], output_path: Path, target_entries: int):
+def select_with_token_limit(part: SplitPart, token_limit: int) -> List[int]:
     """
-    Schreibt unsupervised JSONL-Datei mit fester Anzahl Einträge (gleich wie supervised).
+    Wählt die Einträge innerhalb des Token-Limits aus.
+
+    Das Limit wird anteilig nach Tokens auf die Rechtsgebiete verteilt und je Rechtsgebiet in
+    Reihenfolge der Hash-Priorität gefüllt; Einträge, die nicht mehr passen, werden übersprungen statt
+    die Auswahl abzubrechen. Die Auswahl ist damit eine von der Länge der Gutachten und der Reihenfolge
+    der Eingabe unabhängige, mit --seed reproduzierbare Stichprobe.
+
+    Returns:
+        Aufsteigende Zeilenindizes
     """
-    current_tokens = 0
-    written_entries = 0
-    
-    print(f"\nSchreibe unsupervised Datei: {output_path}")
-    print(f"Ziel-Einträge: {target_entries}")
-    
-    # Begrenze auf verfügbare Daten oder Ziel-Anzahl
-    entries_to_write = min(len(data), target_entries)
+    return pack_items_stratified(part.tokens, part.domain_codes, token_limit, method='priority', priorities=part.priorities)
+
+def write_jsonl_with_token_limit(part: SplitPart, output_path: Path, token_limit: int, label: str):
+    """
+    Schreibt die supervised oder unsupervised JSONL-Datei mit Token-Limit.
+    """
+    print(f"\nSchreibe {label} Datei: {output_path}")
+    print(f"Token-Limit: {token_limit:,}")
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for i, item in enumerate(data[:entries_to_write]):
-            entry = create_unsupervised_entry(item)
-            entry_tokens = entry['token_count']
-            
-            # Schreibe Eintrag
-            json.dump(entry, f, ensure_ascii=False)
-            f.write('\n')
-            
-            current_tokens += entry_tokens
-            written_entries += 1
-            
-            if written_entries % 100 == 0:
-                print(f"  Geschrieben: {written_entries} Einträge, {current_tokens:,} Tokens")
+    selected = select_with_token_limit(part, token_limit)
+    current_tokens = sum(part.tokens[index] for index in selected)
+    skipped_entries = len(part) - len(selected)
+    if skipped_entries:
+        print(f"Token-Limit ausgeschöpft zu {current_tokens / token_limit:.1%}, {skipped_entries} Einträge passen nicht mehr")
+    part.spill.copy_lines_to(str(output_path), selected)
     
-    print(f"Fertig: {written_entries} Einträge, {current_tokens:,} Tokens")
-    return written_entries, current_tokens
+    print(f"Fertig: {len(selected)} Einträge, {current_tokens:,} Tokens")
+    return len(selected), current_tokens
 
-def analyze_distribution(data: List[Dict], title: str):
+def analyze_distribution(domain_counts: Counter, title: str):
     """
     Analysiert die Verteilung der Rechtsgebiete.
     """
-    domains = [extract_legal_domain(item['text']) for item in data]
-    domain_counts = Counter(domains)
+    total = sum(domain_counts.values())
     
     print(f"\n{title}:")
-    print(f"Gesamt: {len(data)} Einträge")
+    print(f"Gesamt: {total} Einträge")
     for domain, count in domain_counts.most_common():
-        percentage = (count / len(data)) * 100
+        percentage = (count / total) * 100
         print(f"  {domain}: {count} ({percentage:.1f}%)")
 
 def main():
     parser = argparse.ArgumentParser(description='Teilt den Datensatz für supervised und unsupervised learning auf')
-    parser.add_argument('input_file', help='Input JSON Datei')
+    parser.add_argument('input_file', help='Input JSON- oder JSONL-Datei (auch .gz/.zst)')
     parser.add_argument('-t', '--tokens', type=float, default=1.0, 
                        help='Token-Limit in Millionen pro Datei (default: 1.0)')
-    parser.add_argument('--seed', type=int, default=42, help='Random seed für Reproduzierbarkeit')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed für die hashbasierte, reproduzierbare Zuordnung der Dokumente (default: 42)')
     parser.add_argument('--split-ratio', type=float, default=0.5, 
                        help='Anteil für supervised learning (default: 0.5)')
+    parser.add_argument('--token-counter', choices=TOKEN_COUNTER_CHOICES, default='words',
+                       help='Art der Token-Zählung (default: words = Wortanzahl * 0.75)')
+    parser.add_argument('--vocab', help='BPE-Vokabeldatei (*.tiktoken oder tokenizer.json) für --token-counter bpe/calibrated')
+    parser.add_argument('--chars-per-token', type=float,
+                       help='Festes Zeichen-pro-Token-Verhältnis für --token-counter calibrated')
+    parser.add_argument('--compress', choices=['gz', 'zst', 'none'],
+                       help='Ausgabedateien mit gzip oder zstd komprimieren (default: wie die Eingabedatei)')
     
     args = parser.parse_args()
     
-    # Random seed setzen
-    random.seed(args.seed)
-    
     # Token-Limit in absolute Zahlen umrechnen
     token_limit = int(args.tokens * 1_000_000)
     
+    try:
+        token_counter = create_token_counter(args.token_counter, vocab_path=args.vocab,
+                                             chars_per_token=args.chars_per_token)
+    except (ValueError, ImportError, OSError) as e:
+        print(f"Fehler: Token-Zähler konnte nicht erstellt werden: {e}")
+        return
+    
     # Input-Datei laden
     input_path = Path(args.input_file)
     if not input_path.exists():
         print(f"Fehler: Datei {input_path} nicht gefunden!")
         return
     
-    print(f"Lade Datensatz: {input_path}")
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f"Geladene Einträge: {len(data)}")
-    
-    # Analysiere ursprüngliche Verteilung
-    analyze_distribution(data, "Ursprüngliche Verteilung")
-    
-    # Aufteilen nach Rechtsgebieten
-    print(f"\nTeile Datensatz auf (Ratio: {args.split_ratio})")
-    supervised_data, unsupervised_data = split_by_legal_domain(data, args.split_ratio)
+    # Komprimierte Dateien (.gz, .zst) werden beim Lesen entpackt, die Ausgabe wird standardmäßig genauso komprimiert
+    input_base, compression_suffix = split_compression_suffix(str(input_path))
+    if args.compress is not None:
+        compression_suffix = '' if args.compress == 'none' else '.' + args.compress
     
-    # Analysiere Verteilungen nach Split
-    analyze_distribution(supervised_data, "Supervised Learning Dataset")
-    analyze_distribution(unsupervised_data, "Unsupervised Learning Dataset")
-    
-    # Output-Verzeichnis erstellen
+    # Output-Verzeichnis und Dateinamen
     output_dir = input_path.parent / "Unsupervised Learning"
-    output_dir.mkdir(exist_ok=True)
+    base_name = Path(input_base).stem
+    supervised_file = output_dir / f"{base_name}_supervised_{args.tokens}M_tokens.jsonl{compression_suffix.lower()}"
+    unsupervised_file = output_dir / f"{base_name}_unsupervised_{args.tokens}M_tokens.jsonl{compression_suffix.lower()}"
+    
+    try:
+        check_compression_support(str(input_path))
+        check_compression_support(str(supervised_file))
+    except ImportError as e:
+        print(f"Fehler: {e}")
+        return
     
-    # Dateinamen generieren
-    base_name = input_path.stem
-    supervised_file = output_dir / f"{base_name}_supervised_{args.tokens}M_tokens.jsonl"
-    unsupervised_file = output_dir / f"{base_name}_unsupervised_{args.tokens}M_tokens.jsonl"
+    # Output-Verzeichnis erstellen (nimmt auch die Auslagerungsdateien auf)
+    output_dir.mkdir(exist_ok=True)
     
-    # JSONL-Dateien schreiben
-    print(f"\n{'='*60}")
-    print("SUPERVISED LEARNING DATASET")
-    print(f"{'='*60}")
-    supervised_entries, supervised_tokens = write_supervised_jsonl_with_token_limit(
-        supervised_data, supervised_file, token_limit
-    )
+    # Datensatz streamen und dabei nach Rechtsgebieten aufteilen
+    print(f"Lese und teile Datensatz auf: {input_path} (Ratio: {args.split_ratio})")
+    try:
+        supervised_part, unsupervised_part, domain_counts = stream_split(
+            iter_documents(input_path), args.split_ratio, args.seed, token_counter, output_dir
+        )
+    except (JsonArrayError, json.JSONDecodeError) as e:
+        print(f"Fehler: Datei {input_path} konnte nicht gelesen werden: {e}")
+        return
     
-    print(f"\n{'='*60}")
-    print("UNSUPERVISED LEARNING DATASET")
-    print(f"{'='*60}")
-    # Für unsupervised: gleiche Anzahl Einträge wie supervised
-    unsupervised_entries, unsupervised_tokens = write_unsupervised_jsonl_fixed_count(
-        unsupervised_data, unsupervised_file, supervised_entries
-    )
+    try:
+        print(f"Geladene Einträge: {sum(domain_counts.values())}")
+        
+        # Analysiere ursprüngliche Verteilung und Verteilungen nach Split
+        analyze_distribution(domain_counts, "Ursprüngliche Verteilung")
+        analyze_distribution(supervised_part.domain_counts, "Supervised Learning Dataset")
+        analyze_distribution(unsupervised_part.domain_counts, "Unsupervised Learning Dataset")
+        
+        # JSONL-Dateien schreiben
+        print(f"\n{'='*60}")
+        print("SUPERVISED LEARNING DATASET")
+        print(f"{'='*60}")
+        supervised_entries, supervised_tokens = write_jsonl_with_token_limit(
+            supervised_part, supervised_file, token_limit, "supervised"
+        )
+        
+        print(f"\n{'='*60}")
+        print("UNSUPERVISED LEARNING DATASET")
+        print(f"{'='*60}")
+        unsupervised_entries, unsupervised_tokens = write_jsonl_with_token_limit(
+            unsupervised_part, unsupervised_file, token_limit, "unsupervised"
+        )
+    finally:
+        supervised_part.discard()
+        unsupervised_part.discard()
     
     # Zusammenfassung
     print(f"\n{'='*60}")
@@ -314,7 +374,8 @@ def main():
     print(f"  - Tokens: {unsupervised_tokens:,}")
     print(f"  - Inhalt: Komplette Texte")
     
-    print(f"\nToken-Limit für supervised: {token_limit:,}")
+    print(f"\nToken-Limit pro Datei: {token_limit:,}")
+    print(f"Token-Zählung: {token_counter.describe()}")
     print(f"Einträge pro Dataset: {supervised_entries} (supervised) / {unsupervised_entries} (unsupervised)")
     print(f"Random Seed: {args.seed}")
 
@@ -0,0 +1,106 @@
+"""
+Bestimmung des Rechtsgebiets eines Gutachtentextes über gewichtete Schlüsselwörter.
+
+Die Schlüsselwörter aller Rechtsgebiete werden beim Erzeugen des DomainClassifier einmalig
+kleingeschrieben, zusammengeführt (ein Schlüsselwort, das in mehreren Rechtsgebieten vorkommt,
+wird nur einmal gezählt) und in eine Gewichtsmatrix Schlüsselwort x Rechtsgebiet übertragen.
+Pro Text wird nur eine kleingeschriebene Kopie erzeugt und jedes Schlüsselwort einmal gezählt;
+die Punktzahlen aller Rechtsgebiete ergeben sich daraus mit einer Matrixmultiplikation.
+
+Ein einzelner regulärer Ausdruck über alle Schlüsselwörter ist in CPython deutlich langsamer als
+str.count je Schlüsselwort und zählt überlappende Treffer verschiedener Schlüsselwörter
+(z.B. 'vertrag' in 'arbeitsvertrag') nicht mit; deshalb wird hier gezählt statt gematcht.
+"""
+
+import numpy as np
+
+# Schlüsselwörter je Rechtsgebiet; statt einer Liste kann auch ein Dictionary Schlüsselwort -> Gewicht
+# angegeben werden (Listeneinträge haben das Gewicht 1)
+LEGAL_DOMAINS = {
+    'Erbrecht': ['Nachlass', 'Erbe', 'Erbschaft', 'Testament', 'ENZ', 'Erbschein', 'Erblasser'],
+    'Zivilrecht': ['BGB', 'Vertrag', 'Schadensersatz', 'Anspruch', 'Klage'],
+    'Arbeitsrecht': ['Arbeitgeber', 'Arbeitnehmer', 'Kündigung', 'Arbeitsvertrag'],
+    'Familienrecht': ['Ehe', 'Scheidung', 'Unterhalt', 'Sorgerecht', 'FamFG'],
+    'Handelsrecht': ['HGB', 'Gesellschaft', 'Kaufmann', 'Handelsregister'],
+    'Verwaltungsrecht': ['Verwaltungsakt', 'Behörde', 'VwGO', 'Widerspruch'],
+    'Europarecht': ['EuGH', 'EU-Recht', 'Richtlinie', 'Verordnung', 'EuErbVO'],
+    'Prozessrecht': ['ZPO', 'Verfahren', 'Gericht', 'Urteil', 'Beschluss']
+}
+DEFAULT_LEGAL_DOMAIN = 'Allgemeines Recht'
+
+# Anzahl der Texte, deren Schlüsselwortzählungen in score_batch gleichzeitig gehalten werden
+BATCH_SIZE = 4096
+
+class DomainClassifier:
+    """
+    Ordnet Texte dem Rechtsgebiet mit der höchsten gewichteten Schlüsselwortzahl zu.
+
+    Args:
+        domains: Dictionary Rechtsgebiet -> Liste von Schlüsselwörtern oder Dictionary Schlüsselwort -> Gewicht
+        default_domain: Rechtsgebiet für Texte ohne positive Punktzahl
+
+    Attribute:
+        domain_names: Rechtsgebiete in Spaltenreihenfolge der Punktmatrix, gefolgt von default_domain;
+                      classify_batch liefert Indizes in diese Liste
+    """
+
+    def __init__(self, domains=LEGAL_DOMAINS, default_domain=DEFAULT_LEGAL_DOMAIN):
+        self.domain_names = list(domains) + [default_domain]
+        self.default_code = len(domains)
+        self.keywords = []
+        keyword_index = {}
+        weights = []
+        for column, keywords in enumerate(domains.values()):
+            if not isinstance(keywords, dict):
+                keywords = {keyword: 1 for keyword in keywords}
+            for keyword, weight in keywords.items():
+                keyword = keyword.lower()
+                if keyword not in keyword_index:
+                    keyword_index[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    weights.append([0.0] * len(domains))
+                weights[keyword_index[keyword]][column] += weight
+        self.weights = np.array(weights, dtype=np.float64).reshape(len(self.keywords), len(domains))
+
+    def _keyword_counts(self, text):
+        text_lower = text.lower()
+        return [text_lower.count(keyword) for keyword in self.keywords]
+
+    def score(self, text):
+        """Punktzahl jedes Rechtsgebiets (ohne default_domain) für einen Text als NumPy-Vektor."""
+        return np.asarray(self._keyword_counts(text), dtype=np.float64) @ self.weights
+
+    def score_batch(self, texts):
+        """
+        Punktzahlen aller Rechtsgebiete für eine Liste von Texten.
+
+        Returns:
+            NumPy-Matrix der Form (Anzahl Texte, Anzahl Rechtsgebiete ohne default_domain)
+        """
+        scores = np.zeros((len(texts), self.weights.shape[1]), dtype=np.float64)
+        for start in range(0, len(texts), BATCH_SIZE):
+            block = texts[start:start + BATCH_SIZE]
+            counts = np.array([self._keyword_counts(text) for text in block], dtype=np.float64)
+            scores[start:start + len(block)] = counts.reshape(len(block), len(self.keywords)) @ self.weights
+        return scores
+
+    def _codes_from_scores(self, scores):
+        # argmax liefert bei Gleichstand das erste Rechtsgebiet in der Reihenfolge von domains
+        codes = np.argmax(scores, axis=1)
+        codes[scores.max(axis=1, initial=0.0) <= 0] = self.default_code
+        return codes
+
+    def classify(self, text):
+        """Rechtsgebiet eines Textes."""
+        return self.domain_names[int(self._codes_from_scores(self.score(text)[np.newaxis])[0])]
+
+    def classify_batch(self, texts):
+        """
+        Rechtsgebiete einer Liste von Texten.
+
+        Returns:
+            NumPy-Vektor der Indizes in domain_names
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.intp)
+        return self._codes_from_scores(self.score_batch(texts))
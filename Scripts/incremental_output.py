@@ -0,0 +1,190 @@
+"""
+Inkrementelle Aktualisierung einer _segmented_prepared.jsonl-Ausgabe (--incremental).
+
+Neben der Ausgabedatei wird ein Manifest (<Ausgabedatei>.manifest.json) geführt, das für jede
+gutachten_nummer einen Hash der für die Ausgabe relevanten Felder sowie den Bytebereich ihrer Zeilen
+in der Ausgabedatei enthält. Bei einem erneuten Lauf werden unveränderte Gutachten nicht neu
+segmentiert, sondern ihre Zeilen aus der bestehenden Ausgabe übernommen. Nur neue oder geänderte
+Gutachten werden verarbeitet; ihre Zeilen werden zunächst in eine Auslagerungsdatei geschrieben.
+
+Am Ende werden die neuen Zeilen an die bestehende Datei angehängt, wenn diese unverändert am Anfang
+der neuen Ausgabe steht (der übliche Fall, wenn neue Gutachten am Ende des Korpus hinzukommen).
+Andernfalls wird die Ausgabe durch blockweises Kopieren der alten und neuen Bereiche neu
+zusammengesetzt, ebenfalls ohne erneute Segmentierung.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from jsonl_io import JsonlSpillFile, copy_file_range, replace_file
+
+MANIFEST_VERSION = 1
+
+# Felder eines Gutachtens, von denen die erzeugten Zeilen abhängen
+HASHED_FIELDS = ('gutachten_nummer', 'erscheinungsdatum', 'normen', 'text')
+
+def manifest_path_for(output_file_path):
+    return output_file_path + ".manifest.json"
+
+def item_content_hash(item):
+    """Hash der für die Ausgabe relevanten Felder eines Gutachtens."""
+    relevant = {field: item.get(field) for field in HASHED_FIELDS}
+    return hashlib.sha256(json.dumps(relevant, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+class IncrementalOutput:
+    """
+    Verwaltet Manifest, Auslagerungsdatei und das Zusammensetzen der Ausgabe im inkrementellen Modus.
+
+    Args:
+        output_file_path: Pfad der _segmented_prepared.jsonl-Ausgabe
+        fingerprint: Kennung von Code und Optionen, von denen die Zeilen abhängen; weicht sie vom
+                     Manifest ab, wird die Ausgabe vollständig neu erzeugt
+
+    Attribute:
+        rebuild_reason: Grund, warum das bestehende Manifest nicht verwendet wird (oder None)
+        reused_count, new_count: Anzahl übernommener bzw. neu verarbeiteter Gutachten
+    """
+
+    def __init__(self, output_file_path, fingerprint):
+        self.output_file_path = output_file_path
+        self.manifest_path = manifest_path_for(output_file_path)
+        self.fingerprint = fingerprint
+        self.rebuild_reason = None
+        self.reused_count = 0
+        self.new_count = 0
+        self._previous_entries = {}
+        self._previous_size = 0
+        self._entries = {}
+        self._plan = []  # (aus_auslagerungsdatei, offset, länge, manifest_eintrag) je Gutachten in Ausgabereihenfolge
+        self._load_manifest()
+        self._spill = JsonlSpillFile(os.path.dirname(output_file_path), prefix=f".{os.path.basename(output_file_path)}.")
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            self.rebuild_reason = "kein Manifest vorhanden"
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError) as e:
+            self.rebuild_reason = f"Manifest nicht lesbar ({e})"
+            return
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('fingerprint') != self.fingerprint:
+            self.rebuild_reason = "Code oder Optionen haben sich geändert"
+            return
+        if not os.path.isfile(self.output_file_path) or os.path.getsize(self.output_file_path) != manifest.get('output_size'):
+            self.rebuild_reason = "Ausgabedatei fehlt oder passt nicht zum Manifest"
+            return
+        self._previous_entries = manifest.get('entries', {})
+        self._previous_size = manifest['output_size']
+
+    def lookup(self, gutachten_nummer, content_hash):
+        """Liefert den Manifest-Eintrag des letzten Laufs, wenn das Gutachten unverändert ist, sonst None."""
+        entry = self._previous_entries.get(str(gutachten_nummer))
+        if entry is not None and entry['hash'] == content_hash:
+            return entry
+        return None
+
+    def reuse(self, gutachten_nummer, entry):
+        """Übernimmt die Zeilen eines unveränderten Gutachtens aus der bestehenden Ausgabe."""
+        new_entry = dict(entry)
+        self._plan.append((False, entry['offset'], entry['length'], new_entry))
+        self._entries[str(gutachten_nummer)] = new_entry
+        self.reused_count += 1
+
+    def add(self, gutachten_nummer, content_hash, lines, tokens):
+        """Nimmt die neu erzeugten Zeilen eines neuen oder geänderten Gutachtens auf."""
+        first_line = len(self._spill)
+        for line in lines:
+            self._spill.append(line)
+        offset = self._spill.byte_offset(first_line)
+        length = self._spill.byte_offset(len(self._spill)) - offset
+        new_entry = {'hash': content_hash, 'offset': offset, 'length': length, 'segments': len(lines), 'tokens': tokens}
+        self._plan.append((True, offset, length, new_entry))
+        self._entries[str(gutachten_nummer)] = new_entry
+        self.new_count += 1
+
+    @property
+    def removed_count(self):
+        """Anzahl der Gutachten aus dem letzten Lauf, die in der Eingabe nicht mehr vorkommen."""
+        return sum(1 for gutachten_nummer in self._previous_entries if gutachten_nummer not in self._entries)
+
+    def _can_append(self):
+        """Prüft, ob die bestehende Ausgabe unverändert am Anfang steht und nur neue Zeilen folgen."""
+        expected_offset = 0
+        seen_new = False
+        for from_spill, offset, length, _ in self._plan:
+            if from_spill:
+                seen_new = True
+            elif seen_new or offset != expected_offset:
+                return False
+            else:
+                expected_offset += length
+        return expected_offset == self._previous_size
+
+    def finalize(self):
+        """
+        Schreibt die Ausgabe und das neue Manifest.
+
+        Returns:
+            'unverändert', 'angehängt' oder 'neu zusammengesetzt'
+        """
+        spill_size = self._spill.byte_offset(len(self._spill))
+        if self.rebuild_reason is None and self._can_append():
+            mode = 'angehängt' if self.new_count else 'unverändert'
+            if spill_size:
+                with open(self.output_file_path, 'ab') as outfile:
+                    self._spill.copy_bytes_to(outfile, 0, spill_size)
+            for from_spill, offset, _, entry in self._plan:
+                entry['offset'] = self._previous_size + offset if from_spill else offset
+            output_size = self._previous_size + spill_size
+        else:
+            mode = 'neu zusammengesetzt'
+            output_size = self._rewrite_output()
+        self._write_manifest(output_size)
+        self._spill.discard()
+        return mode
+
+    def discard(self):
+        """Verwirft die Auslagerungsdatei, ohne Ausgabe oder Manifest zu verändern."""
+        self._spill.discard()
+
+    def _rewrite_output(self):
+        """Setzt die Ausgabe aus alten und neuen Bereichen in einer temporären Datei zusammen und ersetzt sie."""
+        output_directory = os.path.dirname(self.output_file_path) or None
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.output_file_path)}.", suffix='.tmp', dir=output_directory)
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                previous_file = open(self.output_file_path, 'rb') if self.reused_count else None
+                try:
+                    position = 0
+                    for from_spill, offset, length, entry in self._plan:
+                        if from_spill:
+                            self._spill.copy_bytes_to(outfile, offset, length)
+                        else:
+                            copy_file_range(previous_file, outfile, offset, length)
+                        entry['offset'] = position
+                        position += length
+                finally:
+                    if previous_file is not None:
+                        previous_file.close()
+            replace_file(temp_path, self.output_file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return position
+
+    def _write_manifest(self, output_size):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'fingerprint': self.fingerprint,
+            'output_size': output_size,
+            'entries': self._entries,
+        }
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
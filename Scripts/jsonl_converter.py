@@ -1,6 +1,27 @@
+import codecs
+import gzip
+import io
 import json
 import argparse
+import mmap
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from jsonl_io import (ZSTANDARD_AVAILABLE, InputFile, JsonArrayError, JsonArrayReader, JsonlWriter, compression_for_path,
+                      dumps_json_line, split_compression_suffix)
+
+if ZSTANDARD_AVAILABLE:
+    import zstandard
+
+# Approximate size of the byte ranges that are converted by one worker process (--workers)
+PARALLEL_CHUNK_SIZE = 8 << 20
+
+# Number of (decompressed) bytes that detect_file_format inspects at most
+DETECTION_PREFIX_SIZE = 64 << 10
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
 
 def convert_json_to_jsonl(input_file_path, output_file_path=None):
     """
@@ -33,10 +54,14 @@ def convert_json_to_jsonl(input_file_path, output_file_path=None):
     - The script attempts to handle JSON files that might have leading non-JSON lines 
       (like comments) before the main JSON array `[...]` starts, as seen in your example.
       However, the JSON content itself (within the array) must be valid.
+    - Compressed input (.json.gz, .json.zst) is decompressed while reading. The derived
+      output path keeps the compression (e.g. data.json.gz -> data.jsonl.gz); an explicit
+      output path ending in .gz or .zst is written compressed.
     """
     if output_file_path is None:
-        base, ext = os.path.splitext(input_file_path)
-        output_file_path = base + ".jsonl"
+        uncompressed_path, compression_suffix = split_compression_suffix(input_file_path)
+        base, ext = os.path.splitext(uncompressed_path)
+        output_file_path = base + ".jsonl" + compression_suffix
 
     if input_file_path == output_file_path:
         print(f"Error: Input and potential output file paths would be the same (\'{input_file_path}').")
@@ -44,59 +69,37 @@ def convert_json_to_jsonl(input_file_path, output_file_path=None):
         return
 
     try:
-        with open(input_file_path, 'r', encoding='utf-8') as infile:
-            content = infile.read()
-        
-        # Attempt to find the start of the JSON array (e.g., '[')
-        # This helps skip potential leading comments or non-JSON lines.
-        array_start_index = content.find('[')
-        object_start_index = content.find('{') # Fallback for a single object, though list is expected
-
-        json_start_index = -1
-
-        if array_start_index != -1 and (object_start_index == -1 or array_start_index < object_start_index):
-            json_start_index = array_start_index
-        elif object_start_index != -1:
-            # This case is less likely for the user's described data (list of objects)
-            # but makes the parser slightly more general if the input was a single JSON object file.
-            # For this specific request, an array is expected.
-            json_start_index = object_start_index 
-            print("Warning: Input file seems to start with a JSON object '{' instead of an array '['. Processing as a single object list if parsing as array fails.")
-
-        if json_start_index == -1:
+        # The input is streamed: leading non-JSON text before the first '[' or '{' is skipped and
+        # each array element is decoded from a sliding buffer (json.JSONDecoder.raw_decode) and
+        # written as soon as it is parsed, so memory use does not depend on the file size.
+        try:
+            reader = JsonArrayReader(input_file_path, skip_leading_text=True)
+        except JsonArrayError:
             print("Error: Could not find the start of a JSON array ('[') or object ('{') in the input file.")
             print("Please ensure your file contains valid JSON data.")
             return
 
-        json_content = content[json_start_index:]
-        
+        if reader.single_object:
+            # This case is less likely for the user's described data (list of objects)
+            # but makes the parser slightly more general if the input was a single JSON object file.
+            print("Warning: Input file seems to start with a JSON object '{' instead of an array '['. Processing it as a list with a single object.")
+
         try:
-            data = json.loads(json_content)
+            # The output is written to a temporary file that replaces output_file_path only on success
+            with JsonlWriter(output_file_path, atomic=True) as writer:
+                for entry in reader:
+                    if not isinstance(entry, dict):
+                        print(f"Warning: Skipping an item that is not a JSON object (dictionary): {type(entry)}")
+                        continue
+                    # Serialize each entry (dictionary) as one UTF-8 line, like json.dumps(entry, ensure_ascii=False)
+                    writer.write(entry)
         except json.JSONDecodeError as e:
             print(f"Error: Could not decode JSON from '{input_file_path}'. Details: {e}")
             print("Please ensure the content starting from the first '[' or '{' is valid JSON.")
             return
-
-        if not isinstance(data, list):
-            # If the top level is a single object, wrap it in a list to process consistently
-            if isinstance(data, dict):
-                data = [data]
-            else:
-                print("Error: Input JSON data is not a list of objects (or a single object).")
-                return
-
-        with open(output_file_path, 'w', encoding='utf-8') as outfile:
-            for entry in data:
-                if not isinstance(entry, dict):
-                    print(f"Warning: Skipping an item that is not a JSON object (dictionary): {type(entry)}")
-                    continue
-                # Serialize each entry (dictionary) to a JSON string
-                # ensure_ascii=False is important for proper UTF-8 handling of special characters
-                json_string = json.dumps(entry, ensure_ascii=False)
-                outfile.write(json_string + '\n')
         
         print(f"Successfully converted '{input_file_path}' to '{output_file_path}'.")
-        print(f"The output file contains {len(data)} lines, each being a JSON object.")
+        print(f"The output file contains {writer.lines_written} lines, each being a JSON object.")
 
     except FileNotFoundError:
         print(f"Error: Input file '{input_file_path}' not found.")
@@ -104,7 +107,114 @@ def convert_json_to_jsonl(input_file_path, output_file_path=None):
         print(f"An unexpected error occurred: {e}")
 
 
-def convert_jsonl_to_json(input_file_path, output_file_path=None):
+def _format_array_element(entry, indent):
+    """
+    Serializes one element of the output JSON array.
+
+    With indent > 0 the result is identical to the element's part of
+    json.dump(list, ensure_ascii=False, indent=indent); with indent 0 each element is
+    written compactly on its own line.
+    """
+    if not indent:
+        return dumps_json_line(entry, compact=True)
+    padding = ' ' * indent
+    # Newlines inside strings are escaped, so every newline belongs to the indentation
+    return padding + json.dumps(entry, ensure_ascii=False, indent=indent).replace('\n', '\n' + padding)
+
+
+def _split_line_aligned_ranges(file_path, chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Splits a file into byte ranges of roughly chunk_size bytes that each end after a newline.
+
+    Returns:
+        List of (start, end) byte offsets covering the whole file
+    """
+    ranges = []
+    with open(file_path, 'rb') as infile:
+        file_size = os.fstat(infile.fileno()).st_size
+        if file_size == 0:
+            return ranges
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < file_size:
+                newline = mapped.find(b'\n', min(start + chunk_size, file_size) - 1)
+                end = file_size if newline == -1 else newline + 1
+                ranges.append((start, end))
+                start = end
+    return ranges
+
+
+def _convert_jsonl_range(file_path, start, end, indent):
+    """
+    Parses the lines in the byte range [start, end) of a JSONL file in a worker process (--workers).
+
+    Returns:
+        Tuple (formatted array elements joined by commas and newlines, number of objects, number of lines,
+        list of (line number within the range, error message, beginning of the line) for bad lines)
+    """
+    with open(file_path, 'rb') as infile, mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        lines = mapped[start:end].split(b'\n')
+    if lines and not lines[-1]:
+        lines.pop()  # The range ends with a newline
+    elements = []
+    bad_lines = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.decode('utf-8').strip()
+        if not line:  # Skip empty lines
+            continue
+        try:
+            json_obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            bad_lines.append((line_number, str(e), line[:50]))
+            continue
+        elements.append(_format_array_element(json_obj, indent))
+    return ",\n".join(elements), len(elements), len(lines), bad_lines
+
+
+def _print_bad_line_warning(line_number, error, line_start):
+    print(f"Warning: Could not parse line {line_number} as JSON. Details: {error}")
+    print(f"Line content: {line_start}...")  # Show beginning of problematic line
+    print("This line will be skipped.")
+
+
+def _convert_jsonl_ranges_parallel(input_file_path, writer, indent, workers):
+    """
+    Converts a JSONL file range by range in a process pool and writes the array elements in input order.
+
+    The file is split into newline-aligned byte ranges; at most 2 * workers ranges are in progress at
+    the same time. Bad lines are reported with their line number in the whole file.
+
+    Returns:
+        Tuple (number of objects, number of skipped lines)
+    """
+    object_count = 0
+    skipped_line_count = 0
+    lines_before_range = 0
+    ranges = iter(_split_line_aligned_ranges(input_file_path))
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next_range():
+            byte_range = next(ranges, None)
+            if byte_range is not None:
+                pending.append(executor.submit(_convert_jsonl_range, input_file_path, *byte_range, indent))
+            return byte_range is not None
+
+        while len(pending) < 2 * workers and submit_next_range():
+            pass
+        while pending:
+            elements, range_object_count, range_line_count, bad_lines = pending.popleft().result()
+            submit_next_range()
+            for line_number, error, line_start in bad_lines:
+                _print_bad_line_warning(lines_before_range + line_number, error, line_start)
+            if range_object_count:
+                writer.write_text(("[\n" if object_count == 0 else ",\n") + elements)
+            object_count += range_object_count
+            skipped_line_count += len(bad_lines)
+            lines_before_range += range_line_count
+    return object_count, skipped_line_count
+
+
+def convert_jsonl_to_json(input_file_path, output_file_path=None, indent=2, workers=1):
     """
     Converts a JSONL file (with one JSON object per line) to a JSON file containing a list of objects.
     
@@ -112,14 +222,25 @@ def convert_jsonl_to_json(input_file_path, output_file_path=None):
     especially in machine learning. This function converts such files back into a standard
     JSON array format, which might be easier to work with in some contexts.
     
+    The conversion is streamed: '[', the comma-separated objects and ']' are written while
+    the input is read line by line, so memory use does not depend on the file size.
+    
     Args:
         input_file_path: Path to the input JSONL file
         output_file_path: Path to the output JSON file (optional). If not provided,
                           it will be derived from the input path by replacing the extension.
+                          Compressed input (.jsonl.gz, .jsonl.zst) is decompressed while reading,
+                          and .gz/.zst output paths are written compressed.
+        indent: Indentation of the pretty-printed objects (default 2, as json.dump(..., indent=2));
+                0 writes each object compactly on its own line
+        workers: Number of worker processes. With more than one, an uncompressed input file is split
+                 into newline-aligned byte ranges (via mmap) that are parsed in parallel; the output
+                 is identical to the sequential conversion.
     """
     if output_file_path is None:
-        base, ext = os.path.splitext(input_file_path)
-        output_file_path = base + ".json"
+        uncompressed_path, compression_suffix = split_compression_suffix(input_file_path)
+        base, ext = os.path.splitext(uncompressed_path)
+        output_file_path = base + ".json" + compression_suffix
     
     if input_file_path == output_file_path:
         print(f"Error: Input and potential output file paths would be the same (\'{input_file_path}').")
@@ -127,29 +248,43 @@ def convert_jsonl_to_json(input_file_path, output_file_path=None):
         return
     
     try:
-        data = []
-        with open(input_file_path, 'r', encoding='utf-8') as infile:
-            for line_number, line in enumerate(infile, 1):
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                try:
-                    json_obj = json.loads(line)
-                    data.append(json_obj)
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Could not parse line {line_number} as JSON. Details: {e}")
-                    print(f"Line content: {line[:50]}...")  # Show beginning of problematic line
-                    print("This line will be skipped.")
+        object_count = 0
+        skipped_line_count = 0
+        # The output is written to a temporary file that replaces output_file_path only on success
+        if workers > 1 and compression_for_path(input_file_path) is not None:
+            print("Note: Compressed input cannot be split into byte ranges; converting sequentially.")
+            workers = 1
         
-        if not data:
+        with InputFile(input_file_path) as infile, JsonlWriter(output_file_path, atomic=True) as writer:
+            if workers > 1:
+                object_count, skipped_line_count = _convert_jsonl_ranges_parallel(input_file_path, writer, indent, workers)
+            else:
+                for line_number, line in enumerate(infile, 1):
+                    line = line.decode('utf-8').strip()
+                    if not line:  # Skip empty lines
+                        continue
+                    try:
+                        json_obj = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        skipped_line_count += 1
+                        _print_bad_line_warning(line_number, e, line[:50])
+                        continue
+                    writer.write_text(("[\n" if object_count == 0 else ",\n") + _format_array_element(json_obj, indent))
+                    object_count += 1
+            
+            if object_count == 0:
+                writer.discard()
+            else:
+                writer.write_text("\n]")
+        
+        if object_count == 0:
             print("Warning: No valid JSON objects found in the input file.")
             return
         
-        with open(output_file_path, 'w', encoding='utf-8') as outfile:
-            json.dump(data, outfile, ensure_ascii=False, indent=2)
-        
         print(f"Successfully converted '{input_file_path}' to '{output_file_path}'.")
-        print(f"The output file contains a JSON array with {len(data)} objects.")
+        print(f"The output file contains a JSON array with {object_count} objects.")
+        if skipped_line_count:
+            print(f"Skipped {skipped_line_count} line(s) that could not be parsed as JSON.")
     
     except FileNotFoundError:
         print(f"Error: Input file '{input_file_path}' not found.")
@@ -157,72 +292,95 @@ def convert_jsonl_to_json(input_file_path, output_file_path=None):
         print(f"An unexpected error occurred: {e}")
 
 
+def _open_for_detection(file_path):
+    """
+    Opens file_path for format detection, recognizing gzip and zstd data by their magic bytes.
+
+    Returns:
+        A binary stream with the decompressed content, or None if zstd data cannot be read
+        because the zstandard package is missing
+    """
+    with open(file_path, 'rb') as raw_file:
+        magic = raw_file.read(len(ZSTD_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(file_path, 'rb')
+    if magic == ZSTD_MAGIC:
+        if not ZSTANDARD_AVAILABLE:
+            return None
+        raw_file = open(file_path, 'rb')
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw_file, read_across_frames=True, closefd=True))
+    return open(file_path, 'rb')
+
+
 def detect_file_format(file_path):
     """
     Detect if a file is likely to be in JSON or JSONL format based on its content.
     
-    Args:
-        file_path: Path to the file to analyze
-        
+    Only the first DETECTION_PREFIX_SIZE bytes are read, so detection takes constant time
+    regardless of the file size. Gzip and zstd files are recognized by their magic bytes and
+    decompressed on the fly; a UTF-8 BOM is ignored. A file starting with '[' is JSON. A file
+    starting with '{' is JSONL if a second record starts on a new line after the first complete
+    record, and JSON otherwise. If the first record does not end within the prefix, a record
+    without line breaks is taken as a JSONL line and a multi-line record as a pretty-printed
+    JSON object.
+    
     Returns:
         A string indicating the detected format: 'json', 'jsonl', or 'unknown'
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            first_char = None
-            # Find the first non-whitespace character
-            while True:
-                char = f.read(1)
-                if not char:  # End of file
-                    break
-                if not char.isspace():  # Found a non-whitespace character
-                    first_char = char
-                    break
-            
-            if first_char is None:
-                return 'unknown'  # Empty file
-            
-            if first_char == '[':
-                # Likely a JSON file with array
-                return 'json'
-            elif first_char == '{':
-                # Could be either a JSON object or a JSONL file starting with a JSON object
-                # Read a bit more to check
-                more_content = f.read(4000)  # Read a chunk to analyze
-                if '\n{' in more_content:
-                    return 'jsonl'  # Found another JSON object on a new line
-                elif ']' in more_content and not '\n{' in more_content:
-                    return 'json'  # Found closing bracket but no new JSON objects
-                
-                # Count the number of open and close braces to get a hint
-                open_braces = more_content.count('{')
-                close_braces = more_content.count('}')
-                
-                if open_braces > 1 and close_braces > 0 and '\n' in more_content:
-                    return 'jsonl'  # Multiple objects likely means JSONL
-                
-                # Just look for new lines with JSON objects as a final check
-                f.seek(0)
-                lines = [line.strip() for line in f if line.strip()]
-                if len(lines) > 1:
-                    try:
-                        # Try to parse the second line as JSON
-                        if lines[1].startswith('{') and lines[1].endswith('}'):
-                            json.loads(lines[1])
-                            return 'jsonl'  # Second line is a valid JSON object
-                    except (json.JSONDecodeError, IndexError):
-                        pass
-                
-                return 'json'  # Default to JSON if unsure
-            
+        infile = _open_for_detection(file_path)
+        if infile is None:
+            # zstd data without the zstandard package: fall back to the extension
+            ext = os.path.splitext(split_compression_suffix(file_path)[0])[1].lower()
+            return {'.json': 'json', '.jsonl': 'jsonl'}.get(ext, 'unknown')
+        with infile:
+            prefix = infile.read(DETECTION_PREFIX_SIZE)
+            at_end = len(prefix) < DETECTION_PREFIX_SIZE or not infile.read(1)
+        
+        if prefix.startswith(codecs.BOM_UTF8):
+            prefix = prefix[len(codecs.BOM_UTF8):]
+        # A multi-byte character cut off at the end of the prefix is dropped
+        content = codecs.getincrementaldecoder('utf-8')().decode(prefix, final=at_end)
+        
+        # Find the first non-whitespace character
+        position = len(content) - len(content.lstrip())
+        if position == len(content):
+            return 'unknown'  # Empty file (or only whitespace in the prefix)
+        
+        first_char = content[position]
+        if first_char == '[':
+            # Likely a JSON file with array
+            return 'json'
+        if first_char != '{':
             return 'unknown'  # Unrecognized format
+        
+        # Could be either a JSON object or a JSONL file starting with a JSON object
+        decoder = json.JSONDecoder()
+        try:
+            _, end = decoder.raw_decode(content, position)
+        except json.JSONDecodeError:
+            if at_end:
+                return 'json'  # Invalid JSON; let the conversion report the error
+            # The first record is longer than the prefix: JSONL records contain no line breaks
+            return 'json' if '\n' in content[position:] else 'jsonl'
+        
+        rest = content[end:]
+        next_position = len(rest) - len(rest.lstrip())
+        if next_position == len(rest) or rest[next_position] != '{' or '\n' not in rest[:next_position]:
+            return 'json'  # Single object (or something other than a second record follows)
+        try:
+            decoder.raw_decode(rest, next_position)
+        except json.JSONDecodeError:
+            if at_end:
+                return 'json'
+        return 'jsonl'  # A second record starts on a new line
     
     except Exception as e:
         print(f"Error detecting file format: {e}")
         return 'unknown'
 
 
-def main(input_file_path, output_file_path=None, conversion_type=None):
+def main(input_file_path, output_file_path=None, conversion_type=None, indent=2, workers=1):
     """
     Main function to handle file conversion between JSON and JSONL formats.
     
@@ -230,6 +388,8 @@ def main(input_file_path, output_file_path=None, conversion_type=None):
         input_file_path: Path to the input file
         output_file_path: Path to the output file (optional)
         conversion_type: 'to_jsonl', 'to_json', or None for auto-detection
+        indent: Indentation of the objects in JSON output (0 = one compact object per line)
+        workers: Number of worker processes for parsing JSONL input
     """
     # Validate input file exists
     if not os.path.isfile(input_file_path):
@@ -252,7 +412,7 @@ def main(input_file_path, output_file_path=None, conversion_type=None):
     if conversion_type == 'to_jsonl':
         convert_json_to_jsonl(input_file_path, output_file_path)
     elif conversion_type == 'to_json':
-        convert_jsonl_to_json(input_file_path, output_file_path)
+        convert_jsonl_to_json(input_file_path, output_file_path, indent, workers)
     else:
         print(f"Error: Unknown conversion type '{conversion_type}'.")
 
@@ -293,6 +453,22 @@ if __name__ == "__main__":
         help="Convert from JSONL to JSON format."
     )
 
+    parser.add_argument(
+        "--indent",
+        type=int,
+        default=2,
+        help="Indentation of the objects when converting to JSON (default: 2).\n"+
+             "Use 0 to write each object compactly on its own line."
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for JSONL input (default: 1).\n"+
+             "The file is split into newline-aligned byte ranges that are parsed in parallel."
+    )
+
     args = parser.parse_args()
 
-    main(args.input_file_path, args.output_file_path, args.conversion_type)
+    main(args.input_file_path, args.output_file_path, args.conversion_type, args.indent, max(1, args.workers))
@@ -0,0 +1,624 @@
+"""
+Speicherschonendes Lesen und Zwischenspeichern von Gutachtendaten im JSONL- und JSON-Format.
+
+Die Leser liefern die Einträge einzeln und nacheinander, ohne die gesamte Datei in den
+Speicher zu laden. Über bytes_read und total_bytes lässt sich der Fortschritt anhand der
+bereits gelesenen Bytes abschätzen. JsonlSpillFile lagert Ausgabezeilen auf die Platte aus,
+bis feststeht, welche davon geschrieben werden. JsonlWriter schreibt JSONL-Dateien gepuffert und
+auf Wunsch atomar.
+
+Dateien mit der Endung .gz oder .zst werden beim Lesen gestreamt entpackt und beim Schreiben
+komprimiert (zstd benötigt das optionale Paket zstandard). gzip-Ausgaben werden blockweise in
+mehreren Threads komprimiert und als aufeinanderfolgende gzip-Member geschrieben, die gzip, zcat
+und Python wie eine einzige Datei lesen; zstd komprimiert mit eigenen Worker-Threads.
+
+Ausgabezeilen werden standardmäßig wie mit json.dumps(obj, ensure_ascii=False) serialisiert. Auf
+Wunsch (compact=True) werden sie kompakt (ohne Leerzeichen nach ',' und ':') und mit orjson, wenn
+installiert, geschrieben; orjson und das json-Modul liefern dann dieselben Zeilen, abweichen kann nur
+die Schreibweise von Gleitkommazahlen mit Exponent (1e-05 statt 0.00001).
+"""
+
+import codecs
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+
+# Blockgröße beim Lesen großer JSON-Dateien
+READ_CHUNK_SIZE = 1 << 20
+
+# Ab dieser Menge gesammelter Bytes schreibt JsonlWriter die Zeilen in einem Block
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Dateiendungen komprimierter Dateien und das jeweilige Verfahren
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+GZIP_COMPRESSLEVEL = 6
+ZSTD_LEVEL = 3
+
+_JSON_WHITESPACE = ' \t\n\r'
+_JSON_VALUE_TERMINATORS = _JSON_WHITESPACE + ',]'
+# Ein Decodierfehler innerhalb dieser Anzahl Zeichen vor dem Pufferende kann von einem abgeschnittenen
+# Token stammen (z.B. '-Infinity', '1.5e10', ein \uXXXX-Escape); weiter vorne ist er echt
+_TRUNCATION_MARGIN = 16
+
+def _iter_file_range(source, offset, length):
+    """Liefert length Bytes ab offset aus der Binärdatei source in Blöcken."""
+    source.seek(offset)
+    remaining = length
+    while remaining > 0:
+        chunk = source.read(min(READ_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise IOError(f"Datei '{getattr(source, 'name', source)}' ist kürzer als erwartet")
+        yield chunk
+        remaining -= len(chunk)
+
+def copy_file_range(source, target, offset, length):
+    """Kopiert length Bytes ab offset aus der Binärdatei source an die aktuelle Position von target."""
+    for chunk in _iter_file_range(source, offset, length):
+        target.write(chunk)
+
+def split_compression_suffix(file_path):
+    """
+    Trennt eine Komprimierungsendung ab.
+
+    Returns:
+        (Pfad ohne Komprimierungsendung, Endung), z.B. ('daten.jsonl', '.gz'); ohne
+        Komprimierung ist die Endung ''
+    """
+    base, suffix = os.path.splitext(file_path)
+    if suffix.lower() in COMPRESSION_SUFFIXES:
+        return base, suffix
+    return file_path, ''
+
+def compression_for_path(file_path):
+    """Komprimierungsverfahren ('gzip' oder 'zstd') anhand der Dateiendung oder None."""
+    return COMPRESSION_SUFFIXES.get(split_compression_suffix(file_path)[1].lower())
+
+def check_compression_support(file_path):
+    """Löst ImportError aus, wenn für die Komprimierung von file_path ein Paket fehlt."""
+    if compression_for_path(file_path) == 'zstd' and not ZSTANDARD_AVAILABLE:
+        raise ImportError(f"Für .zst-Dateien ('{file_path}') wird das Paket 'zstandard' benötigt (pip install zstandard)")
+
+class InputFile:
+    """
+    Binäre Eingabedatei, die .gz- und .zst-Dateien beim Lesen gestreamt entpackt.
+
+    Unterstützt read(), readline() und zeilenweise Iteration über die entpackten Bytes.
+    raw_position() liefert die Anzahl der bereits aus der Datei selbst gelesenen Bytes, sodass
+    sich der Fortschritt auch bei komprimierten Dateien an der Dateigröße messen lässt.
+    """
+
+    def __init__(self, file_path):
+        check_compression_support(file_path)
+        self.compression = compression_for_path(file_path)
+        self._raw = open(file_path, 'rb')
+        try:
+            if self.compression == 'gzip':
+                self._stream = gzip.GzipFile(fileobj=self._raw, mode='rb')
+            elif self.compression == 'zstd':
+                reader = zstandard.ZstdDecompressor().stream_reader(self._raw, read_across_frames=True, closefd=False)
+                self._stream = io.BufferedReader(reader, READ_CHUNK_SIZE)
+            else:
+                self._stream = self._raw
+        except BaseException:
+            self._raw.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    @property
+    def closed(self):
+        return self._raw.closed
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def readline(self, size=-1):
+        return self._stream.readline(size)
+
+    def raw_position(self):
+        return self._raw.tell()
+
+    def close(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+def dumps_json_line(obj, compact=False):
+    """
+    Serialisiert obj als JSONL-Zeile (ohne Zeilenumbruch).
+
+    Standardmäßig wie json.dumps(obj, ensure_ascii=False), also byte-identisch zu den bisherigen
+    Ausgaben. Mit compact=True ohne Leerzeichen nach ',' und ':' und mit orjson, wenn installiert.
+    """
+    if compact:
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(obj).decode('utf-8')
+            except TypeError:  # orjson.JSONEncodeError, z.B. bei Ganzzahlen über 64 Bit
+                pass
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(obj, ensure_ascii=False)
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+def replace_file(temp_path, target_path):
+    """
+    Ersetzt target_path atomar durch temp_path (gleiches Verzeichnis).
+
+    Die Dateirechte einer bestehenden Zieldatei bleiben erhalten; eine neue Datei erhält die
+    üblichen Rechte gemäß umask statt der restriktiven Rechte von mkstemp.
+    """
+    if os.path.exists(target_path):
+        shutil.copymode(target_path, temp_path)
+    else:
+        os.chmod(temp_path, 0o666 & ~_current_umask())
+    os.replace(temp_path, target_path)
+
+class JsonArrayError(ValueError):
+    """Die JSON-Datei enthält auf oberster Ebene keine Liste."""
+
+class JsonlReader:
+    """
+    Liest eine JSONL-Datei zeilenweise und liefert die decodierten Einträge.
+
+    Leere Zeilen werden übersprungen. Zeilen, die kein gültiges JSON enthalten, werden an
+    on_decode_error(zeilennummer, fehler) gemeldet und übersprungen. Komprimierte Dateien
+    (.gz, .zst) werden gestreamt entpackt; bytes_read zählt dann die komprimierten Bytes.
+    """
+
+    def __init__(self, file_path, on_decode_error=None):
+        self.file_path = file_path
+        self.on_decode_error = on_decode_error
+        self.total_bytes = os.path.getsize(file_path)
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.items_read = 0
+        self.decode_errors = 0
+
+    def __iter__(self):
+        with InputFile(self.file_path) as infile:
+            compressed = infile.compression is not None
+            for line_number, raw_line in enumerate(infile, 1):
+                self.lines_read = line_number
+                if compressed:
+                    self.bytes_read = infile.raw_position()
+                else:
+                    self.bytes_read += len(raw_line)
+                try:
+                    line_content = raw_line.decode('utf-8').strip()
+                    if not line_content:  # Skip empty lines
+                        continue
+                    item = json.loads(line_content)
+                except ValueError as e:  # JSONDecodeError und UnicodeDecodeError
+                    self.decode_errors += 1
+                    if self.on_decode_error is not None:
+                        self.on_decode_error(line_number, e)
+                    continue
+                self.items_read += 1
+                yield item
+
+    def progress(self):
+        """Anteil der bereits gelesenen Bytes (0.0 bis 1.0)."""
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+class JsonArrayReader:
+    """
+    Liest eine JSON-Datei, deren oberste Ebene eine Liste ist, Element für Element.
+
+    Die Datei wird blockweise gelesen und jedes Listenelement mit json.JSONDecoder.raw_decode
+    aus dem Puffer decodiert, sodass nur das aktuelle Element und ein Leseblock im Speicher liegen.
+    Ob die Datei mit einer Liste beginnt, wird bereits beim Erzeugen des Lesers geprüft
+    (JsonArrayError bzw. json.JSONDecodeError).
+
+    Mit skip_leading_text=True wird beliebiger Text (z.B. Kommentarzeilen) vor dem ersten '[' oder '{'
+    übersprungen. Beginnt der JSON-Inhalt mit '{', wird das einzelne Objekt als einziges Element
+    geliefert (single_object ist dann True).
+    """
+
+    def __init__(self, file_path, chunk_size=READ_CHUNK_SIZE, skip_leading_text=False):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.skip_leading_text = skip_leading_text
+        self.single_object = False
+        self.total_bytes = os.path.getsize(file_path)
+        self.bytes_read = 0
+        self.items_read = 0
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._file = InputFile(file_path)
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        try:
+            self._read_array_start()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_more(self, size=None):
+        """Hängt den nächsten Block der Datei an den Puffer an. Gibt False zurück, wenn die Datei zu Ende ist."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self.chunk_size)
+        self.bytes_read = self._file.raw_position()
+        if not chunk:
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            self._eof = True
+            return False
+        self._buffer += self._text_decoder.decode(chunk)
+        return True
+
+    def _next_significant_char(self):
+        """Überspringt Leerraum und liefert das nächste Zeichen (oder '' am Dateiende)."""
+        while True:
+            buffer_length = len(self._buffer)
+            while self._position < buffer_length and self._buffer[self._position] in _JSON_WHITESPACE:
+                self._position += 1
+            if self._position < buffer_length:
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ''
+
+    def _skip_to_json_start(self):
+        """Überspringt alles vor dem ersten '[' oder '{' und liefert dieses Zeichen (oder '' am Dateiende)."""
+        while True:
+            starts = [index for index in (self._buffer.find('[', self._position), self._buffer.find('{', self._position)) if index != -1]
+            if starts:
+                self._position = min(starts)
+                return self._buffer[self._position]
+            self._position = len(self._buffer)
+            self._compact_buffer()
+            if not self._read_more():
+                return ''
+
+    def _read_array_start(self):
+        if self.skip_leading_text:
+            char = self._skip_to_json_start()
+            if char == '':
+                raise JsonArrayError("Die Datei enthält weder '[' noch '{'")
+            if char == '{':
+                self.single_object = True
+                return
+        char = self._next_significant_char()
+        if char == '\ufeff':
+            raise json.JSONDecodeError("Unexpected UTF-8 BOM (decode using utf-8-sig)", self._buffer, 0)
+        if char == '':
+            raise json.JSONDecodeError("Expecting value", self._buffer, self._position)
+        if char != '[':
+            raise JsonArrayError("Die JSON-Datei enthält auf oberster Ebene keine Liste")
+        self._position += 1
+
+    def _decode_next_value(self):
+        """Decodiert den nächsten JSON-Wert ab der aktuellen Position und liest bei Bedarf weitere Blöcke nach."""
+        self._next_significant_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as e:
+                # Nur ein Fehler am Pufferende kann von einem unvollständig gelesenen Wert stammen (bei einer
+                # nicht abgeschlossenen Zeichenkette meldet der Decoder deren Anfang). Ein Fehler weiter vorne
+                # hängt nicht vom Rest der Datei ab und wird sofort gemeldet, statt die Datei nachzulesen.
+                possibly_truncated = (e.pos >= len(self._buffer) - _TRUNCATION_MARGIN
+                                      or e.msg.startswith('Unterminated string'))
+                # Bei Dateiende ist der Wert ungültig. Der Puffer wird mindestens verdoppelt, damit sehr
+                # große Elemente linear gelesen werden.
+                if not possibly_truncated or not self._read_more(max(self.chunk_size, len(self._buffer) - self._position)):
+                    raise
+                continue
+            # Zahlen am Pufferende (z.B. "1.5" vor "e10") könnten im nächsten Block weitergehen;
+            # vollständig ist ein Wert erst, wenn ein Trennzeichen folgt oder die Datei zu Ende ist
+            if (end == len(self._buffer) or self._buffer[end] not in _JSON_VALUE_TERMINATORS) and self._read_more():
+                continue
+            self._position = end
+            return value
+
+    def _compact_buffer(self):
+        if self._position > self.chunk_size:
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+
+    def __iter__(self):
+        try:
+            if self.single_object:
+                item = self._decode_next_value()
+                self.items_read += 1
+                yield item
+            elif self._next_significant_char() == ']':
+                self._position += 1
+            else:
+                while True:
+                    item = self._decode_next_value()
+                    self.items_read += 1
+                    self._compact_buffer()
+                    yield item
+                    char = self._next_significant_char()
+                    if char == ',':
+                        self._position += 1
+                        continue
+                    if char == ']':
+                        self._position += 1
+                        break
+                    raise json.JSONDecodeError("Expecting ',' delimiter", self._buffer, self._position)
+            if self._next_significant_char() != '':
+                raise json.JSONDecodeError("Extra data", self._buffer, self._position)
+        finally:
+            self._file.close()
+
+    def progress(self):
+        """Anteil der bereits gelesenen Bytes (0.0 bis 1.0)."""
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+class JsonlSpillFile:
+    """
+    Temporäre JSONL-Datei, an die Zeilen nur angehängt werden, mit Offset-Index.
+
+    Jede Zeile wird sofort auf die Platte geschrieben; im Speicher bleibt pro Zeile nur ihr
+    Start-Offset. Mit copy_lines_to werden anschließend alle oder ausgewählte Zeilen sequentiell
+    in die Ausgabedatei kopiert, zusammenhängende Zeilen dabei blockweise.
+
+    Die Datei wird im angegebenen Verzeichnis angelegt (sinnvollerweise dem der Ausgabedatei),
+    da das Temp-Verzeichnis des Systems im Arbeitsspeicher liegen kann.
+    """
+
+    def __init__(self, directory=None, prefix='.spill-'):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix='.jsonl.tmp', dir=directory or None)
+        self._file = os.fdopen(fd, 'w+b')
+        self._offsets = array('q', [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.discard()
+
+    def append(self, line):
+        """Hängt eine Zeile (ohne Zeilenumbruch) an und gibt ihren Index zurück."""
+        data = line.encode('utf-8') + b'\n'
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return len(self._offsets) - 2
+
+    def _line_runs(self, indices):
+        """Fasst aufsteigende Zeilenindizes zu Bereichen [start, end) aufeinanderfolgender Zeilen zusammen."""
+        run_start = run_end = None
+        for index in indices:
+            if index == run_end:
+                run_end += 1
+                continue
+            if run_start is not None:
+                yield run_start, run_end
+            run_start, run_end = index, index + 1
+        if run_start is not None:
+            yield run_start, run_end
+
+    def byte_offset(self, index):
+        """Start-Offset der Zeile index in der Auslagerungsdatei (len(self) liefert das Dateiende)."""
+        return self._offsets[index]
+
+    def copy_bytes_to(self, target, offset, length):
+        """Kopiert einen Bytebereich der Auslagerungsdatei an die aktuelle Position der Binärdatei target."""
+        self._file.flush()
+        copy_file_range(self._file, target, offset, length)
+        self._file.seek(0, os.SEEK_END)
+
+    def copy_lines_to(self, output_path, indices=None):
+        """
+        Schreibt die Zeilen mit den angegebenen Indizes (aufsteigend) nach output_path.
+
+        Args:
+            output_path: Pfad der Ausgabedatei (wird überschrieben)
+            indices: Aufsteigende Zeilenindizes oder None für alle Zeilen
+
+        Returns:
+            Anzahl der geschriebenen Bytes
+        """
+        self._file.flush()
+        runs = [(0, len(self))] if indices is None else self._line_runs(indices)
+        bytes_written = 0
+        with JsonlWriter(output_path, atomic=True) as writer:
+            for start, end in runs:
+                length = self._offsets[end] - self._offsets[start]
+                writer.copy_from(self._file, self._offsets[start], length)
+                bytes_written += length
+        self._file.seek(0, os.SEEK_END)
+        return bytes_written
+
+    def discard(self):
+        """Schließt und löscht die Auslagerungsdatei."""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+class JsonlWriter:
+    """
+    Schreibt JSONL-Zeilen gepuffert in eine Datei.
+
+    Die codierten Zeilen werden gesammelt und ab WRITE_BUFFER_SIZE Bytes in einem einzigen
+    Schreibaufruf ausgegeben. Mit atomic=True wird in eine temporäre Datei im Zielverzeichnis
+    geschrieben, die erst bei close() die Zieldatei ersetzt; bei einem Fehler (Verlassen des
+    with-Blocks durch eine Ausnahme oder discard()) bleibt eine bestehende Zieldatei unverändert.
+
+    Endet path auf .gz oder .zst, wird komprimiert geschrieben. Bei gzip wird jeder Block in einem
+    Thread-Pool mit threads Threads (Standard: Anzahl der CPUs) als eigenes gzip-Member komprimiert
+    und in Eingabereihenfolge geschrieben; zstd verwendet die Worker-Threads von zstandard.
+
+    Mit compact=True schreibt write kompakte Zeilen (siehe dumps_json_line).
+
+    Attribute lines_written und bytes_written zählen die geschriebenen Zeilen und (unkomprimierten)
+    Bytes (ohne mit copy_from kopierte Bereiche bei lines_written).
+    """
+
+    def __init__(self, path, atomic=False, buffer_size=WRITE_BUFFER_SIZE, threads=None, compact=False):
+        check_compression_support(path)
+        self.path = path
+        self.atomic = atomic
+        self.compact = compact
+        self.buffer_size = buffer_size
+        self.compression = compression_for_path(path)
+        self.lines_written = 0
+        self.bytes_written = 0
+        self._pending = []
+        self._pending_size = 0
+        threads = threads or os.cpu_count() or 1
+        if atomic:
+            fd, self._write_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                                                    dir=os.path.dirname(path) or None)
+            self._file = os.fdopen(fd, 'wb')
+        else:
+            self._write_path = path
+            self._file = open(path, 'wb')
+        self._compressor = None
+        self._gzip_executor = None
+        self._gzip_blocks = deque()
+        self._max_gzip_blocks = 2 * threads
+        if self.compression == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=threads if threads > 1 else 0)
+            self._compressor = compressor.stream_writer(self._file, closefd=False)
+        elif self.compression == 'gzip' and threads > 1:
+            self._gzip_executor = ThreadPoolExecutor(max_workers=threads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _append(self, data):
+        self._pending.append(data)
+        self._pending_size += len(data)
+        self.bytes_written += len(data)
+        if self._pending_size >= self.buffer_size:
+            self.flush()
+
+    def write(self, obj):
+        """Serialisiert obj (siehe dumps_json_line, kompakt bei compact=True) und schreibt es als Zeile."""
+        self.write_line(dumps_json_line(obj, compact=self.compact))
+
+    def write_line(self, line):
+        """Schreibt eine bereits serialisierte Zeile (ohne Zeilenumbruch)."""
+        self._append(line.encode('utf-8') + b'\n')
+        self.lines_written += 1
+
+    def write_text(self, text):
+        """Schreibt Text unverändert (z.B. die Klammern und Trennzeichen einer JSON-Liste)."""
+        self._append(text.encode('utf-8'))
+
+    def copy_from(self, source, offset, length):
+        """Kopiert length Bytes ab offset aus der Binärdatei source (vollständige Zeilen) in die Ausgabe."""
+        if self.compression is None:
+            self.flush()
+            copy_file_range(source, self._file, offset, length)
+            self.bytes_written += length
+        else:
+            for chunk in _iter_file_range(source, offset, length):
+                self._append(chunk)
+
+    def _write_block(self, data):
+        if self.compression == 'zstd':
+            self._compressor.write(data)
+        elif self.compression == 'gzip':
+            if self._gzip_executor is None:
+                self._file.write(gzip.compress(data, GZIP_COMPRESSLEVEL, mtime=0))
+                return
+            # zlib gibt während der Komprimierung den GIL frei; die Blöcke werden in Reihenfolge geschrieben
+            self._gzip_blocks.append(self._gzip_executor.submit(gzip.compress, data, GZIP_COMPRESSLEVEL, mtime=0))
+            while len(self._gzip_blocks) > self._max_gzip_blocks:
+                self._file.write(self._gzip_blocks.popleft().result())
+        else:
+            self._file.write(data)
+
+    def flush(self):
+        """Schreibt die gesammelten Zeilen in die Datei."""
+        if self._pending:
+            self._write_block(b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def _finish_compression(self):
+        while self._gzip_blocks:
+            self._file.write(self._gzip_blocks.popleft().result())
+        if self._compressor is not None:
+            self._compressor.close()  # Schließt den zstd-Frame ab; die Datei bleibt offen
+            self._compressor = None
+
+    def _shutdown_executor(self):
+        if self._gzip_executor is not None:
+            for block in self._gzip_blocks:
+                block.cancel()
+            self._gzip_blocks.clear()
+            self._gzip_executor.shutdown(wait=True)
+            self._gzip_executor = None
+
+    def close(self):
+        """Schreibt ausstehende Zeilen, schließt die Datei und ersetzt bei atomic=True die Zieldatei."""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+            self._finish_compression()
+        except BaseException:
+            self.discard()
+            raise
+        self._shutdown_executor()
+        self._file.close()
+        if self.atomic:
+            try:
+                replace_file(self._write_path, self.path)
+            except BaseException:
+                self._remove_temp_file()
+                raise
+
+    def discard(self):
+        """Schließt die Datei ohne Abschluss; bei atomic=True wird die temporäre Datei gelöscht."""
+        if self._file.closed:
+            return
+        self._pending = []
+        self._pending_size = 0
+        self._shutdown_executor()
+        self._compressor = None
+        self._file.close()
+        if self.atomic:
+            self._remove_temp_file()
+
+    def _remove_temp_file(self):
+        try:
+            os.remove(self._write_path)
+        except FileNotFoundError:
+            pass
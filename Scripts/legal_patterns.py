@@ -0,0 +1,315 @@
+"""
+Zentrales Register der regulären Ausdrücke für die Segmentierung juristischer Gutachtentexte.
+Wird von segment_and_prepare_training_data.py und semantic_segmentation.py gemeinsam genutzt.
+
+Alle Muster werden einmalig beim Import kompiliert. Für Profiling-Zwecke kann mit
+enable_pattern_stats() pro Muster gezählt werden, wie oft es angewendet wurde und wie oft
+es getroffen hat; dump_pattern_stats() gibt die Zählerstände aus.
+"""
+
+import re
+import sys
+
+# Zähler werden nur erfasst, wenn sie explizit aktiviert wurden (z.B. über --pattern-stats)
+_PATTERN_STATS_ENABLED = False
+
+# Alle registrierten Muster in Registrierungsreihenfolge: Name -> RegisteredPattern
+PATTERN_REGISTRY = {}
+
+class RegisteredPattern:
+    """
+    Vorkompiliertes Regex-Muster mit Aufruf- und Trefferzähler.
+
+    Bietet die gebräuchlichen Methoden eines kompilierten Musters (search, match, fullmatch,
+    finditer, findall, split, sub). Ohne aktivierte Statistik wird direkt an das kompilierte
+    Muster delegiert.
+    """
+    __slots__ = ('name', 'regex', 'calls', 'hits')
+
+    def __init__(self, name, pattern, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.calls = 0
+        self.hits = 0
+
+    @property
+    def pattern(self):
+        return self.regex.pattern
+
+    def _record(self, hits):
+        self.calls += 1
+        self.hits += hits
+
+    def search(self, string, *args):
+        match = self.regex.search(string, *args)
+        if _PATTERN_STATS_ENABLED:
+            self._record(match is not None)
+        return match
+
+    def match(self, string, *args):
+        match = self.regex.match(string, *args)
+        if _PATTERN_STATS_ENABLED:
+            self._record(match is not None)
+        return match
+
+    def fullmatch(self, string, *args):
+        match = self.regex.fullmatch(string, *args)
+        if _PATTERN_STATS_ENABLED:
+            self._record(match is not None)
+        return match
+
+    def finditer(self, string, *args):
+        if not _PATTERN_STATS_ENABLED:
+            return self.regex.finditer(string, *args)
+        return self._counted_finditer(string, *args)
+
+    def _counted_finditer(self, string, *args):
+        self.calls += 1
+        for match in self.regex.finditer(string, *args):
+            self.hits += 1
+            yield match
+
+    def findall(self, string, *args):
+        matches = self.regex.findall(string, *args)
+        if _PATTERN_STATS_ENABLED:
+            self._record(len(matches))
+        return matches
+
+    def split(self, string, maxsplit=0):
+        parts = self.regex.split(string, maxsplit)
+        if _PATTERN_STATS_ENABLED:
+            self._record((len(parts) - 1) // (self.regex.groups + 1))
+        return parts
+
+    def sub(self, repl, string, count=0):
+        result, replacements = self.regex.subn(repl, string, count)
+        if _PATTERN_STATS_ENABLED:
+            self._record(replacements)
+        return result
+
+def register_pattern(name, pattern, flags=0):
+    """
+    Kompiliert ein Muster und nimmt es in das Register auf.
+
+    Args:
+        name: Eindeutiger Name des Musters (erscheint in der Statistik)
+        pattern: Regex-Muster als String
+        flags: Regex-Flags wie re.MULTILINE
+
+    Returns:
+        Das registrierte Muster
+    """
+    if name in PATTERN_REGISTRY:
+        raise ValueError(f"Muster '{name}' ist bereits registriert")
+    registered = RegisteredPattern(name, pattern, flags)
+    PATTERN_REGISTRY[name] = registered
+    return registered
+
+def enable_pattern_stats(enabled=True):
+    """Aktiviert (oder deaktiviert) die Zählung von Aufrufen und Treffern aller registrierten Muster."""
+    global _PATTERN_STATS_ENABLED
+    _PATTERN_STATS_ENABLED = enabled
+
+def pattern_stats_enabled():
+    """Gibt an, ob die Zählung von Aufrufen und Treffern aktiviert ist."""
+    return _PATTERN_STATS_ENABLED
+
+def reset_pattern_stats():
+    """Setzt die Zähler aller registrierten Muster zurück."""
+    for registered in PATTERN_REGISTRY.values():
+        registered.calls = 0
+        registered.hits = 0
+
+def get_pattern_stats():
+    """
+    Liefert die aktuellen Zählerstände aller registrierten Muster.
+
+    Returns:
+        Ein Dictionary Name -> {'calls': ..., 'hits': ...}
+    """
+    return {name: {'calls': registered.calls, 'hits': registered.hits}
+            for name, registered in PATTERN_REGISTRY.items()}
+
+def merge_pattern_stats(stats):
+    """
+    Addiert Zählerstände (z.B. aus Worker-Prozessen) zu den Zählern der registrierten Muster.
+
+    Args:
+        stats: Dictionary im Format von get_pattern_stats()
+    """
+    for name, counts in stats.items():
+        registered = PATTERN_REGISTRY.get(name)
+        if registered is not None:
+            registered.calls += counts['calls']
+            registered.hits += counts['hits']
+
+def dump_pattern_stats(file=None):
+    """
+    Gibt die Zählerstände aller registrierten Muster als Tabelle aus, sortiert nach Anzahl der Aufrufe.
+
+    Args:
+        file: Ausgabestrom (Standard: sys.stdout)
+    """
+    file = file or sys.stdout
+    rows = sorted(PATTERN_REGISTRY.values(), key=lambda registered: (-registered.calls, registered.name))
+    name_width = max((len(registered.name) for registered in rows), default=6)
+    print(f"{'Muster':<{name_width}}  {'Aufrufe':>10}  {'Treffer':>10}", file=file)
+    for registered in rows:
+        print(f"{registered.name:<{name_width}}  {registered.calls:>10}  {registered.hits:>10}", file=file)
+
+
+# ---- STRUKTURMUSTER FÜR segment_text (segment_and_prepare_training_data.py) ----
+
+# Hauptüberschriften (römische Zahlen, Abschnittsmuster)
+MAJOR_HEADING_PATTERN = register_pattern(
+    'major_heading',
+    r"^((?:[A-Z]\.|[IVX]+\.|[0-9]+\.)\s+.{1,80}|"
+    r"I\. Sachverhalt|II\. Rechtliche Würdigung|III\.|IV\.)\s*[:.]?\s*$",
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Nummerierte Überschriften (1., 2., etc. oder 1.1, 1.2, etc.)
+NUMBERED_HEADING_PATTERN = register_pattern('numbered_heading', r"^(?:\d+)\.(?:\d+)?(?:\d+)?\s+", re.MULTILINE)
+
+# Gesetzesverweise als potenzielle Abschnittsgrenzen
+LAW_REFERENCE_LINE_PATTERN = register_pattern('law_reference_line', r"^(?:§|Art\.?|Artikel)\s*\d+.*?$", re.MULTILINE)
+
+# Erweiterte Erkennung von juristischen Spezifikationen
+SPECIFICATION_PATTERN = register_pattern(
+    'specification',
+    r"^(Im Sinne von|In Anwendung von|Nach|Gemäß|Laut|Entsprechend)\s+(?:§|Art\.?|Artikel)\s*\d+.*?$",
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Schlüsselwörter wie "Sachverhalt", "Frage", etc. - erweiterte Liste
+KEYWORD_HEADING_PATTERN = register_pattern(
+    'keyword_heading',
+    r"^(Sachverhalt|Frage(?:n)?|Zur Rechtslage|Rechtslage|Ergebnis|Lösung|Beurteilung|"
+    r"Tenor|Einleitung|Zusammenfassung|Fazit|Gutachten|Begründung|Stellungnahme|"
+    r"Gründe|Entscheidungsgründe|Tatbestand|Anmerkung|Anwendbares Recht|Auslegung|"
+    r"Subsumtion|Voraussetzungen|Rechtsgrundlage|Materielles Recht|Formelles Recht|"
+    r"Prozessvoraussetzungen|Zulässigkeit|Begründetheit|Anspruchsgrundlage|Prüfung|"
+    r"Rechtliche Grundlagen|Gutachterlicher Teil|Erläuterung|Rechtsfolge(?:n)?|"
+    r"Antragsstellung|Verhältnismäßigkeit|Schadensersatzanspruch|"
+    r"Gesetzliche Grundlage|Haftung|Streitgegenstand|Problematik|"
+    r"Normzweck|Normauslegung|Art und Weise|Analyse|Kurzes Fazit|Beweiserhebung"
+    r")[\s:.]",
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Juristische Wendungen, die typischerweise Abschnitte einleiten
+LEGAL_PHRASE_PATTERN = register_pattern(
+    'legal_phrase',
+    r"^(Hiermit erstatte ich folgendes Rechtsgutachten|"
+    r"In der vorliegenden Rechtssache|"
+    r"Das vorliegende Gutachten behandelt die Frage|"
+    r"Ich wurde gebeten, zu folgender Rechtsfrage|"
+    r"In der Angelegenheit|"
+    r"Folgender Sachverhalt liegt vor|"
+    r"Zunächst ist festzustellen|"
+    r"Der Senat hat hierzu folgendes entschieden|"
+    r"Anders als im Urteil des|"
+    r"Es gilt zu prüfen|"
+    r"Im Ergebnis ist festzuhalten|"
+    r"In der Entscheidung vom)"
+)
+
+# Strukturierte Entscheidungsmuster
+DECISION_PATTERN = register_pattern(
+    'decision',
+    r"^(Die Kammer|Der Senat|Das Gericht|Im Ergebnis|Zusammenfassend|"
+    r"Im Tenor|Gemäß ständiger Rechtsprechung|Die herrschende Meinung|"
+    r"Abweichend hiervon|Im Unterschied zu|Im Gegensatz zur Auffassung|"
+    r"Dem Antrag folgend|Im Sinne des Gesetzgebers)"
+)
+
+# Aufteilung des normen-Felds in Gesetz und Paragraph für die Prompt-Generierung
+NORM_PATTERN = register_pattern(
+    'norm',
+    r'([A-Za-zÄÖÜäöüß]+(?:\s*\d*)?)\s*(?:§|Art\.?|Artikel)?\s*(\d+(?:\w*)?)',
+    re.IGNORECASE
+)
+
+
+# ---- MUSTER FÜR detect_logical_segments (semantic_segmentation.py) ----
+
+# Schlüsselwörter, die typischerweise einen neuen Abschnitt in juristischen Texten einleiten.
+# Sie werden zu einer einzigen Alternation zusammengefasst, die an Wortgrenzen verankert ist.
+LEGAL_SECTION_MARKERS = (
+    # Allgemeine Übergangsmarker
+    r"[Ii]m [Ff]olgenden", r"[Zz]unächst", r"[Ii]m [Ee]rgebnis", r"[Ff]erner",
+    r"[Dd]es [Ww]eiteren", r"[Ii]m [Üü]brigen", r"[Dd]arüber hinaus",
+    r"[Ss]chließlich", r"[Zz]usammenfassend", r"[Aa]bschließend",
+    r"[Ee]ine andere [Ff]rage", r"[Zz]u [Bb]eachten ist", r"[Hh]iergegen",
+    r"[Aa]nders als", r"[Ii]m [Gg]egensatz", r"[Zz]u [Pp]rüfen ist",
+    r"[Ee]s bleibt [Ff]estzuhalten", r"[Ee]s ist noch [Aa]nzumerken",
+    r"[Aa]us den genannten [Gg]ründen", r"[Mm]aßgeblich ist",
+
+    # Ergänzte Marker für spezifische Strukturen in Rechtsgutachten
+    r"[Dd]ie [Pp]rüfung ergibt", r"[Dd]ie [Bb]eurteilung", r"[Ii]n [Bb]ezug auf",
+    r"[Nn]unmehr", r"[Dd]emnach", r"[Ff]olglich", r"[Dd]araus ergibt sich",
+    r"[Ee]s ist davon auszugehen", r"[Ee]ine [Aa]usnahme", r"[Ii]m [Gg]rundsatz",
+    r"[Gg]rundsätzlich", r"[Ww]eiterhin", r"[Aa]llerdings", r"[Jj]edoch",
+    r"[Dd]emzufolge", r"[Dd]iesem [Gg]rundsatz folgend",
+    r"[Uu]nter [Bb]erücksichtigung", r"[Ii]n [Aa]nbetracht",
+
+    # Gutachtenspezifische strukturelle Marker
+    r"[Dd]ie [Rr]echtsfolge", r"[Dd]er [Tt]atbestand", r"[Dd]ie [Tt]atbestandsmerkmale",
+    r"[Ff]raglich ist [Ff]olgendes", r"[Ii]m [Mm]ittelpunkt steht", r"[Zz]entral ist",
+    r"[Dd]abei ist zu beachten", r"[Aa]us rechtlicher [Ss]icht", r"[Dd]ies führt zu",
+    r"[Ii]n der [Ss]ache gilt", r"[Rr]echtlich gesehen",
+
+    # Fortgeschrittene normbasierte Marker
+    r"[Dd]er Anwendungsbereich des", r"[Dd]ie [Vv]oraussetzungen des",
+    r"[Nn]ach ständiger [Rr]echtsprechung", r"[Dd]ie herrschende [Mm]einung",
+    r"[Ii]m [Ss]chrifttum wird vertreten", r"[Nn]ach der [Gg]esetzesbegründung",
+)
+LEGAL_SECTION_MARKER_PATTERN = register_pattern(
+    'legal_section_marker', r"\b(?:" + "|".join(LEGAL_SECTION_MARKERS) + r")\b")
+
+# Absatztrennung (Leerzeilen bzw. Zeilen nur aus Leerraum)
+PARAGRAPH_SPLIT_PATTERN = register_pattern('paragraph_split', r'(\n\s*\n|\n\s{3,}\n)')
+
+# Kurze Überschriften aus großgeschriebenen Wörtern
+CAPITALIZED_HEADING_PATTERN = register_pattern('capitalized_heading', r'^[A-Z][a-z]*(\s+[A-Z][a-z]*)+$')
+
+# Satzgrenzen zum Aufteilen zu langer Segmente
+SENTENCE_SPLIT_PATTERN = register_pattern('sentence_split', r'(?<=[.!?])\s+')
+
+# Leerraum-Normalisierung
+WHITESPACE_PATTERN = register_pattern('whitespace', r'\s+')
+
+
+# ---- MUSTER FÜR enhanced_segment_text (semantic_segmentation.py) ----
+
+# Kontextuelle Muster im ersten Absatz eines semantischen Untersegments (auf kleingeschriebenem Text)
+SUBSEGMENT_EXAMINATION_START_PATTERN = register_pattern(
+    'subsegment_examination_start',
+    r'(?:im folgenden|zunächst|dabei) (?:ist|wird|soll|möchte ich) (?:zu )?(?:prüfen|untersuchen|klären|erörtern)')
+SUBSEGMENT_RESULT_PATTERN = register_pattern(
+    'subsegment_result',
+    r'(?:im ergebnis|zusammenfassend|abschließend|daher|somit|demnach) (?:ist|lässt sich|kann) '
+    r'(?:fest(?:zu)?halten|festzustellen|feststellen|sagen|konstatieren)')
+SUBSEGMENT_LEGAL_QUESTION_PATTERN = register_pattern(
+    'subsegment_legal_question',
+    r'(?:fraglich|problematisch|umstritten|zu klären) ist(?: (?:dabei|hier|nunmehr|also|jedoch|demnach))?, ob')
+SUBSEGMENT_EXAMINATION_STEP_PATTERN = register_pattern(
+    'subsegment_examination_step',
+    r'(?:es gilt|zu prüfen ist|zu untersuchen ist|geprüft werden muss|geklärt werden muss)')
+
+# Muster am Anfang eines Segments für die Klassifizierung (auf kleingeschriebenem Text)
+SEGMENT_QUESTION_PATTERN = register_pattern(
+    'segment_question', r'(?:zu\s+)?(?:prüfen|untersuchen|beantworten)\s+(?:ist|sei|wäre)')
+SEGMENT_RESULT_PATTERN = register_pattern(
+    'segment_result',
+    r'(?:im\s+ergebnis|zusammenfassend|abschließend|somit)(?:\s+ist|\s+lässt\s+sich|\s+kann\s+festgehalten\s+werden)')
+SEGMENT_NORM_PATTERN = register_pattern('segment_norm', r'(?:nach|gemäß|laut|entsprechend)\s+§\s*\d+')
+SEGMENT_FACTS_PATTERN = register_pattern(
+    'segment_facts', r'(?:es\s+handelt\s+sich|vorliegend\s+geht\s+es|der\s+fall|im\s+vorliegenden\s+fall)')
+
+# Gesetzesreferenzen für den Kontext in Überschriften (z.B. "§ 433 BGB")
+LAW_REFERENCE_PATTERN = register_pattern('law_reference', r'§\s*\d+[a-z]?\s*(?:[A-Za-zäöüÄÖÜß]+)')
+
+# Potenzielle Überschrift am Segmentanfang
+POTENTIAL_HEADING_PATTERN = register_pattern(
+    'potential_heading', r'^([A-Z][a-zäöüß]+(?: [A-Za-zÄÖÜäöüß]+){1,5})[\.\n]')
@@ -0,0 +1,138 @@
+"""
+Gliederungsindex eines Gutachtentextes.
+
+Ein SectionOutline durchsucht den Text einmal nach Überschriften und speichert nur deren
+Positionen. Abschnitte werden erst auf Anfrage als Bereich (Start, Ende) bestimmt und nur dann
+aus dem Text geschnitten, wenn ihr Inhalt tatsächlich gebraucht wird; umgebender Leerraum wird
+über die Offsets entfernt, nicht über str.strip() auf einer Kopie.
+
+RomanOutline beschränkt den Index auf die oberste Gliederungsebene I., II., III., ...: Es wird
+die erste eigenständige Ziffer I. genommen, dann die erste II. dahinter usw. Jeder Abschnitt reicht
+bis zur nächsten Überschrift dieser Kette oder bis zum Textende. Verwendet von dataset_splitter.py
+(Abschnitte I und II) und, mit MAJOR_HEADING_PATTERN, von segment_text in
+segment_and_prepare_training_data.py.
+"""
+
+_ROMAN_NUMERALS = ((1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'), (100, 'C'), (90, 'XC'),
+                   (50, 'L'), (40, 'XL'), (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I'))
+
+def int_to_roman(number):
+    """Wandelt eine positive Ganzzahl in eine römische Zahl um (z.B. 14 -> 'XIV')."""
+    numeral = []
+    for value, symbol in _ROMAN_NUMERALS:
+        count, number = divmod(number, value)
+        numeral.append(symbol * count)
+    return ''.join(numeral)
+
+def _stripped_span(text, start, end):
+    """Verkleinert den Bereich [start, end) um führenden und folgenden Leerraum."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+class SectionOutline:
+    """
+    Positionen aller Überschriften eines Textes, die ein Muster findet.
+
+    Args:
+        text: Der Gutachtentext
+        pattern: Überschriftenmuster (aus legal_patterns) mit genau einer Gruppe für die Überschrift
+
+    Die i-te Überschrift belegt den Bereich heading_span(i); ihr Abschnitt reicht bis zum Beginn
+    der nächsten Überschrift bzw. bis zum Textende.
+    """
+    __slots__ = ('text', '_starts', '_ends', '_labels')
+
+    def __init__(self, text, pattern):
+        self.text = text
+        self._starts = []
+        self._ends = []
+        self._labels = []
+        for match in pattern.finditer(text):
+            self._starts.append(match.start())
+            self._ends.append(match.end())
+            self._labels.append(match.group(1))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def label(self, index):
+        """Text der Überschriftengruppe der index-ten Überschrift (z.B. 'II')."""
+        return self._labels[index]
+
+    def heading_span(self, index):
+        return self._starts[index], self._ends[index]
+
+    def content_span(self, index, strip=True):
+        """Bereich des Abschnitts nach der index-ten Überschrift, ohne umgebenden Leerraum, wenn strip."""
+        start = self._ends[index]
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else len(self.text)
+        return _stripped_span(self.text, start, end) if strip else (start, end)
+
+    def content(self, index, strip=True):
+        start, end = self.content_span(index, strip)
+        return self.text[start:end]
+
+    def preamble(self):
+        """Text vor der ersten Überschrift (der ganze Text, wenn es keine gibt)."""
+        return self.text[:self._starts[0]] if self._starts else self.text
+
+    def split(self):
+        """
+        Entspricht pattern.split(text) für ein Muster mit einer Gruppe: Einleitung, dann abwechselnd
+        Überschrift und nachfolgender Text.
+        """
+        parts = [self.preamble()]
+        for index, label in enumerate(self._labels):
+            parts.append(label)
+            parts.append(self.content(index, strip=False))
+        return parts
+
+class RomanOutline(SectionOutline):
+    """
+    Oberste römische Gliederungsebene (I., II., III., ...) eines Textes, bestimmt in einem Durchlauf.
+
+    Eine Gliederungsziffer zählt nur als eigenständiges Wort (am Textanfang oder nach Leerraum, gefolgt
+    von Leerraum), "I." in "II." oder "III." also nicht; Zeilenumbrüche sind nicht erforderlich, da viele
+    Gutachtentexte einzeilig vorliegen. Gesucht wird jeweils nur die nächste Nummer der Kette mit
+    str.find ab der vorigen Überschrift, sodass der Text insgesamt nur einmal vorwärts gelesen wird.
+
+    section(number) liefert den Inhalt des Abschnitts mit der Nummer number (1 für I.) ohne
+    Überschrift, oder einen leeren String, wenn es ihn nicht gibt.
+    """
+    __slots__ = ()
+
+    def __init__(self, text):
+        self.text = text
+        self._starts = []
+        self._ends = []
+        self._labels = []
+        position = 0
+        while True:
+            numeral = int_to_roman(len(self._starts) + 1)
+            marker = numeral + '.'
+            start = text.find(marker, position)
+            while start != -1 and not self._is_heading(start, start + len(marker)):
+                start = text.find(marker, start + 1)
+            if start == -1:
+                break
+            position = start + len(marker)
+            self._starts.append(start)
+            self._ends.append(position)
+            self._labels.append(numeral)
+
+    def _is_heading(self, start, end):
+        text = self.text
+        return (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace())
+
+    def section_span(self, number):
+        """Bereich des Abschnitts number ohne Überschrift und Leerraum; (0, 0), wenn es ihn nicht gibt."""
+        if not 1 <= number <= len(self):
+            return 0, 0
+        return self.content_span(number - 1)
+
+    def section(self, number):
+        start, end = self.section_span(number)
+        return self.text[start:end]
@@ -30,15 +30,40 @@ Author: LegalTech Team
 import json
 import argparse
 import os
-import re
 import sys
 import traceback
 import datetime
 import math
-from collections import defaultdict
+import io
+import contextlib
+import hashlib
+import inspect
+import sqlite3
+from collections import defaultdict, deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from legal_patterns import (
+    MAJOR_HEADING_PATTERN, NUMBERED_HEADING_PATTERN, LAW_REFERENCE_LINE_PATTERN, SPECIFICATION_PATTERN,
+    KEYWORD_HEADING_PATTERN, NORM_PATTERN,
+    enable_pattern_stats, pattern_stats_enabled, reset_pattern_stats, get_pattern_stats,
+    merge_pattern_stats, dump_pattern_stats,
+)
+import jsonl_io
+from jsonl_io import (JsonlReader, JsonArrayReader, JsonArrayError, JsonlSpillFile, JsonlWriter, dumps_json_line,
+                      COMPRESSION_SUFFIXES, check_compression_support, split_compression_suffix)
+from token_counter import TOKEN_COUNTER_CHOICES, CharTokenCounter, create_token_counter
+from token_packing import PACKING_METHODS, pack_items, pack_items_stratified
+from segmentation_cache import SegmentationCache
+from section_outline import SectionOutline
+from incremental_output import IncrementalOutput, item_content_hash
+import legal_patterns
+import section_outline
 
 # Importiere die erweiterte semantische Segmentierung
 try:
+    import semantic_segmentation
     from semantic_segmentation import enhanced_segment_text
     ENHANCED_SEGMENTATION_AVAILABLE = True
 except ImportError:
@@ -48,6 +73,12 @@ except ImportError:
 if os.name == 'nt':
     os.system('')
 
+# Anzahl der Einträge, die bei --workers gemeinsam an einen Worker-Prozess übergeben werden
+PARALLEL_CHUNK_SIZE = 8
+
+# Fortschrittsanzeige alle PROGRESS_INTERVAL Elemente
+PROGRESS_INTERVAL = 10
+
 class Colors:
     HEADER = '\033[95m'
     OKBLUE = '\033[94m'
@@ -179,65 +210,13 @@ def segment_text(text_content):
     """
     sections = []
     
-    # ---- ERWEITERTE HEURISTISCHE PATTERN-ERKENNUNG ----
+    # Die Strukturmuster (Überschriften, Gesetzesverweise, Schlüsselwörter) sind in legal_patterns einmalig vorkompiliert
     
-    # Hauptüberschriften (römische Zahlen, Abschnittsmuster)
-    major_heading_pattern = re.compile(
-        r"^((?:[A-Z]\.|[IVX]+\.|[0-9]+\.)\s+.{1,80}|"
-        r"I\. Sachverhalt|II\. Rechtliche Würdigung|III\.|IV\.)\s*[:.]?\s*$",
-        re.MULTILINE | re.IGNORECASE
-    )
-    
-    # Nummerierte Überschriften (1., 2., etc. oder 1.1, 1.2, etc.)
-    numbered_heading_pattern = re.compile(r"^(?:\d+)\.(?:\d+)?(?:\d+)?\s+", re.MULTILINE)
-    
-    # Gesetzesverweise als potenzielle Abschnittsgrenzen
-    law_reference_pattern = re.compile(r"^(?:§|Art\.?|Artikel)\s*\d+.*?$", re.MULTILINE)
-    
-    # Erweiterte Erkennung von juristischen Spezifikationen 
-    specification_pattern = re.compile(r"^(Im Sinne von|In Anwendung von|Nach|Gemäß|Laut|Entsprechend)\s+(?:§|Art\.?|Artikel)\s*\d+.*?$", re.MULTILINE | re.IGNORECASE)
-    
-    # Schlüsselwörter wie "Sachverhalt", "Frage", etc. - erweiterte Liste
-    keyword_heading_pattern = re.compile(
-        r"^(Sachverhalt|Frage(?:n)?|Zur Rechtslage|Rechtslage|Ergebnis|Lösung|Beurteilung|"
-        r"Tenor|Einleitung|Zusammenfassung|Fazit|Gutachten|Begründung|Stellungnahme|"
-        r"Gründe|Entscheidungsgründe|Tatbestand|Anmerkung|Anwendbares Recht|Auslegung|"
-        r"Subsumtion|Voraussetzungen|Rechtsgrundlage|Materielles Recht|Formelles Recht|"
-        r"Prozessvoraussetzungen|Zulässigkeit|Begründetheit|Anspruchsgrundlage|Prüfung|"
-        r"Rechtliche Grundlagen|Gutachterlicher Teil|Erläuterung|Rechtsfolge(?:n)?|"
-        r"Antragsstellung|Verhältnismäßigkeit|Schadensersatzanspruch|"
-        r"Gesetzliche Grundlage|Haftung|Streitgegenstand|Problematik|"
-        r"Normzweck|Normauslegung|Art und Weise|Analyse|Kurzes Fazit|Beweiserhebung"
-        r")[\s:.]",
-        re.MULTILINE | re.IGNORECASE
-    )
-    
-    # Juristische Wendungen, die typischerweise Abschnitte einleiten
-    legal_phrase_pattern = re.compile(
-        r"^(Hiermit erstatte ich folgendes Rechtsgutachten|"
-        r"In der vorliegenden Rechtssache|"
-        r"Das vorliegende Gutachten behandelt die Frage|"
-        r"Ich wurde gebeten, zu folgender Rechtsfrage|"
-        r"In der Angelegenheit|"
-        r"Folgender Sachverhalt liegt vor|"
-        r"Zunächst ist festzustellen|"
-        r"Der Senat hat hierzu folgendes entschieden|"
-        r"Anders als im Urteil des|"
-        r"Es gilt zu prüfen|"
-        r"Im Ergebnis ist festzuhalten|"
-        r"In der Entscheidung vom)"
-    )
-    
-    # Strukturierte Entscheidungsmuster
-    decision_pattern = re.compile(
-        r"^(Die Kammer|Der Senat|Das Gericht|Im Ergebnis|Zusammenfassend|"
-        r"Im Tenor|Gemäß ständiger Rechtsprechung|Die herrschende Meinung|"
-        r"Abweichend hiervon|Im Unterschied zu|Im Gegensatz zur Auffassung|"
-        r"Dem Antrag folgend|Im Sinne des Gesetzgebers)")
-
-    # Suche zunächst nach Hauptüberschriften (römische Zahlen, Buchstaben)
-    parts = major_heading_pattern.split(text_content)
-    headings_markers = major_heading_pattern.findall(text_content)
+    # Suche zunächst nach Hauptüberschriften (römische Zahlen, Buchstaben); der Gliederungsindex
+    # durchsucht den Text dafür nur einmal und liefert Überschriften und Textteile wie split/findall
+    outline = SectionOutline(text_content, MAJOR_HEADING_PATTERN)
+    parts = outline.split()
+    headings_markers = [outline.label(index) for index in range(len(outline))]
 
     if len(parts) > 1:
         # Es wurden Hauptüberschriften gefunden
@@ -260,8 +239,8 @@ def segment_text(text_content):
     
     # Wenn keine Hauptüberschriften gefunden wurden, versuche nummerierte Überschriften
     elif not sections:
-        parts = numbered_heading_pattern.split(text_content)
-        headings_markers = numbered_heading_pattern.findall(text_content)
+        parts = NUMBERED_HEADING_PATTERN.split(text_content)
+        headings_markers = NUMBERED_HEADING_PATTERN.findall(text_content)
         
         if len(parts) > 1:
             # Es wurden nummerierte Überschriften gefunden
@@ -284,7 +263,7 @@ def segment_text(text_content):
 
         # Wenn keine nummerierten Überschriften gefunden wurden, versuche Schlüsselwörter
         if not sections:
-            kw_matches = list(keyword_heading_pattern.finditer(text_content))
+            kw_matches = list(KEYWORD_HEADING_PATTERN.finditer(text_content))
             
             if kw_matches:
                 # Es wurden Schlüsselwörter gefunden
@@ -323,7 +302,7 @@ def segment_text(text_content):
             
             # Suche nach juristischen Spezifikationsmustern
             if not sections:
-                spec_matches = list(specification_pattern.finditer(text_content))
+                spec_matches = list(SPECIFICATION_PATTERN.finditer(text_content))
                 
                 if spec_matches and len(spec_matches) >= 1:
                     current_pos = 0
@@ -351,7 +330,7 @@ def segment_text(text_content):
                             
             # Als letzten Versuch: Überprüfe auf Gesetzesverweise
             if not sections:
-                law_refs = list(law_reference_pattern.finditer(text_content))
+                law_refs = list(LAW_REFERENCE_LINE_PATTERN.finditer(text_content))
                 
                 if law_refs and len(law_refs) >= 2:  # Mindestens 2 Verweise, damit eine sinnvolle Aufteilung möglich ist
                     current_pos = 0
@@ -451,6 +430,182 @@ def segment_text(text_content):
     
     return sections
 
+def _segment_gutachten(text_content):
+    """
+    Segmentiert einen einzelnen Gutachtentext, bevorzugt mit der erweiterten semantischen Segmentierung
+    und mit segment_text() als Fallback.
+    
+    Args:
+        text_content: Der zu segmentierende Gutachtentext
+        
+    Returns:
+        Eine Liste von Tupeln (Überschrift, Abschnittstext)
+    """
+    # Verwende die erweiterte semantische Segmentierung, wenn verfügbar
+    if ENHANCED_SEGMENTATION_AVAILABLE:
+        try:
+            segments = enhanced_segment_text(text_content)
+            if segments:
+                print(f"{Colors.OKGREEN}  ✓ Gutachten mit erweiterter semantischer Analyse in {len(segments)} Segmente unterteilt:{Colors.ENDC}")
+            else:
+                segments = segment_text(text_content)  # Fallback zur regulären Segmentierung
+                print(f"{Colors.WARNING}  ⚠ Erweiterte semantische Segmentierung ergab keine Ergebnisse, Fallback zur regulären Segmentierung ({len(segments)} Segmente):{Colors.ENDC}")
+        except Exception as e:
+            print(f"{Colors.WARNING}  ⚠ Fehler bei erweiterter semantischer Segmentierung: {str(e)}, Fallback zur regulären Segmentierung{Colors.ENDC}")
+            tb_lines = traceback.format_exc().splitlines()
+            print(f"{Colors.WARNING}  Details: {tb_lines[-3:] if len(tb_lines) >= 3 else tb_lines}{Colors.ENDC}")
+            
+            # Detaillierte Diagnose für häufige Fehlerquellen
+            if "not subscriptable" in str(e):
+                print(f"{Colors.WARNING}  Diagnose: Wahrscheinlich ein Problem mit Vektordaten oder Ähnlichkeitsberechnungen{Colors.ENDC}")
+            elif "object has no attribute" in str(e):
+                print(f"{Colors.WARNING}  Diagnose: Wahrscheinlich ein Problem mit fehlenden Attributen oder Funktionen{Colors.ENDC}")
+            elif "list index out of range" in str(e) or "index out of range" in str(e):
+                print(f"{Colors.WARNING}  Diagnose: Liste oder Array-Index-Problem, möglicherweise fehlerhafte Segmentgrenzen{Colors.ENDC}")
+            
+            segments = segment_text(text_content)  # Fallback zur regulären Segmentierung
+    else:
+        segments = segment_text(text_content)
+    return segments
+
+def _segmentation_code_version():
+    """
+    Berechnet eine Version des Segmentierungscodes für den Segmentierungscache (--segment-cache).
+    
+    Eingerechnet werden die Quelltexte von semantic_segmentation.py, legal_patterns.py und
+    section_outline.py sowie von segment_text() und _segment_gutachten(). Ändert sich einer davon, werden zwischengespeicherte
+    Segmentierungen verworfen.
+    """
+    version_hash = hashlib.sha256()
+    modules = [legal_patterns, section_outline] + ([semantic_segmentation] if ENHANCED_SEGMENTATION_AVAILABLE else [])
+    for module in modules:
+        with open(module.__file__, 'rb') as source_file:
+            version_hash.update(source_file.read())
+    for function in (segment_text, _segment_gutachten):
+        version_hash.update(inspect.getsource(function).encode('utf-8'))
+    version_hash.update(str(ENHANCED_SEGMENTATION_AVAILABLE).encode('ascii'))
+    return version_hash.hexdigest()
+
+def _incremental_fingerprint(content_only, no_role, token_counter, compact_json=False):
+    """
+    Kennung für das Manifest von --incremental: Segmentierungscode, dieses Skript (Prompts),
+    jsonl_io.py (Zeilenformat) sowie die Optionen, von denen die erzeugten Zeilen und Tokenanzahlen
+    abhängen.
+    """
+    fingerprint = hashlib.sha256(_segmentation_code_version().encode('ascii'))
+    for source_path in (os.path.abspath(__file__), jsonl_io.__file__):
+        with open(source_path, 'rb') as source_file:
+            fingerprint.update(source_file.read())
+    fingerprint.update(json.dumps([content_only, no_role, token_counter.name, getattr(token_counter, 'vocab_path', None),
+                                   compact_json]).encode('utf-8'))
+    return fingerprint.hexdigest()
+
+def _cached_segmentation_message(segments):
+    return f"{Colors.OKCYAN}  ℹ Segmentierung aus dem Cache übernommen ({len(segments)} Segmente).{Colors.ENDC}\n"
+
+def _segment_chunk(texts, collect_pattern_stats=False):
+    """
+    Segmentiert eine Gruppe von Gutachtentexten in einem Worker-Prozess (siehe --workers).
+    
+    Konsolenausgaben während der Segmentierung werden pro Text abgefangen und mit zurückgegeben,
+    damit der Hauptprozess sie in derselben Reihenfolge wie bei serieller Verarbeitung ausgeben kann.
+    
+    Args:
+        texts: Liste der zu segmentierenden Gutachtentexte
+        collect_pattern_stats: Ob Aufrufe und Treffer der Segmentierungsmuster gezählt werden sollen
+        
+    Returns:
+        Ein Tupel (Liste von (Segmente, Ausgabe) je Text, Musterstatistik oder None)
+    """
+    if collect_pattern_stats:
+        enable_pattern_stats()
+        reset_pattern_stats()
+    results = []
+    for text_content in texts:
+        output_buffer = io.StringIO()
+        with contextlib.redirect_stdout(output_buffer):
+            segments = _segment_gutachten(text_content)
+        results.append((segments, output_buffer.getvalue()))
+    return results, (get_pattern_stats() if collect_pattern_stats else None)
+
+def _iter_parallel_segmentations(executor, items, workers, text_to_segment, chunk_size=PARALLEL_CHUNK_SIZE, segment_cache=None):
+    """
+    Verteilt die Gutachtentexte von Einträgen gruppenweise auf einen Prozesspool und liefert jeden
+    Eintrag zusammen mit seinem Ergebnis in Eingabereihenfolge.
+    
+    Jede Gruppe umfasst chunk_size aufeinanderfolgende Einträge, auch solche, die nicht segmentiert
+    werden; für sie wird kein Text an die Worker übergeben. Es sind höchstens 2 * workers Gruppen
+    gleichzeitig in Bearbeitung, sodass auch bei sehr großen Eingaben nie mehr als diese Einträge
+    zwischen Lesen und Verarbeiten gepuffert werden. Mit segment_cache werden nur Texte an die Worker
+    übergeben, die nicht im Cache liegen; neue Ergebnisse werden gespeichert.
+    
+    Args:
+        executor: ProcessPoolExecutor für die Segmentierung
+        items: Iterable der Einträge in Verarbeitungsreihenfolge
+        workers: Anzahl der Worker-Prozesse
+        text_to_segment: Funktion, die den zu segmentierenden Text eines Eintrags liefert oder None,
+                         wenn der Eintrag nicht segmentiert wird
+        chunk_size: Anzahl der Einträge pro Gruppe
+        segment_cache: Optionaler SegmentationCache
+        
+    Yields:
+        Tupel (Eintrag, (Segmente, Konsolenausgabe der Segmentierung) oder None) je Eintrag
+    """
+    items = iter(items)
+    collect_pattern_stats = pattern_stats_enabled()
+    pending_chunks = deque()
+    
+    def submit_next_chunk():
+        chunk = list(islice(items, chunk_size))
+        if chunk:
+            texts = [text_to_segment(item) for item in chunk]
+            cached_segments = [segment_cache.get(text_content) if segment_cache is not None and text_content is not None else None
+                               for text_content in texts]
+            uncached_texts = [text_content for text_content, segments in zip(texts, cached_segments)
+                              if text_content is not None and segments is None]
+            future = executor.submit(_segment_chunk, uncached_texts, collect_pattern_stats) if uncached_texts else None
+            pending_chunks.append((chunk, texts, cached_segments, future))
+        return bool(chunk)
+    
+    while len(pending_chunks) < 2 * workers and submit_next_chunk():
+        pass
+    
+    while pending_chunks:
+        chunk, texts, cached_segments, future = pending_chunks.popleft()
+        results, chunk_pattern_stats = future.result() if future is not None else ([], None)
+        submit_next_chunk()
+        if chunk_pattern_stats:
+            merge_pattern_stats(chunk_pattern_stats)
+        results = iter(results)
+        for item, text_content, segments in zip(chunk, texts, cached_segments):
+            if text_content is None:
+                yield item, None
+                continue
+            if segments is not None:
+                yield item, (segments, _cached_segmentation_message(segments))
+                continue
+            segments, segmentation_output = next(results)
+            if segment_cache is not None:
+                segment_cache.put(text_content, segments)
+            yield item, (segments, segmentation_output)
+
+def _iter_json_array_items(reader, input_file_path):
+    """
+    Liefert die Einträge eines JsonArrayReader. Ist die Datei im weiteren Verlauf fehlerhaft,
+    wird der Fehler gemeldet und die Verarbeitung mit den bis dahin gelesenen Einträgen beendet.
+    """
+    try:
+        yield from reader
+    except json.JSONDecodeError as e:
+        print(f"{Colors.FAIL}✖ Fehler: Konnte JSON-Datei '{input_file_path}' nicht decodieren: {e}. "
+              f"Verarbeitung nach {reader.items_read} Elementen beendet.{Colors.ENDC}")
+
+def _is_segmentable_item(item, skip_international):
+    """Gibt an, ob ein Eintrag in prepare_data_for_training segmentiert wird (nicht übersprungen, Pflichtfelder vorhanden)."""
+    if skip_international and item.get("rechtsbezug") == "International":
+        return False
+    return all([item.get("erscheinungsdatum"), item.get("gutachten_nummer"), item.get("text")])
+
 def prepare_data_for_training(input_file_path, token_limit_millions):
     """
     Bereitet Trainingsdaten für ein LLM vor, indem es Gutachtentexte in sinnvolle Segmente aufteilt
@@ -459,7 +614,13 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
     Args:
         input_file_path: Pfad zur JSON-Datei mit den Gutachtendaten
         token_limit_millions: Maximale Anzahl von Tokens in Millionen für die Ausgabedatei oder 
-                             Dictionary mit Optionen (limit, skip_international, content_only, no_role, all_segments)
+                             Dictionary mit Optionen (limit, skip_international, content_only, no_role, all_segments,
+                             process_one, workers, token_counter, pack, pack_stratify, segment_cache,
+                             incremental, compress, compact_json)
+    
+    Komprimierte Eingabedateien (.json.gz, .jsonl.gz, .json.zst, .jsonl.zst) werden gestreamt entpackt.
+    Die Ausgabe wird wie die Eingabe komprimiert, sofern compress ('.gz', '.zst' oder '') nichts
+    anderes vorgibt.
     """
     # Unpack the token limit and flags from dictionary
     if isinstance(token_limit_millions, dict):
@@ -468,6 +629,14 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         no_role = token_limit_millions.get('no_role', False)
         all_segments = token_limit_millions.get('all_segments', False)
         process_one = token_limit_millions.get('process_one', False)  # New flag for one at a time
+        workers = token_limit_millions.get('workers', 1)
+        token_counter = token_limit_millions.get('token_counter') or CharTokenCounter()
+        pack_method = token_limit_millions.get('pack')
+        pack_stratify = token_limit_millions.get('pack_stratify', False)
+        segment_cache_path = token_limit_millions.get('segment_cache')
+        incremental = token_limit_millions.get('incremental', False)
+        compress = token_limit_millions.get('compress')
+        compact_json = token_limit_millions.get('compact_json', False)
         token_limit_millions = token_limit_millions.get('limit', 2.0)
     else:
         skip_international = False  # Default is to not skip international entries
@@ -475,8 +644,18 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         no_role = False  # Default is to include role information
         all_segments = False  # Default is to only show segments included in output file
         process_one = False  # Default is to process all Gutachten
+        workers = 1  # Default is serial segmentation in the main process
+        token_counter = CharTokenCounter()  # Default is the character count of the JSON line
+        pack_method = None  # Default is to include Gutachten in input order until the limit is reached
+        pack_stratify = False
+        segment_cache_path = None  # Default is to segment every Gutachten anew
+        incremental = False  # Default is to regenerate the full output file
+        compress = None  # Default is to compress the output like the input
+        compact_json = False  # Default is json.dumps(ensure_ascii=False) with its usual separators
 
-    base, ext = os.path.splitext(input_file_path)
+    input_base, input_compression_suffix = split_compression_suffix(input_file_path)
+    output_compression_suffix = input_compression_suffix.lower() if compress is None else compress
+    base, ext = os.path.splitext(input_base)
     if "_prepared" in base or "_segmented" in base:
         print(f"{Colors.WARNING}Warning: Input file '{input_file_path}' seems to be an already processed file. {Colors.ENDC}")
         print("This script should ideally run on the output of 'jsonl_converter.py'.")
@@ -491,7 +670,24 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         token_suffix_for_filename = format_token_limit_for_filename(token_limit_millions)
         actual_max_tokens = int(token_limit_millions * 1_000_000)
         
-    output_file_path = base + token_suffix_for_filename + "_segmented_prepared.jsonl"
+    output_file_path = base + token_suffix_for_filename + "_segmented_prepared.jsonl" + output_compression_suffix
+    
+    try:
+        check_compression_support(input_file_path)
+        check_compression_support(output_file_path)
+    except ImportError as e:
+        print(f"{Colors.FAIL}✖ Fehler: {e}{Colors.ENDC}")
+        return
+    
+    # Inkrementell aktualisieren lässt sich nur die vollständige Ausgabe; bei einem Token-Limit hängt die
+    # Auswahl der Gutachten von allen vorherigen ab
+    if incremental and (not is_unlimited or all_segments or pack_method is not None or process_one):
+        print(f"{Colors.FAIL}✖ Fehler: --incremental ist nur mit '-t max' und ohne -a, -o und --pack möglich.{Colors.ENDC}")
+        return
+    if incremental and output_compression_suffix:
+        # Unveränderte Zeilen werden über Byte-Offsets aus der bestehenden Ausgabe übernommen
+        print(f"{Colors.FAIL}✖ Fehler: --incremental ist nur mit unkomprimierter Ausgabe möglich (--compress none).{Colors.ENDC}")
+        return
 
     # Counters and flags initialization
     processed_gutachten_count = 0
@@ -511,29 +707,31 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
     # Zeitmessung starten
     start_time = datetime.datetime.now()
     
-    items_to_process = []
-    all_segmented_gutachten = []  # Neue Liste für alle segmentierten Gutachten
+    segment_spill = None  # Auslagerungsdatei für alle segmentierten Gutachten (-a)
+    outfile = None  # Gepufferte, atomar ersetzte Ausgabedatei (ohne -a/--pack/--incremental)
+    segment_cache = None  # Segmentierungscache (--segment-cache)
+    incremental_output = None  # Manifest und neue Zeilen für --incremental
+    segmentation_executor = None  # Prozesspool für --workers
     initial_input_item_count = 0
     line_number_for_messages = 0 # Used for messages, distinct from loop iterator if from JSON list
 
     try:
+        # Die Eingabe wird gestreamt: Einträge werden einzeln gelesen und verarbeitet, sodass nie die
+        # gesamte Datei im Speicher liegt. Der Fortschritt wird anhand der gelesenen Bytes geschätzt.
         if ext.lower() == ".json":
             print(f"{Colors.OKBLUE}ℹ Info: Versuche '{input_file_path}' als JSON-Datei zu laden.{Colors.ENDC}")
             try:
-                with open(input_file_path, 'r', encoding='utf-8') as f:
-                    loaded_data = json.load(f)
-                if not isinstance(loaded_data, list):
-                    print(f"{Colors.FAIL}✖ Fehler: Eingabe-JSON-Datei '{input_file_path}' enthält keine Liste von Gutachten.{Colors.ENDC}")
-                    return
-                items_to_process = loaded_data
-                initial_input_item_count = len(items_to_process)
-                print(f"{Colors.OKGREEN}✓ Info: Erfolgreich {initial_input_item_count} Elemente aus JSON-Datei '{input_file_path}' geladen.{Colors.ENDC}")
+                input_reader = JsonArrayReader(input_file_path)
+            except JsonArrayError:
+                print(f"{Colors.FAIL}✖ Fehler: Eingabe-JSON-Datei '{input_file_path}' enthält keine Liste von Gutachten.{Colors.ENDC}")
+                return
             except json.JSONDecodeError as e:
                 print(f"{Colors.FAIL}✖ Fehler: Konnte JSON-Datei '{input_file_path}' nicht decodieren: {e}{Colors.ENDC}")
                 return # Cannot proceed if the whole JSON file is bad
             except FileNotFoundError:
                 print(f"{Colors.FAIL}✖ Fehler: Eingabedatei '{input_file_path}' nicht gefunden.{Colors.ENDC}")
                 return
+            input_items = _iter_json_array_items(input_reader, input_file_path)
         
         else: # Process as JSONL or try as best guess for other extensions
             if ext.lower() == ".jsonl":
@@ -541,54 +739,101 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
             else:
                 print(f"{Colors.WARNING}⚠ Warnung: Eingabedatei '{input_file_path}' hat die Erweiterung '{ext}'. Versuche, als JSONL zu verarbeiten.{Colors.ENDC}")
             
-            temp_items = []
-            raw_lines_count = 0
-            try:
-                with open(input_file_path, 'r', encoding='utf-8') as infile:
-                    for i, line_content in enumerate(infile, 1):
-                        raw_lines_count = i
-                        line_content_stripped = line_content.strip()
-                        if not line_content_stripped: # Skip empty lines
-                            continue
-                        try:
-                            item = json.loads(line_content_stripped)
-                            temp_items.append(item)
-                        except json.JSONDecodeError as e:
-                            print(f"{Colors.WARNING}⚠ Warnung: Überspringe Zeile {i} in Eingabedatei '{input_file_path}' wegen JSON-Decodierungsfehler: {e}.{Colors.ENDC}")
-                            skipped_due_to_json_decode_error += 1
-                items_to_process = temp_items
-                initial_input_item_count = len(temp_items) + skipped_due_to_json_decode_error  # Total valid items + skipped items
-                print(f"{Colors.OKGREEN}✓ Info: {raw_lines_count} Zeilen aus Datei '{input_file_path}' verarbeitet, {len(items_to_process)} gültige Elemente geladen.{Colors.ENDC}")
-            except FileNotFoundError:
+            if not os.path.isfile(input_file_path):
                 print(f"{Colors.FAIL}✖ Fehler: Eingabedatei '{input_file_path}' nicht gefunden.{Colors.ENDC}")
                 return
+            
+            def report_decode_error(line_number, error):
+                print(f"{Colors.WARNING}⚠ Warnung: Überspringe Zeile {line_number} in Eingabedatei '{input_file_path}' wegen JSON-Decodierungsfehler: {error}.{Colors.ENDC}")
+            
+            input_reader = JsonlReader(input_file_path, on_decode_error=report_decode_error)
+            input_items = iter(input_reader)
 
-        # Main processing loop using items_to_process
-        print(f"\n{Colors.HEADER}{Colors.BOLD}❯❯❯ Starte Verarbeitung von {len(items_to_process)} Elementen...{Colors.ENDC}")
-        total_items = len(items_to_process)
-        progress_step = max(1, min(10, total_items // 10))  # Show progress every 10% or at least every item
-        progress_next = progress_step
+        # Main processing loop over the streamed input items
+        print(f"\n{Colors.HEADER}{Colors.BOLD}❯❯❯ Starte Verarbeitung von '{input_file_path}' ({input_reader.total_bytes:,} Bytes)...{Colors.ENDC}")
+        
+        if segment_cache_path:
+            try:
+                segment_cache = SegmentationCache(segment_cache_path, _segmentation_code_version())
+            except sqlite3.Error as e:
+                print(f"{Colors.FAIL}✖ Fehler: Segmentierungscache '{segment_cache_path}' konnte nicht geöffnet werden: {e}{Colors.ENDC}")
+                return
+            if segment_cache.invalidated:
+                print(f"{Colors.WARNING}⚠ Segmentierungscode hat sich geändert, Segmentierungscache '{segment_cache_path}' wurde geleert.{Colors.ENDC}")
+            print(f"{Colors.OKBLUE}ℹ Segmentierungscache: '{segment_cache_path}' ({len(segment_cache):,} Einträge).{Colors.ENDC}")
+        
+        if incremental:
+            incremental_output = IncrementalOutput(output_file_path, _incremental_fingerprint(content_only, no_role, token_counter, compact_json))
+            if incremental_output.rebuild_reason:
+                print(f"{Colors.WARNING}⚠ Inkrementeller Modus: Ausgabe wird vollständig neu erzeugt ({incremental_output.rebuild_reason}).{Colors.ENDC}")
+            else:
+                print(f"{Colors.OKBLUE}ℹ Inkrementeller Modus: Nur neue oder geänderte Gutachten werden segmentiert.{Colors.ENDC}")
+        
+        def needs_segmentation(item):
+            if not _is_segmentable_item(item, skip_international):
+                return False
+            return incremental_output is None or incremental_output.lookup(item.get("gutachten_nummer"), item_content_hash(item)) is None
+        
+        # Mit --workers wird die Segmentierung auf einen Prozesspool verteilt. Die Ergebnisse kommen in
+        # Eingabereihenfolge zurück, sodass Token-Zählung und Ausgabe identisch zur seriellen Verarbeitung bleiben.
+        # Alle Einträge laufen in Eingabereihenfolge durch den Pool, übersprungene ohne Text, sodass höchstens
+        # 2 * workers Gruppen zwischen Lesen und Verarbeiten liegen.
+        if workers > 1:
+            segmentation_executor = ProcessPoolExecutor(max_workers=workers)
+            parallel_items = _iter_parallel_segmentations(
+                segmentation_executor,
+                input_items,
+                workers,
+                lambda item: item.get("text") if needs_segmentation(item) else None,
+                segment_cache=segment_cache)
+            print(f"{Colors.OKBLUE}ℹ Segmentierung mit {workers} Worker-Prozessen.{Colors.ENDC}")
+        else:
+            parallel_items = ((item, None) for item in input_items)
         
         # Create file and open for writing immediately if not using -a flag
-        # With -a flag, we'll process all items first, then write the file up to the token limit
+        # With -a flag, we'll process all items first, then write the file up to the token limit.
+        # Mit --pack wird ebenfalls zuerst alles gesammelt und das Budget erst am Ende verteilt.
+        collect_all = all_segments or pack_method is not None
         file_created = False
-        outfile = None
         
-        if not all_segments:
+        # Mit --incremental werden neue Zeilen gesammelt und am Ende angehängt bzw. mit den unveränderten zusammengesetzt
+        if not collect_all and incremental_output is None:
             file_created = True
-            outfile = open(output_file_path, 'w', encoding='utf-8')
-        else:
-            # For the -a flag, we'll collect all items first, then write to the file later
-            all_segmented_gutachten = []
+            outfile = JsonlWriter(output_file_path, atomic=True)
+        elif collect_all:
+            # For the -a flag, we'll collect all items first, then write to the file later.
+            # Die serialisierten Zeilen werden dabei in eine Auslagerungsdatei neben der Ausgabedatei
+            # geschrieben; im Speicher bleiben nur Tokenanzahl, Überschrift und Gutachtennummer je Segment.
+            segment_spill = JsonlSpillFile(os.path.dirname(output_file_path), prefix=f".{os.path.basename(output_file_path)}.")
+            spilled_segment_tokens = array('q')
+            spilled_segment_headings = []
+            spilled_segment_gutachten = array('q')  # Index des Gutachtens je Segment
+            spilled_gutachten_nummern = []
+            spilled_gutachten_rechtsbezug = []
+            spilled_gutachten_first_segment = array('q')
+            spilled_gutachten_tokens = array('q')
+            heading_counter = defaultdict(int)  # Häufigkeit von Überschriften (für Prompt-Verbesserung)
+            
+            def spill_segment_data(gutachten_nummer, rechtsbezug, segment_data, potential_tokens_in_gutachten):
+                gutachten_index = len(spilled_gutachten_nummern)
+                spilled_gutachten_nummern.append(gutachten_nummer)
+                spilled_gutachten_rechtsbezug.append(rechtsbezug)
+                spilled_gutachten_first_segment.append(len(segment_spill))
+                spilled_gutachten_tokens.append(potential_tokens_in_gutachten)
+                for heading, _, line_to_write, tokens_for_this_segment in segment_data:
+                    segment_spill.append(line_to_write)
+                    spilled_segment_tokens.append(tokens_for_this_segment)
+                    spilled_segment_headings.append(heading)
+                    spilled_segment_gutachten.append(gutachten_index)
+                    heading_counter[heading.lower().strip()] += 1
         
-        for current_item_idx, item in enumerate(items_to_process, 1):
+        for current_item_idx, (item, parallel_segmentation) in enumerate(parallel_items, 1):
             line_number_for_messages = current_item_idx # For user messages, refers to item index
             
-            # Show progress indicator
-            if current_item_idx >= progress_next or current_item_idx == total_items:
-                progress_percent = (current_item_idx / total_items) * 100
-                print(f"{Colors.OKBLUE}ℹ Verarbeite Element {current_item_idx}/{total_items} ({progress_percent:.1f}%)...{Colors.ENDC}")
-                progress_next = min(total_items, current_item_idx + progress_step)
+            # Show progress indicator (Anteil der bereits gelesenen Bytes der Eingabedatei)
+            if current_item_idx % PROGRESS_INTERVAL == 0:
+                progress_percent = input_reader.progress() * 100
+                print(f"{Colors.OKBLUE}ℹ Verarbeite Element {current_item_idx} (ca. {progress_percent:.1f}% der Eingabedatei gelesen)...{Colors.ENDC}")
 
             rechtsbezug = item.get("rechtsbezug")
             # Make skipping international entries optional based on command-line flag
@@ -619,11 +864,9 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
                     normen_list = primary_list
                 else:
                     # Try more advanced pattern matching if simple splitting didn't work
-                    # Handle patterns like "StGB § 123" or "EUErbVO Art. 70"
-                    norm_pattern = re.compile(r'([A-Za-zÄÖÜäöüß]+(?:\s*\d*)?)\s*(?:§|Art\.?|Artikel)?\s*(\d+(?:\w*)?)', re.IGNORECASE)
-                    
+                    # Handle patterns like "StGB § 123" or "EUErbVO Art. 70" (NORM_PATTERN)
                     # Try to find structured patterns
-                    matches = norm_pattern.findall(raw_normen)
+                    matches = NORM_PATTERN.findall(raw_normen)
                     if matches:
                         for law, section in matches:
                             norm = f"{law.strip()} § {section.strip()}"
@@ -658,32 +901,31 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
             # Segmentiere den Text immer, unabhängig vom Token-Limit
             processed_gutachten_count += 1 
             
-            # Verwende die erweiterte semantische Segmentierung, wenn verfügbar
-            if ENHANCED_SEGMENTATION_AVAILABLE:
-                try:
-                    segments = enhanced_segment_text(text_content)
-                    if segments:
-                        print(f"{Colors.OKGREEN}  ✓ Gutachten mit erweiterter semantischer Analyse in {len(segments)} Segmente unterteilt:{Colors.ENDC}")
-                    else:
-                        segments = segment_text(text_content)  # Fallback zur regulären Segmentierung
-                        print(f"{Colors.WARNING}  ⚠ Erweiterte semantische Segmentierung ergab keine Ergebnisse, Fallback zur regulären Segmentierung ({len(segments)} Segmente):{Colors.ENDC}")
-                except Exception as e:
-                    print(f"{Colors.WARNING}  ⚠ Fehler bei erweiterter semantischer Segmentierung: {str(e)}, Fallback zur regulären Segmentierung{Colors.ENDC}")
-                    import traceback
-                    tb_lines = traceback.format_exc().splitlines()
-                    print(f"{Colors.WARNING}  Details: {tb_lines[-3:] if len(tb_lines) >= 3 else tb_lines}{Colors.ENDC}")
-                    
-                    # Detaillierte Diagnose für häufige Fehlerquellen
-                    if "not subscriptable" in str(e):
-                        print(f"{Colors.WARNING}  Diagnose: Wahrscheinlich ein Problem mit Vektordaten oder Ähnlichkeitsberechnungen{Colors.ENDC}")
-                    elif "object has no attribute" in str(e):
-                        print(f"{Colors.WARNING}  Diagnose: Wahrscheinlich ein Problem mit fehlenden Attributen oder Funktionen{Colors.ENDC}")
-                    elif "list index out of range" in str(e) or "index out of range" in str(e):
-                        print(f"{Colors.WARNING}  Diagnose: Liste oder Array-Index-Problem, möglicherweise fehlerhafte Segmentgrenzen{Colors.ENDC}")
-                    
-                    segments = segment_text(text_content)  # Fallback zur regulären Segmentierung
+            if incremental_output is not None:
+                item_hash = item_content_hash(item)
+                previous_entry = incremental_output.lookup(gutachten_nummer, item_hash)
+                if previous_entry is not None:
+                    # Unverändert seit dem letzten Lauf: Zeilen aus der bestehenden Ausgabe übernehmen
+                    incremental_output.reuse(gutachten_nummer, previous_entry)
+                    total_potential_segments += previous_entry['segments']
+                    total_potential_tokens += previous_entry['tokens']
+                    total_segments_generated += previous_entry['segments']
+                    current_total_tokens += previous_entry['tokens']
+                    print(f"{Colors.OKCYAN}  ℹ Unverändert seit dem letzten Lauf, {previous_entry['segments']} Segmente aus der bestehenden Ausgabe übernommen.{Colors.ENDC}")
+                    continue
+            
+            if parallel_segmentation is not None:
+                # Ergebnis des Worker-Prozesses in Eingabereihenfolge übernehmen, inklusive seiner Ausgaben
+                segments, segmentation_output = parallel_segmentation
+                sys.stdout.write(segmentation_output)
             else:
-                segments = segment_text(text_content)
+                segments = segment_cache.get(text_content) if segment_cache is not None else None
+                if segments is not None:
+                    sys.stdout.write(_cached_segmentation_message(segments))
+                else:
+                    segments = _segment_gutachten(text_content)
+                    if segment_cache is not None:
+                        segment_cache.put(text_content, segments)
             
             if not segments: 
                 print(f"{Colors.WARNING}⚠ Warnung: Konnte Gutachten Nr. {gutachten_nummer} (Element {line_number_for_messages}) nicht segmentieren. Verwende vollständigen Text als Fallback.{Colors.ENDC}")
@@ -692,6 +934,7 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
             # Zähle potentielle Tokens für dieses Gutachten (für -a Statistik)
             potential_tokens_in_gutachten = 0
             segment_data = []
+            segment_examples = []
             
             for heading, segment_text in segments:
                 if not segment_text.strip():
@@ -728,9 +971,12 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
                         ]
                     }
                 
-                # Convert to JSON and get token count
-                line_to_write = json.dumps(output_data, ensure_ascii=False)
-                tokens_for_this_segment = len(line_to_write)
+                # Convert to JSON; tokens are counted for all segments of this Gutachten at once
+                line_to_write = dumps_json_line(output_data, compact=compact_json)
+                segment_examples.append((heading, segment_text, output_data["messages"], line_to_write))
+            
+            token_counts = token_counter.count_examples([(messages, line_to_write) for _, _, messages, line_to_write in segment_examples])
+            for (heading, segment_text, _, line_to_write), tokens_for_this_segment in zip(segment_examples, token_counts):
                 potential_tokens_in_gutachten += tokens_for_this_segment
                 
                 # Save segment data for potential writing
@@ -742,25 +988,30 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
             # Check token limit - skip completely if is_unlimited (i.e., -t max parameter)
             if is_unlimited:
                 # If using "max" token limit, always include this gutachten regardless of size
-                if all_segments:
+                if collect_all:
                     # Just collect for later - we'll count all segments for statistics
-                    all_segmented_gutachten.append((gutachten_nummer, erscheinungsdatum, segment_data, normen_list, potential_tokens_in_gutachten))
+                    spill_segment_data(gutachten_nummer, rechtsbezug, segment_data, potential_tokens_in_gutachten)
+                elif incremental_output is not None:
+                    # Incremental mode - collect the lines of this new or changed Gutachten
+                    incremental_output.add(gutachten_nummer, item_hash, [line_to_write for _, _, line_to_write, _ in segment_data], potential_tokens_in_gutachten)
+                    current_total_tokens += potential_tokens_in_gutachten
+                    total_segments_generated += len(segment_data)
                 else:
                     # Direct write mode with unlimited token limit
                     for heading, _, line_to_write, tokens_for_this_segment in segment_data:
-                        outfile.write(line_to_write + '\n')
+                        outfile.write_line(line_to_write)
                         current_total_tokens += tokens_for_this_segment
                         total_segments_generated += 1
             # Normal token limit checking for other cases
-            elif all_segments or (current_total_tokens + potential_tokens_in_gutachten <= actual_max_tokens):
-                # We can include this gutachten - either unlimited tokens, all segments mode, or within limit
-                if all_segments:
+            elif collect_all or (current_total_tokens + potential_tokens_in_gutachten <= actual_max_tokens):
+                # We can include this gutachten - either unlimited tokens, all segments / packing mode, or within limit
+                if collect_all:
                     # Just collect for later - we'll write as much as possible at the end
-                    all_segmented_gutachten.append((gutachten_nummer, erscheinungsdatum, segment_data, normen_list, potential_tokens_in_gutachten))
+                    spill_segment_data(gutachten_nummer, rechtsbezug, segment_data, potential_tokens_in_gutachten)
                 else:
                     # Direct write mode - write each segment immediately
                     for heading, _, line_to_write, tokens_for_this_segment in segment_data:
-                        outfile.write(line_to_write + '\n')
+                        outfile.write_line(line_to_write)
                         current_total_tokens += tokens_for_this_segment
                         total_segments_generated += 1
                         
@@ -785,57 +1036,106 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
                 
                 # For JSON files, we can break the loop as we've already reached the token limit
                 # This optimization prevents unnecessary processing of remaining items
-                if ext.lower() == ".json" and not all_segments:
+                if ext.lower() == ".json" and not collect_all:
                     print(f"{Colors.OKCYAN}  ℹ Optimierung: Verarbeitung weiterer Einträge gestoppt, da Token-Limit erreicht wurde und JSON-Datei als Eingabe verwendet wird.{Colors.ENDC}")
                     break
                 
-        # If we're using all_segments mode, now write as many segments as we can until token limit
-        if all_segments:
-            print(f"\n{Colors.HEADER}{Colors.BOLD}❯❯❯ Verarbeite {len(all_segmented_gutachten)} segmentierte Gutachten...{Colors.ENDC}")
+        parallel_items.close()
+        if segmentation_executor is not None:
+            # Noch ausstehende Gruppen (z.B. nach Abbruch durch Token-Limit oder -o) werden verworfen
+            segmentation_executor.shutdown(wait=True, cancel_futures=True)
+        
+        # Nach einem vorzeitigen Abbruch die restlichen Einträge nur noch zählen, damit die Statistik
+        # wie bisher auf der gesamten Eingabedatei beruht
+        for _ in input_items:
+            pass
+        loaded_item_count = input_reader.items_read
+        if isinstance(input_reader, JsonlReader):
+            skipped_due_to_json_decode_error = input_reader.decode_errors
+            initial_input_item_count = loaded_item_count + skipped_due_to_json_decode_error  # Total valid items + skipped items
+            print(f"{Colors.OKGREEN}✓ Info: {input_reader.lines_read} Zeilen aus Datei '{input_file_path}' verarbeitet, {loaded_item_count} gültige Elemente gelesen.{Colors.ENDC}")
+        else:
+            initial_input_item_count = loaded_item_count
+            print(f"{Colors.OKGREEN}✓ Info: Erfolgreich {initial_input_item_count} Elemente aus JSON-Datei '{input_file_path}' gelesen.{Colors.ENDC}")
+        
+        # If we're using all_segments or packing mode, now write as many segments as we can until token limit
+        if collect_all:
+            print(f"\n{Colors.HEADER}{Colors.BOLD}❯❯❯ Verarbeite {len(spilled_gutachten_nummern)} segmentierte Gutachten...{Colors.ENDC}")
             
             # Zurücksetzen der Token-Zählung für die Ausgabe
             current_total_tokens = 0
             token_limit_reached_flag = False
             
-            # Zähle die Häufigkeit von Überschriften (für Prompt-Verbesserung)
-            heading_counter = defaultdict(int)
-            for _, _, segment_data, _, _ in all_segmented_gutachten:
-                for heading, _, _, _ in segment_data:
-                    normalized_heading = heading.lower().strip()
-                    heading_counter[normalized_heading] += 1
-            
             # Finde die häufigsten Überschriften
             common_headings = sorted(heading_counter.items(), key=lambda x: x[1], reverse=True)[:10]
             print(f"{Colors.OKBLUE}ℹ Die häufigsten Überschriften in den Gutachten:{Colors.ENDC}")
             for heading, count in common_headings:
                 print(f"{Colors.OKCYAN}  • '{heading}': {count} mal{Colors.ENDC}")
             
+            # Bestimme die zu schreibenden Segmente anhand der Tokenanzahl und kopiere sie anschließend
+            # sequentiell aus der Auslagerungsdatei in die Ausgabedatei
+            if is_unlimited:
+                # Unlimited mode (-t max) - write all segments regardless of size
+                selected_segments = None
+                current_total_tokens = sum(spilled_segment_tokens)
+                total_segments_generated += len(segment_spill)
+            elif pack_method is not None:
+                # Packing mode - fill the budget as completely as possible. Mit -a werden einzelne Segmente
+                # gepackt, sonst vollständige Gutachten; geschrieben wird in Eingabereihenfolge.
+                if all_segments:
+                    pack_weights = spilled_segment_tokens
+                    pack_strata = [spilled_gutachten_rechtsbezug[gutachten_index] for gutachten_index in spilled_segment_gutachten]
+                else:
+                    pack_weights = spilled_gutachten_tokens
+                    pack_strata = spilled_gutachten_rechtsbezug
+                if pack_stratify:
+                    selected_items = pack_items_stratified(pack_weights, pack_strata, actual_max_tokens, pack_method)
+                else:
+                    selected_items = pack_items(pack_weights, actual_max_tokens, pack_method)
+                current_total_tokens = sum(pack_weights[item_index] for item_index in selected_items)
+                token_limit_reached_flag = len(selected_items) < len(pack_weights)
+                
+                if all_segments:
+                    selected_segments = selected_items
+                else:
+                    selected_segments = array('q')
+                    segment_ends = spilled_gutachten_first_segment[1:] + array('q', [len(segment_spill)])
+                    for gutachten_index in selected_items:
+                        selected_segments.extend(range(spilled_gutachten_first_segment[gutachten_index], segment_ends[gutachten_index]))
+                    skipped_gutachten_due_to_token_limit = len(pack_weights) - len(selected_items)
+                    skipped_tokens_due_to_token_limit = sum(pack_weights) - current_total_tokens
+                total_segments_generated += len(selected_segments)
+                
+                unit_label = "Segmente" if all_segments else "Gutachten"
+                print(f"{Colors.OKBLUE}ℹ Packing ({pack_method}{', geschichtet nach Rechtsbezug' if pack_stratify else ''}): "
+                      f"{len(selected_items)} von {len(pack_weights)} {unit_label} ausgewählt, "
+                      f"{current_total_tokens:,} von {actual_max_tokens:,} {token_counter.unit} belegt.{Colors.ENDC}")
+            else:
+                selected_segments = array('q')
+                for segment_index, tokens_for_this_segment in enumerate(spilled_segment_tokens):
+                    if current_total_tokens + tokens_for_this_segment <= actual_max_tokens:
+                        # Normal token limit mode - write until limit reached
+                        selected_segments.append(segment_index)
+                        current_total_tokens += tokens_for_this_segment
+                        total_segments_generated += 1
+                    elif not token_limit_reached_flag:
+                        # Token limit reached - continue collecting stats but don't write
+                        print(f"\n{Colors.WARNING}⚠ Token-Limit ({actual_max_tokens:,} {token_counter.unit}) erreicht. "
+                              f"Stoppe Ausgabe aber fahre mit Statistikerfassung fort. Aktuelles Segment '{spilled_segment_headings[segment_index]}' von Gutachten Nr. {spilled_gutachten_nummern[spilled_segment_gutachten[segment_index]]} nicht geschrieben.{Colors.ENDC}")
+                        token_limit_reached_flag = True
+            
             # Now write to the file
-            with open(output_file_path, 'w', encoding='utf-8') as outfile:
-                for gutachten_nummer, erscheinungsdatum, segment_data, normen_list, _ in all_segmented_gutachten:
-                    for heading, _, line_to_write, tokens_for_this_segment in segment_data:
-                        # With -a flag, write all segments when using -t max, otherwise respect token limit
-                        if is_unlimited:
-                            # Unlimited mode (-t max) - write all segments regardless of size
-                            outfile.write(line_to_write + '\n')
-                            current_total_tokens += tokens_for_this_segment
-                            total_segments_generated += 1
-                        elif current_total_tokens + tokens_for_this_segment <= actual_max_tokens:
-                            # Normal token limit mode - write until limit reached
-                            outfile.write(line_to_write + '\n')
-                            current_total_tokens += tokens_for_this_segment
-                            total_segments_generated += 1
-                        else:
-                            # Token limit reached - continue collecting stats but don't write
-                            if not token_limit_reached_flag:
-                                print(f"\n{Colors.WARNING}⚠ Token-Limit ({actual_max_tokens:,} Zeichen als Proxy) erreicht. "
-                                      f"Stoppe Ausgabe aber fahre mit Statistikerfassung fort. Aktuelles Segment '{heading}' von Gutachten Nr. {gutachten_nummer} nicht geschrieben.{Colors.ENDC}")
-                                token_limit_reached_flag = True
-                            # Don't break - continue processing for stats but don't write to file
-                            continue
+            segment_spill.copy_lines_to(output_file_path, selected_segments)
+            segment_spill.discard()
+        
+        if incremental_output is not None:
+            removed_count = incremental_output.removed_count
+            incremental_mode = incremental_output.finalize()
+            print(f"\n{Colors.OKBLUE}ℹ Inkrementeller Modus: {incremental_output.reused_count} Gutachten übernommen, "
+                  f"{incremental_output.new_count} neu oder geändert, {removed_count} entfernt. Ausgabedatei {incremental_mode}.{Colors.ENDC}")
         
         # If we opened the file directly (not -a mode), close it
-        if file_created and not all_segments:
+        if file_created and not collect_all:
             outfile.close()
 
         # --- Summary Printing with improved formatting --- 
@@ -851,7 +1151,8 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         if is_unlimited:
             print(f"{Colors.OKGREEN}  ✓ Token-Limit: {Colors.BOLD}max (unbegrenzter Token Speicher){Colors.ENDC}")
         else:
-            print(f"{Colors.OKGREEN}  ✓ Token-Limit: {Colors.BOLD}{token_limit_millions}{Colors.ENDC}{Colors.OKGREEN} Millionen (≈ {Colors.BOLD}{actual_max_tokens:,}{Colors.ENDC}{Colors.OKGREEN} Zeichen){Colors.ENDC}")
+            print(f"{Colors.OKGREEN}  ✓ Token-Limit: {Colors.BOLD}{token_limit_millions}{Colors.ENDC}{Colors.OKGREEN} Millionen (≈ {Colors.BOLD}{actual_max_tokens:,}{Colors.ENDC}{Colors.OKGREEN} {token_counter.unit}){Colors.ENDC}")
+        print(f"{Colors.OKGREEN}  ✓ Token-Zählung (--token-counter): {Colors.BOLD}{token_counter.describe()}{Colors.ENDC}")
         
         if skip_international:
             print(f"{Colors.OKGREEN}  ✓ Internationale Rechtsbezüge überspringen: {Colors.BOLD}Ja{Colors.ENDC}")
@@ -873,6 +1174,26 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         else:
             print(f"{Colors.OKGREEN}  ✓ Alle potentiellen Segmente anzeigen: {Colors.BOLD}Nein{Colors.ENDC}")
         
+        print(f"{Colors.OKGREEN}  ✓ Worker-Prozesse für die Segmentierung (--workers): {Colors.BOLD}{workers}{Colors.ENDC}")
+        
+        if segment_cache is not None:
+            print(f"{Colors.OKGREEN}  ✓ Segmentierungscache (--segment-cache): {Colors.BOLD}{segment_cache_path}{Colors.ENDC}{Colors.OKGREEN} "
+                  f"({segment_cache.hits:,} Treffer, {segment_cache.stored:,} neu segmentiert){Colors.ENDC}")
+        else:
+            print(f"{Colors.OKGREEN}  ✓ Segmentierungscache (--segment-cache): {Colors.BOLD}Nein{Colors.ENDC}")
+        
+        if incremental:
+            print(f"{Colors.OKGREEN}  ✓ Inkrementelle Aktualisierung (--incremental): {Colors.BOLD}Ja{Colors.ENDC}")
+        else:
+            print(f"{Colors.OKGREEN}  ✓ Inkrementelle Aktualisierung (--incremental): {Colors.BOLD}Nein{Colors.ENDC}")
+        
+        print(f"{Colors.OKGREEN}  ✓ Komprimierung der Ausgabe (--compress): {Colors.BOLD}{COMPRESSION_SUFFIXES.get(output_compression_suffix, 'keine')}{Colors.ENDC}")
+        
+        if pack_method is not None:
+            print(f"{Colors.OKGREEN}  ✓ Token-Budget packen (--pack): {Colors.BOLD}{pack_method}{' (geschichtet nach Rechtsbezug)' if pack_stratify else ''}{Colors.ENDC}")
+        else:
+            print(f"{Colors.OKGREEN}  ✓ Token-Budget packen (--pack): {Colors.BOLD}Nein{Colors.ENDC}")
+        
         # Anzeige der UI-Parameter
         if process_one:
             print(f"{Colors.OKGREEN}  ✓ Verarbeite nur ein Gutachten (-o): {Colors.BOLD}Ja{Colors.ENDC}")
@@ -922,7 +1243,7 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         else:
             print(f"{Colors.WARNING}  ⚠ Keine Gutachten verarbeitet{Colors.ENDC}")
         
-        print(f"{Colors.OKGREEN}  ✓ Insgesamt geschriebene Zeichen (Proxy für Tokens): {Colors.BOLD}{current_total_tokens:,}{Colors.ENDC}{Colors.OKGREEN} (Limit: {Colors.BOLD}{actual_max_tokens:,}{Colors.ENDC}{Colors.OKGREEN}){Colors.ENDC}")
+        print(f"{Colors.OKGREEN}  ✓ Insgesamt geschriebene {token_counter.unit}: {Colors.BOLD}{current_total_tokens:,}{Colors.ENDC}{Colors.OKGREEN} (Limit: {Colors.BOLD}{actual_max_tokens:,}{Colors.ENDC}{Colors.OKGREEN}){Colors.ENDC}")
         
         # Wenn -a verwendet wird, zeige auch potentielle Gesamt-Tokens/Segmente an
         if all_segments:
@@ -967,7 +1288,7 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
             
             print(f"{Colors.WARNING}  ⚠ Gutachten vollständig übersprungen, nachdem Token-Limit erreicht wurde: {skipped_gutachten_due_to_token_limit} ({unprocessed_percentage:.1f}% der verarbeitbaren Gutachten){Colors.ENDC}")
             if skipped_gutachten_due_to_token_limit > 0:
-                print(f"{Colors.WARNING}    • Potenzielle Zeichen aus diesen übersprungenen Gutachten: {skipped_tokens_due_to_token_limit:,}{Colors.ENDC}")
+                print(f"{Colors.WARNING}    • Potenzielle {token_counter.unit} aus diesen übersprungenen Gutachten: {skipped_tokens_due_to_token_limit:,}{Colors.ENDC}")
                 print(f"{Colors.WARNING}    • Geschätztes zusätzliches Token-Limit benötigt: {(skipped_tokens_due_to_token_limit/1_000_000):.2f} Millionen{Colors.ENDC}")
         
         # Berechne und zeige die Erfolgsrate an
@@ -996,11 +1317,11 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         
         if current_total_tokens == 0 and (skipped_international_rechtsbezug_count + skipped_due_to_json_decode_error + skipped_due_to_missing_fields_total) < initial_input_item_count and initial_input_item_count > 0:
              print(f"\n{Colors.WARNING}⚠ Keine Segmente wurden geschrieben. Dies könnte daran liegen, dass alle verarbeitbaren Gutachten nach der Segmentierung leer waren oder das erste gültige Element ein sehr kleines Token-Limit überschritten hat.{Colors.ENDC}")
-        elif (skipped_international_rechtsbezug_count + skipped_due_to_json_decode_error + skipped_due_to_missing_fields_total) == initial_input_item_count and initial_input_item_count > 0 and len(items_to_process) == 0 : # Check if all items were skipped before main loop
+        elif (skipped_international_rechtsbezug_count + skipped_due_to_json_decode_error + skipped_due_to_missing_fields_total) == initial_input_item_count and initial_input_item_count > 0 and loaded_item_count == 0 : # Check if all items were skipped before main loop
              print(f"\n{Colors.FAIL}✖ Kein gültiges Gutachten in der Eingabedatei gefunden oder verarbeitet. Alle Elemente wurden basierend auf den Anfangskriterien übersprungen (z.B. International, JSON-Fehler, fehlende Felder).{Colors.ENDC}")
-        elif initial_input_item_count == 0 and not (ext.lower() == ".json" and items_to_process == []): # Avoid this if JSON was empty list from start
+        elif initial_input_item_count == 0 and not (ext.lower() == ".json" and loaded_item_count == 0): # Avoid this if JSON was empty list from start
             print(f"\n{Colors.WARNING}⚠ Eingabedatei '{input_file_path}' war leer oder es wurden keine verarbeitbaren Elemente gefunden.{Colors.ENDC}")
-        elif len(items_to_process) > 0 and total_segments_generated == 0 and processed_gutachten_count == 0 and not token_limit_reached_flag:
+        elif loaded_item_count > 0 and total_segments_generated == 0 and processed_gutachten_count == 0 and not token_limit_reached_flag:
             # This case handles when items were loaded, but none resulted in segments (e.g. all skipped for other reasons not yet counted, or all text content was empty)
             print(f"\n{Colors.WARNING}⚠ Keine Segmente wurden aus den verarbeiteten Elementen generiert. Prüfen Sie, ob Elemente übersprungen wurden oder ob der Textinhalt leer war.{Colors.ENDC}")
         else:
@@ -1014,6 +1335,17 @@ def prepare_data_for_training(input_file_path, token_limit_millions):
         import traceback
         print(f"{Colors.FAIL}{traceback.format_exc()}{Colors.ENDC}")
         print(f"\n{Colors.WARNING}⚠ Bitte melden Sie diesen Fehler mit der Beispieldatei, die das Problem verursacht hat.{Colors.ENDC}")
+    finally:
+        if segmentation_executor is not None:
+            segmentation_executor.shutdown(wait=True, cancel_futures=True)  # Nach einem Fehler keine weiteren Gruppen segmentieren
+        if outfile is not None:
+            outfile.discard()  # Nach einem Fehler bleibt eine bestehende Ausgabedatei unverändert
+        if segment_spill is not None:
+            segment_spill.discard()
+        if segment_cache is not None:
+            segment_cache.close()
+        if incremental_output is not None:
+            incremental_output.discard()
 
 if __name__ == "__main__":
     # Check for help flag first before using argparse
@@ -1025,7 +1357,8 @@ if __name__ == "__main__":
         print(f"{Colors.BOLD}{Colors.OKBLUE}📝 Beschreibung:{Colors.ENDC}")
         print(f"  {Colors.OKCYAN}•{Colors.ENDC} Dieses Skript segmentiert juristische Gutachten aus einer JSON/JSONL-Datei")
         print(f"    und bereitet diese für das Training eines Sprachmodells vor.")
-        print(f"  {Colors.OKCYAN}•{Colors.ENDC} Es nutzt die Zeichenanzahl der JSON-Ausgabezeilen als Näherung für Token-Anzahl.")
+        print(f"  {Colors.OKCYAN}•{Colors.ENDC} Es nutzt standardmäßig die Zeichenanzahl der JSON-Ausgabezeilen als Näherung für Token-Anzahl")
+        print(f"    (echte Tokens mit {Colors.OKGREEN}--token-counter bpe --vocab DATEI{Colors.ENDC}).")
         print(f"  {Colors.OKCYAN}•{Colors.ENDC} Der Fokus liegt auf der Erstellung sinnvoller Trainingssegmente mit")
         print(f"    besonderem Schwerpunkt auf die rechtlichen Normen ({Colors.OKGREEN}normen-Feld{Colors.ENDC}).\n")
         
@@ -1041,7 +1374,7 @@ if __name__ == "__main__":
         print(f"    Zeige diese Hilfemeldung an und beende das Programm.\n")
         
         print(f"  {Colors.OKGREEN}-t TOKENS, --tokens TOKENS{Colors.ENDC}")
-        print(f"    Maximale Anzahl an 'Tokens' (Näherung durch Zeichenanzahl) für die Ausgabedatei,")
+        print(f"    Maximale Anzahl an Tokens (gezählt mit {Colors.OKGREEN}--token-counter{Colors.ENDC}) für die Ausgabedatei,")
         print(f"    angegeben in Millionen (z.B. {Colors.OKCYAN}2.0{Colors.ENDC} für 2 Millionen, {Colors.OKCYAN}0.2{Colors.ENDC} für 200k).")
         print(f"    Standard ist {Colors.OKCYAN}2.0{Colors.ENDC} (2 Millionen).\n")
         
@@ -1063,6 +1396,52 @@ if __name__ == "__main__":
         print(f"    Verarbeitet nur ein einzelnes Gutachten und beendet dann das Programm.")
         print(f"    Nützlich für Tests und schnelle Validierung der Verarbeitung.\n")
         
+        print(f"  {Colors.OKGREEN}--workers N{Colors.ENDC}")
+        print(f"    Verteilt die Segmentierung auf {Colors.OKCYAN}N{Colors.ENDC} Prozesse. Die Ausgabedatei ist identisch zur")
+        print(f"    seriellen Verarbeitung. Standard ist {Colors.OKCYAN}1{Colors.ENDC} (keine Parallelisierung).\n")
+        
+        print(f"  {Colors.OKGREEN}--token-counter {{chars,words,calibrated,bpe}}{Colors.ENDC}")
+        print(f"    Legt fest, wie Tokens für das Limit gezählt werden. Standard ist {Colors.OKCYAN}chars{Colors.ENDC}")
+        print(f"    (Zeichenanzahl der JSON-Zeile). {Colors.OKCYAN}bpe{Colors.ENDC} zählt echte Tokens mit einer lokalen Vokabeldatei,")
+        print(f"    {Colors.OKCYAN}calibrated{Colors.ENDC} schätzt über ein Zeichen-pro-Token-Verhältnis (schnell, z.B. für Probeläufe).\n")
+        
+        print(f"  {Colors.OKGREEN}--vocab DATEI{Colors.ENDC}")
+        print(f"    BPE-Vokabeldatei ({Colors.OKCYAN}*.tiktoken{Colors.ENDC} oder {Colors.OKCYAN}tokenizer.json{Colors.ENDC}) für {Colors.OKCYAN}bpe{Colors.ENDC}. Bei {Colors.OKCYAN}calibrated{Colors.ENDC}")
+        print(f"    ohne --chars-per-token wird das Verhältnis an den ersten Texten gegen diese Datei kalibriert.\n")
+        
+        print(f"  {Colors.OKGREEN}--chars-per-token N{Colors.ENDC}")
+        print(f"    Festes Zeichen-pro-Token-Verhältnis für {Colors.OKCYAN}calibrated{Colors.ENDC}.\n")
+        
+        print(f"  {Colors.OKGREEN}--pack {{greedy,knapsack,priority}}{Colors.ENDC}")
+        print(f"    Segmentiert zuerst alle Gutachten und wählt dann diejenigen aus, die das Token-Limit möglichst")
+        print(f"    vollständig ausschöpfen, statt nach dem ersten nicht mehr passenden Gutachten abzubrechen.")
+        print(f"    {Colors.OKCYAN}priority{Colors.ENDC} nimmt die Gutachten in Eingabereihenfolge und überspringt nur die nicht mehr passenden.")
+        print(f"    Mit {Colors.OKGREEN}-a{Colors.ENDC} werden einzelne Segmente statt ganzer Gutachten gepackt.\n")
+        
+        print(f"  {Colors.OKGREEN}--pack-stratify{Colors.ENDC}")
+        print(f"    Verteilt das Token-Limit bei {Colors.OKGREEN}--pack{Colors.ENDC} anteilig auf die Rechtsbezüge.\n")
+        
+        print(f"  {Colors.OKGREEN}--segment-cache [DATEI]{Colors.ENDC}")
+        print(f"    Speichert Segmentierungen in einer SQLite-Datei (Standard: neben der Eingabedatei) und")
+        print(f"    verwendet sie bei weiteren Läufen mit anderen Parametern (-t, -c, -r, -in) wieder.")
+        print(f"    Bei Änderungen am Segmentierungscode wird der Cache automatisch geleert.\n")
+        
+        print(f"  {Colors.OKGREEN}--incremental{Colors.ENDC}")
+        print(f"    Aktualisiert eine bestehende Ausgabe (nur mit {Colors.OKCYAN}-t max{Colors.ENDC}): Über ein Manifest neben der")
+        print(f"    Ausgabedatei werden nur neue oder geänderte Gutachten segmentiert; unveränderte Zeilen werden übernommen.\n")
+        
+        print(f"  {Colors.OKGREEN}--compress {{gz,zst,none}}{Colors.ENDC}")
+        print(f"    Komprimiert die Ausgabedatei mit gzip bzw. zstd (mehrere Threads). Standard: wie die Eingabedatei;")
+        print(f"    komprimierte Eingaben ({Colors.OKCYAN}.jsonl.gz{Colors.ENDC}, {Colors.OKCYAN}.json.zst{Colors.ENDC}, ...) werden beim Lesen gestreamt entpackt.\n")
+        
+        print(f"  {Colors.OKGREEN}--compact-json{Colors.ENDC}")
+        print(f"    Schreibt die Ausgabezeilen kompakt (ohne Leerzeichen nach ',' und ':') und mit {Colors.OKCYAN}orjson{Colors.ENDC}, falls installiert.")
+        print(f"    Mit {Colors.OKCYAN}--token-counter chars{Colors.ENDC} sind die Zeilen kürzer, sodass unter -t mehr Segmente passen können.\n")
+        
+        print(f"  {Colors.OKGREEN}--pattern-stats{Colors.ENDC}")
+        print(f"    Zählt Aufrufe und Treffer aller Segmentierungsmuster und gibt sie am Ende aus.")
+        print(f"    Nützlich für Profiling der Segmentierung.\n")
+        
         print(f"{Colors.BOLD}{Colors.OKBLUE}📋 Beispiele:{Colors.ENDC}")
         print(f"  {Colors.OKCYAN}»{Colors.ENDC} python segment_and_prepare_training_data.py {Colors.HEADER}gutachten.json{Colors.ENDC}")
         print(f"    Verarbeitet die JSON-Datei mit einem Standardlimit von 2 Millionen Tokens.\n")
@@ -1136,6 +1515,81 @@ if __name__ == "__main__":
         action="store_true",
         help="Verarbeite nur ein einzelnes Gutachten und beende dann das Programm. Nützlich für Tests."
     )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Anzahl der Prozesse für die Segmentierung. Standard: 1 (seriell). Die Ausgabe ist identisch zur seriellen Verarbeitung."
+    )
+    
+    parser.add_argument(
+        "--token-counter",
+        choices=TOKEN_COUNTER_CHOICES,
+        default="chars",
+        help="Art der Token-Zählung für das Limit. Standard: chars (Zeichenanzahl der JSON-Zeile)."
+    )
+    
+    parser.add_argument(
+        "--vocab",
+        type=str,
+        default=None,
+        help="BPE-Vokabeldatei (*.tiktoken oder tokenizer.json) für --token-counter bpe bzw. zur Kalibrierung von calibrated."
+    )
+    
+    parser.add_argument(
+        "--chars-per-token",
+        type=float,
+        default=None,
+        help="Festes Zeichen-pro-Token-Verhältnis für --token-counter calibrated."
+    )
+    
+    parser.add_argument(
+        "--pack",
+        choices=PACKING_METHODS,
+        default=None,
+        help="Wähle Gutachten (mit -a: Segmente) so aus, dass das Token-Limit möglichst vollständig ausgeschöpft wird."
+    )
+    
+    parser.add_argument(
+        "--pack-stratify",
+        action="store_true",
+        help="Verteile das Token-Limit bei --pack anteilig auf die Rechtsbezüge."
+    )
+    
+    parser.add_argument(
+        "--segment-cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DATEI",
+        help="Segmentierungen in einer SQLite-Datei zwischenspeichern und wiederverwenden. Standard-Datei: <Eingabedatei>.segcache.sqlite."
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Nur neue oder geänderte Gutachten verarbeiten und die bestehende Ausgabe aktualisieren (nur mit -t max)."
+    )
+    
+    parser.add_argument(
+        "--compress",
+        choices=["gz", "zst", "none"],
+        default=None,
+        help="Ausgabedatei mit gzip oder zstd komprimieren. Standard: wie die Eingabedatei."
+    )
+    
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Ausgabezeilen kompakt (ohne Leerzeichen nach ',' und ':') und mit orjson, falls installiert, schreiben."
+    )
+    
+    parser.add_argument(
+        "--pattern-stats",
+        action="store_true",
+        help="Zähle Aufrufe und Treffer aller Segmentierungsmuster und gib sie am Ende aus (Profiling)."
+    )
 
     args = parser.parse_args()
     
@@ -1150,6 +1604,20 @@ if __name__ == "__main__":
             print(f"{Colors.FAIL}✖ Fehler: Token-Limit '{token_limit}' ist keine gültige Zahl oder 'max'.{Colors.ENDC}")
             sys.exit(1)
     
+    try:
+        token_counter = create_token_counter(args.token_counter, vocab_path=args.vocab, chars_per_token=args.chars_per_token)
+    except (ValueError, ImportError, OSError) as e:
+        print(f"{Colors.FAIL}✖ Fehler: Token-Zähler konnte nicht erstellt werden: {e}{Colors.ENDC}")
+        sys.exit(1)
+    
+    if args.pack_stratify and not args.pack:
+        print(f"{Colors.WARNING}⚠ Warnung: --pack-stratify wirkt nur zusammen mit --pack und wird ignoriert.{Colors.ENDC}")
+    
+    # --segment-cache ohne Dateiangabe: Cache-Datei neben der Eingabedatei
+    segment_cache_path = args.segment_cache
+    if segment_cache_path == "":
+        segment_cache_path = os.path.splitext(split_compression_suffix(args.input_file_path)[0])[0] + ".segcache.sqlite"
+    
     # Package the token limit and other flags together
     token_limit_millions_info = {
         'limit': token_limit,
@@ -1157,7 +1625,22 @@ if __name__ == "__main__":
         'content_only': args.content_only,
         'no_role': args.no_role,
         'all_segments': args.all_segments,
-        'process_one': args.one  # Nutze den neuen dedicated Parameter
+        'process_one': args.one,  # Nutze den neuen dedicated Parameter
+        'workers': max(1, args.workers),
+        'token_counter': token_counter,
+        'pack': args.pack,
+        'pack_stratify': args.pack_stratify,
+        'segment_cache': segment_cache_path,
+        'incremental': args.incremental,
+        'compress': None if args.compress is None else ('' if args.compress == 'none' else '.' + args.compress),
+        'compact_json': args.compact_json
     }
     
+    if args.pattern_stats:
+        enable_pattern_stats()
+    
     prepare_data_for_training(args.input_file_path, token_limit_millions_info)
+    
+    if args.pattern_stats:
+        print(f"\n{Colors.BOLD}{Colors.OKBLUE}📊 Musterstatistik (Aufrufe/Treffer):{Colors.ENDC}")
+        dump_pattern_stats()
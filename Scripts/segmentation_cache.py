@@ -0,0 +1,81 @@
+"""
+Persistenter Cache für Segmentierungsergebnisse.
+
+Die Segmentierung eines Gutachtens hängt nur von dessen Text und vom Segmentierungscode ab, nicht
+von Token-Limit oder Ausgabeformat. Der Cache speichert die (Überschrift, Segment)-Listen daher in
+einer SQLite-Datei, adressiert über den SHA-256-Hash des Textes. Zusätzlich wird eine Version des
+Segmentierungscodes gespeichert; weicht sie beim Öffnen ab, wird der Cache geleert.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+# Nach so vielen neuen Einträgen wird die Transaktion abgeschlossen
+COMMIT_INTERVAL = 256
+
+def _text_key(text):
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+class SegmentationCache:
+    """
+    SQLite-basierter Cache für Segmentierungsergebnisse.
+
+    Attribute hits, misses und stored zählen Treffer, Fehlversuche und neu gespeicherte Einträge;
+    invalidated gibt an, ob beim Öffnen Einträge einer anderen Codeversion verworfen wurden.
+    """
+
+    def __init__(self, path, code_version):
+        self.path = path
+        self.code_version = code_version
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.invalidated = False
+        self._pending_writes = 0
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS segments (text_hash BLOB PRIMARY KEY, segments TEXT NOT NULL)")
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'code_version'").fetchone()
+        if row is None or row[0] != code_version:
+            self.invalidated = row is not None
+            self._connection.execute("DELETE FROM segments")
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('code_version', ?)", (code_version,))
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def get(self, text):
+        """Liefert die gespeicherte Segmentliste für text oder None, wenn sie nicht im Cache liegt."""
+        row = self._connection.execute("SELECT segments FROM segments WHERE text_hash = ?", (_text_key(text),)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tuple(segment) for segment in json.loads(row[0])]
+
+    def put(self, text, segments):
+        """Speichert die Segmentliste (Liste von (Überschrift, Segment)) für text."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO segments (text_hash, segments) VALUES (?, ?)",
+            (_text_key(text), json.dumps(segments, ensure_ascii=False)))
+        self.stored += 1
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """Schreibt ausstehende Einträge und schließt die Datenbank."""
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
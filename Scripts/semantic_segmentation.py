@@ -4,7 +4,254 @@ Es wird vom segment_and_prepare_training_data.py verwendet, um intelligentere Se
 """
 
 import re
-from collections import defaultdict
+from collections import defaultdict, deque, Counter
+from functools import lru_cache
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from legal_patterns import (
+    LEGAL_SECTION_MARKER_PATTERN, PARAGRAPH_SPLIT_PATTERN, CAPITALIZED_HEADING_PATTERN,
+    SENTENCE_SPLIT_PATTERN, WHITESPACE_PATTERN, LAW_REFERENCE_PATTERN, POTENTIAL_HEADING_PATTERN,
+    SUBSEGMENT_EXAMINATION_START_PATTERN, SUBSEGMENT_RESULT_PATTERN, SUBSEGMENT_LEGAL_QUESTION_PATTERN,
+    SUBSEGMENT_EXAMINATION_STEP_PATTERN, SEGMENT_QUESTION_PATTERN, SEGMENT_RESULT_PATTERN,
+    SEGMENT_NORM_PATTERN, SEGMENT_FACTS_PATTERN,
+)
+
+# Juristische Terminologie und deren Gewichtung - erweitert und kategorisiert
+SEMANTIC_KEYWORDS = {
+    # Sachverhalt-Terminologie
+    'sachverhalt': 6.0, 'tatbestand': 6.0, 'lebenssachverhalt': 6.0, 'fall': 3.0,
+    'geschehen': 2.0, 'vorgang': 2.0, 'situation': 2.0, 'ausgangslage': 2.5,
+    'umstände': 2.0, 'tatsachen': 2.5, 'ereignis': 2.0, 
+    
+    # Hauptkategorien juristischer Gutachten
+    'frage': 5.0, 'rechtsfrage': 5.5, 'fragestellung': 5.0, 'problematik': 4.5,
+    'lösung': 4.5, 'ergebnis': 5.0, 'bewertung': 4.0, 'beurteilung': 4.0,
+    'lösungsansatz': 4.0, 'fazit': 5.0, 'schlussfolgerung': 5.0, 'zusammenfassung': 4.5,
+    
+    # Prozessuale Begriffe
+    'klage': 4.5, 'antrag': 4.5, 'verfahren': 4.5, 'instanz': 3.5, 'revision': 4.5,
+    'berufung': 4.5, 'beschwerde': 4.5, 'einspruch': 4.5, 'widerspruch': 4.5,
+    'kläger': 3.5, 'beklagte': 3.5, 'gericht': 3.5, 'entscheidung': 4.0,
+    'zuständigkeit': 4.0, 'frist': 3.5, 'zulässigkeit': 4.5, 'begründetheit': 4.5,
+    
+    # Normen-Terminologie
+    'gesetz': 3.5, 'paragraph': 4.0, 'artikel': 3.5, 'vorschrift': 3.5, 'bestimmung': 3.5,
+    'regelung': 3.0, 'norm': 4.0, 'richtlinie': 3.5, 'verordnung': 3.5, 'kodifikation': 3.0,
+    'gesetzbuch': 3.5, 'bgb': 4.5, 'stgb': 4.5, 'hgb': 4.5, 'zpo': 4.5, 'stvo': 4.5,
+    'erbrecht': 4.0, 'familienrecht': 4.0, 'schuldrecht': 4.0, 'sachenrecht': 4.0,
+    
+    # Auslegungsmethoden
+    'auslegung': 5.0, 'wortlaut': 4.5, 'systematik': 4.5, 'teleologie': 4.5, 'telos': 4.0,
+    'historisch': 4.0, 'genese': 4.0, 'zweck': 4.0, 'sinn': 3.5, 'gesetzgebung': 3.5,
+    'materialien': 3.5, 'gesetzgeber': 4.0, 'interpretation': 4.0, 'wörtlich': 4.0,
+    'grammatikalisch': 4.0, 'systematische': 4.0, 'teleologische': 4.0, 'historische': 4.0,
+    
+    # Subsumtion
+    'subsumtion': 6.0, 'erfüllt': 4.0, 'tatbestandsmerkmal': 5.0, 'voraussetzung': 4.5,
+    'merkmal': 3.5, 'prüfung': 4.5, 'anwendung': 4.0, 'tatbestand': 5.0, 'rechtsfolge': 5.0,
+    'gegeben': 3.5, 'vorliegend': 4.0, 'einschlägig': 4.0, 'passend': 3.0, 
+    'tatbestandlich': 4.5, 'erforderlich': 3.5, 'hinreichend': 3.5,
+    
+    # Argumentationstechnik und Dogmatik
+    'argument': 3.0, 'begründung': 4.0, 'wertung': 3.5, 'abwägung': 4.0, 'dogmatik': 4.5,
+    'ansicht': 3.0, 'meinung': 3.0, 'auffassung': 3.0, 'vertretbar': 3.0, 'herrschend': 3.5,
+    'minderheit': 3.0, 'streit': 3.5, 'umstritten': 4.0, 'streitig': 4.0, 'eindeutig': 3.5,
+    'unstreitig': 3.5, 'unklar': 3.0, 'fraglich': 4.0, 'problematisch': 4.0,
+    
+    # Rechtsprechung und Literatur
+    'rechtsprechung': 4.5, 'bgh': 4.5, 'bundesgerichtshof': 4.5, 'olg': 4.0, 
+    'oberlandesgericht': 4.0, 'lg': 3.5, 'ag': 3.5, 'bverfg': 4.5, 'bundesverfassungsgericht': 4.5,
+    'literatur': 3.5, 'lehre': 3.5, 'kommentar': 3.5, 'monographie': 3.0, 'aufsatz': 3.0,
+    'palandt': 4.0, 'münchener': 4.0, 'staudinger': 4.0, 'larenz': 3.5, 'canaris': 3.5,
+    
+    # Rechtsfolgen und Rechtsinstitute
+    'rechtsfolge': 5.0, 'folge': 3.0, 'konsequenz': 3.5, 'rechtsverhältnis': 4.0,
+    'wirkung': 3.0, 'geltung': 3.0, 'rechtswirkung': 4.0, 'rechtsnatur': 4.0,
+    'anspruch': 4.5, 'einrede': 4.0, 'einwendung': 4.0, 'schuldverhältnis': 4.0,
+    'vertrag': 3.5, 'eigentum': 3.5, 'besitz': 3.5, 'haftung': 4.0, 'schadenersatz': 4.0,
+    
+    # Gutachtenstruktur
+    'gutachten': 5.0, 'stellungnahme': 4.0, 'zwischenergebnis': 4.0, 'gesamtergebnis': 4.5,
+    'definitionen': 3.5, 'obersatz': 4.0, 'voraussetzungen': 4.0, 'aufbau': 3.0,
+    'gliederung': 3.0, 'struktur': 3.0, 'darstellung': 3.0, 'rechtsschema': 4.0,
+    
+    # Erweiterte juristische Termini für Gutachten
+    'gutachtenstil': 5.0, 'aufbauschema': 4.5, 'syllogismus': 4.0, 'obersatz': 4.5, 
+    'untersatz': 4.5, 'schlusssatz': 4.5, 'hauptteil': 4.0, 'hilfsgutachten': 5.0,
+    'nebenprüfung': 4.0, 'inzidentprüfung': 4.5, 'exkurs': 3.5, 'prüfungsschema': 4.5,
+    'prüfungsreihenfolge': 4.0, 'anspruchsgrundlage': 5.0, 'anspruchsaufbau': 4.5,
+    'fallbearbeitung': 4.0, 'fallanalyse': 4.0, 'fallgestaltung': 4.0,
+    
+    # Abstrakte juristische Bewertungsbegriffe
+    'verhältnismäßigkeit': 4.5, 'zumutbar': 4.0, 'angemessen': 4.0, 'erforderlich': 4.0,
+    'geeignet': 3.5, 'abwehrrecht': 4.0, 'leistungsrecht': 4.0, 'schutzpflicht': 4.0, 
+    'schutzbereich': 4.0, 'kernbereich': 4.0, 'einzelfall': 3.5, 'rechtsgut': 4.0,
+    
+    # Methodenlehre und juristische Argumentation
+    'methodenlehre': 4.5, 'auslegungsmethode': 4.5, 'normenhierarchie': 4.5, 
+    'verfassungskonforme': 4.5, 'analogie': 4.5, 'rechtsfortbildung': 4.5, 'lückenfüllung': 4.0,
+    'teleologische': 4.0, 'reduktion': 3.5, 'größenschluss': 4.0, 'erst-recht-schluss': 4.0,
+    'umkehrschluss': 4.0, 'derogation': 4.0, 'generalklausel': 4.0
+}
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick-Automat über dem juristischen Schlüsselwortvokabular.
+
+    Der Automat wird einmalig beim Import aufgebaut und findet in einem einzigen Durchlauf
+    alle Schlüsselwörter, die in einem Wort enthalten sind (auch überlappende Treffer wie
+    'frage' in 'rechtsfrage').
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        # Trie aus allen Schlüsselwörtern aufbauen
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # Fehlerübergänge per Breitensuche berechnen und Ausgaben entlang der Fehlerkette vererben
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def search(self, text):
+        """
+        Liefert die Indizes aller Schlüsselwörter, die in text vorkommen, in Vokabularreihenfolge.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        found = set()
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return tuple(sorted(found))
+
+
+_KEYWORD_ITEMS = tuple(SEMANTIC_KEYWORDS.items())
+
+# Schlüsselwörter, die nur aus Wortzeichen bestehen, laufen über den Automaten.
+# Alle anderen (z.B. 'erst-recht-schluss') behalten die ursprüngliche Regex-Zählung.
+_WORD_PATTERN = re.compile(r'\w+')
+_AUTOMATON_KEYWORD_INDICES = tuple(i for i, (keyword, _) in enumerate(_KEYWORD_ITEMS) if _WORD_PATTERN.fullmatch(keyword))
+_KEYWORD_AUTOMATON = _KeywordAutomaton(_KEYWORD_ITEMS[i][0] for i in _AUTOMATON_KEYWORD_INDICES)
+_IRREGULAR_KEYWORDS = tuple(
+    (i, re.compile(r'\b' + re.escape(keyword) + r'\b'), re.compile(r'\b\w*' + re.escape(keyword) + r'\w*\b'))
+    for i, (keyword, _) in enumerate(_KEYWORD_ITEMS) if not _WORD_PATTERN.fullmatch(keyword)
+)
+
+@lru_cache(maxsize=65536)
+def _keywords_in_word(word):
+    """Gibt die Indizes (in SEMANTIC_KEYWORDS) aller Schlüsselwörter zurück, die in word enthalten sind."""
+    return tuple(_AUTOMATON_KEYWORD_INDICES[i] for i in _KEYWORD_AUTOMATON.search(word))
+
+# Vorkompilierte Muster für Gesetzesverweise und Strukturelemente
+_LAW_REFERENCE_PATTERNS = (
+    ('bgb', re.compile(r'§\s*\d+\s*(?:bgb|bürgerliches\s+gesetzbuch)')),
+    ('stgb', re.compile(r'§\s*\d+\s*(?:stgb|strafgesetzbuch)')),
+    ('hgb', re.compile(r'§\s*\d+\s*(?:hgb|handelsgesetzbuch)')),
+    ('zpo', re.compile(r'§\s*\d+\s*(?:zpo|zivilprozessordnung)')),
+)
+_GENERAL_NORM_PATTERN = re.compile(r'§\s*\d+')
+_ARTIKEL_PATTERN = re.compile(r'Art(?:ikel)?\.\s*\d+')
+_ROMAN_HEADING_PATTERN = re.compile(r'^[IVX]+\.\s+', re.MULTILINE)
+_NUMERIC_HEADING_PATTERN = re.compile(r'^\d+\.\s+', re.MULTILINE)
+_ALPHABETIC_HEADING_PATTERN = re.compile(r'^[A-Z]\.\s+', re.MULTILINE)
+_CAPITALIZED_WORD_PATTERN = re.compile(r'\b[A-Z]{3,}\b')
+
+# Gutachtenspezifische Erkennungsmerkmale
+_LEGAL_OPINION_MARKERS = tuple(re.compile(marker) for marker in (
+    r'(?:im folgenden|im weiteren) ist zu prüfen',
+    r'(?:im ergebnis|zusammenfassend) (?:ist|lässt sich) festzuhalten',
+    r'dem ist zu entgegnen',
+    r'fraglich ist, ob',
+    r'zu prüfen ist',
+    r'folgende rechtsfragen'
+))
+
+# Festes Vokabular der semantischen Vektoren: alle Schlüsselwörter plus die
+# zusätzlichen Struktur- und Verweismerkmale aus get_semantic_embeddings
+SEMANTIC_VOCABULARY = tuple(SEMANTIC_KEYWORDS) + (
+    'gesetzesreferenz', 'artikelreferenz', 'gliederung_römisch',
+    'gliederung_numerisch', 'gliederung_alphabetisch', 'betonung'
+)
+VOCABULARY_INDEX = {term: index for index, term in enumerate(SEMANTIC_VOCABULARY)}
+
+# float64, damit Ähnlichkeitswerte und damit Segmentgrenzen denen der Dictionary-Berechnung entsprechen
+FEATURE_DTYPE = np.float64
+
+# Definiere Kategorien für juristische Konzepte, um ähnliche Konzepte zu gruppieren
+# Dies verbessert die Ähnlichkeitserkennung, selbst wenn nicht exakt dieselben Begriffe verwendet werden
+CONCEPT_CATEGORIES = {
+    'sachverhalt': ['sachverhalt', 'tatbestand', 'lebenssachverhalt', 'fall', 'geschehen', 'vorgang', 
+                   'situation', 'ausgangslage', 'umstände', 'tatsachen', 'ereignis'],
+
+    'normenbezug': ['gesetz', 'paragraph', 'artikel', 'vorschrift', 'bestimmung', 'regelung', 'norm', 
+                    'richtlinie', 'verordnung', 'kodifikation', 'gesetzbuch', 'gesetzesreferenz', 
+                    'artikelreferenz', 'bgb', 'stgb', 'hgb', 'zpo'],
+
+    'auslegung': ['auslegung', 'wortlaut', 'systematik', 'teleologie', 'telos', 'historisch', 'genese', 
+                 'zweck', 'sinn', 'gesetzgebung', 'materialien', 'gesetzgeber', 'interpretation', 
+                 'wörtlich', 'grammatikalisch', 'systematische', 'teleologische', 'historische'],
+
+    'subsumtion': ['subsumtion', 'erfüllt', 'tatbestandsmerkmal', 'voraussetzung', 'merkmal', 'prüfung', 
+                  'anwendung', 'tatbestand', 'rechtsfolge', 'gegeben', 'vorliegend', 'einschlägig', 
+                  'tatbestandlich', 'erforderlich', 'hinreichend'],
+
+    'argumentation': ['argument', 'begründung', 'wertung', 'abwägung', 'dogmatik', 'ansicht', 'meinung', 
+                     'auffassung', 'vertretbar', 'herrschend', 'minderheit', 'streit', 'umstritten', 
+                     'streitig', 'eindeutig', 'unstreitig', 'unklar', 'fraglich', 'problematisch'],
+
+    'struktur': ['gliederung', 'gliederung_römisch', 'gliederung_numerisch', 'gliederung_alphabetisch', 
+                'betonung', 'gutachtenstil', 'aufbau', 'struktur', 'darstellung'],
+
+    'ergebnis': ['ergebnis', 'fazit', 'schlussfolgerung', 'zusammenfassung', 'zwischenergebnis', 
+                'gesamtergebnis', 'lösung', 'bewertung', 'beurteilung'],
+            
+    'gutachtenstil': ['gutachtenstil', 'aufbauschema', 'syllogismus', 'obersatz', 'untersatz', 
+                     'schlusssatz', 'hauptteil', 'hilfsgutachten', 'prüfungsschema'],
+                 
+    'methodenlehre': ['methodenlehre', 'auslegungsmethode', 'normenhierarchie', 'verfassungskonforme', 
+                     'analogie', 'rechtsfortbildung', 'lückenfüllung', 'teleologische', 'reduktion']
+}
+
+# Projektion der Vokabularbegriffe auf ihre Kategorie (one-hot, Begriffe ohne Kategorie landen in 'other').
+# Wird einmalig beim Import aufgebaut; die Kategoriesummen eines Vektors sind damit ein Matrix-Vektor-Produkt.
+_TERM_TO_CATEGORY = {}
+for _category_index, _terms in enumerate(CONCEPT_CATEGORIES.values()):
+    for _term in _terms:
+        _TERM_TO_CATEGORY[_term] = _category_index
+_CATEGORY_PROJECTION = np.zeros((len(SEMANTIC_VOCABULARY), len(CONCEPT_CATEGORIES) + 1), dtype=FEATURE_DTYPE)
+_CATEGORY_PROJECTION[np.arange(len(SEMANTIC_VOCABULARY)),
+                     [_TERM_TO_CATEGORY.get(term, len(CONCEPT_CATEGORIES)) for term in SEMANTIC_VOCABULARY]] = 1.0
+
 
 def get_semantic_embeddings(text_segment):
     """
@@ -26,313 +273,217 @@ def get_semantic_embeddings(text_segment):
     # Verbesserte Keyword-basierte Analyse
     semantic_vector = defaultdict(float)
     
-    # Juristische Terminologie und deren Gewichtung - erweitert und kategorisiert
-    keywords = {
-        # Sachverhalt-Terminologie
-        'sachverhalt': 6.0, 'tatbestand': 6.0, 'lebenssachverhalt': 6.0, 'fall': 3.0,
-        'geschehen': 2.0, 'vorgang': 2.0, 'situation': 2.0, 'ausgangslage': 2.5,
-        'umstände': 2.0, 'tatsachen': 2.5, 'ereignis': 2.0, 
-        
-        # Hauptkategorien juristischer Gutachten
-        'frage': 5.0, 'rechtsfrage': 5.5, 'fragestellung': 5.0, 'problematik': 4.5,
-        'lösung': 4.5, 'ergebnis': 5.0, 'bewertung': 4.0, 'beurteilung': 4.0,
-        'lösungsansatz': 4.0, 'fazit': 5.0, 'schlussfolgerung': 5.0, 'zusammenfassung': 4.5,
-        
-        # Prozessuale Begriffe
-        'klage': 4.5, 'antrag': 4.5, 'verfahren': 4.5, 'instanz': 3.5, 'revision': 4.5,
-        'berufung': 4.5, 'beschwerde': 4.5, 'einspruch': 4.5, 'widerspruch': 4.5,
-        'kläger': 3.5, 'beklagte': 3.5, 'gericht': 3.5, 'entscheidung': 4.0,
-        'zuständigkeit': 4.0, 'frist': 3.5, 'zulässigkeit': 4.5, 'begründetheit': 4.5,
-        
-        # Normen-Terminologie
-        'gesetz': 3.5, 'paragraph': 4.0, 'artikel': 3.5, 'vorschrift': 3.5, 'bestimmung': 3.5,
-        'regelung': 3.0, 'norm': 4.0, 'richtlinie': 3.5, 'verordnung': 3.5, 'kodifikation': 3.0,
-        'gesetzbuch': 3.5, 'bgb': 4.5, 'stgb': 4.5, 'hgb': 4.5, 'zpo': 4.5, 'stvo': 4.5,
-        'erbrecht': 4.0, 'familienrecht': 4.0, 'schuldrecht': 4.0, 'sachenrecht': 4.0,
-        
-        # Auslegungsmethoden
-        'auslegung': 5.0, 'wortlaut': 4.5, 'systematik': 4.5, 'teleologie': 4.5, 'telos': 4.0,
-        'historisch': 4.0, 'genese': 4.0, 'zweck': 4.0, 'sinn': 3.5, 'gesetzgebung': 3.5,
-        'materialien': 3.5, 'gesetzgeber': 4.0, 'interpretation': 4.0, 'wörtlich': 4.0,
-        'grammatikalisch': 4.0, 'systematische': 4.0, 'teleologische': 4.0, 'historische': 4.0,
-        
-        # Subsumtion
-        'subsumtion': 6.0, 'erfüllt': 4.0, 'tatbestandsmerkmal': 5.0, 'voraussetzung': 4.5,
-        'merkmal': 3.5, 'prüfung': 4.5, 'anwendung': 4.0, 'tatbestand': 5.0, 'rechtsfolge': 5.0,
-        'gegeben': 3.5, 'vorliegend': 4.0, 'einschlägig': 4.0, 'passend': 3.0, 
-        'tatbestandlich': 4.5, 'erforderlich': 3.5, 'hinreichend': 3.5,
-        
-        # Argumentationstechnik und Dogmatik
-        'argument': 3.0, 'begründung': 4.0, 'wertung': 3.5, 'abwägung': 4.0, 'dogmatik': 4.5,
-        'ansicht': 3.0, 'meinung': 3.0, 'auffassung': 3.0, 'vertretbar': 3.0, 'herrschend': 3.5,
-        'minderheit': 3.0, 'streit': 3.5, 'umstritten': 4.0, 'streitig': 4.0, 'eindeutig': 3.5,
-        'unstreitig': 3.5, 'unklar': 3.0, 'fraglich': 4.0, 'problematisch': 4.0,
-        
-        # Rechtsprechung und Literatur
-        'rechtsprechung': 4.5, 'bgh': 4.5, 'bundesgerichtshof': 4.5, 'olg': 4.0, 
-        'oberlandesgericht': 4.0, 'lg': 3.5, 'ag': 3.5, 'bverfg': 4.5, 'bundesverfassungsgericht': 4.5,
-        'literatur': 3.5, 'lehre': 3.5, 'kommentar': 3.5, 'monographie': 3.0, 'aufsatz': 3.0,
-        'palandt': 4.0, 'münchener': 4.0, 'staudinger': 4.0, 'larenz': 3.5, 'canaris': 3.5,
-        
-        # Rechtsfolgen und Rechtsinstitute
-        'rechtsfolge': 5.0, 'folge': 3.0, 'konsequenz': 3.5, 'rechtsverhältnis': 4.0,
-        'wirkung': 3.0, 'geltung': 3.0, 'rechtswirkung': 4.0, 'rechtsnatur': 4.0,
-        'anspruch': 4.5, 'einrede': 4.0, 'einwendung': 4.0, 'schuldverhältnis': 4.0,
-        'vertrag': 3.5, 'eigentum': 3.5, 'besitz': 3.5, 'haftung': 4.0, 'schadenersatz': 4.0,
-        
-        # Gutachtenstruktur
-        'gutachten': 5.0, 'stellungnahme': 4.0, 'zwischenergebnis': 4.0, 'gesamtergebnis': 4.5,
-        'definitionen': 3.5, 'obersatz': 4.0, 'voraussetzungen': 4.0, 'aufbau': 3.0,
-        'gliederung': 3.0, 'struktur': 3.0, 'darstellung': 3.0, 'rechtsschema': 4.0,
-        
-        # Erweiterte juristische Termini für Gutachten
-        'gutachtenstil': 5.0, 'aufbauschema': 4.5, 'syllogismus': 4.0, 'obersatz': 4.5, 
-        'untersatz': 4.5, 'schlusssatz': 4.5, 'hauptteil': 4.0, 'hilfsgutachten': 5.0,
-        'nebenprüfung': 4.0, 'inzidentprüfung': 4.5, 'exkurs': 3.5, 'prüfungsschema': 4.5,
-        'prüfungsreihenfolge': 4.0, 'anspruchsgrundlage': 5.0, 'anspruchsaufbau': 4.5,
-        'fallbearbeitung': 4.0, 'fallanalyse': 4.0, 'fallgestaltung': 4.0,
-        
-        # Abstrakte juristische Bewertungsbegriffe
-        'verhältnismäßigkeit': 4.5, 'zumutbar': 4.0, 'angemessen': 4.0, 'erforderlich': 4.0,
-        'geeignet': 3.5, 'abwehrrecht': 4.0, 'leistungsrecht': 4.0, 'schutzpflicht': 4.0, 
-        'schutzbereich': 4.0, 'kernbereich': 4.0, 'einzelfall': 3.5, 'rechtsgut': 4.0,
-        
-        # Methodenlehre und juristische Argumentation
-        'methodenlehre': 4.5, 'auslegungsmethode': 4.5, 'normenhierarchie': 4.5, 
-        'verfassungskonforme': 4.5, 'analogie': 4.5, 'rechtsfortbildung': 4.5, 'lückenfüllung': 4.0,
-        'teleologische': 4.0, 'reduktion': 3.5, 'größenschluss': 4.0, 'erst-recht-schluss': 4.0,
-        'umkehrschluss': 4.0, 'derogation': 4.0, 'generalklausel': 4.0
-    }
-    
     # Zähle Vorkommen der Keywords mit Kontextgewichtung
     text_lower = text_segment.lower()
     
-    # Normalisiere Leerzeichen und entferne Sonderzeichen für bessere Erkennung
-    normalized_text = re.sub(r'\s+', ' ', text_lower)
-    
-    for keyword, weight in keywords.items():
-        # Zähle exakte Wortvorkommnisse (mit Wortgrenzenerkennung)
-        exact_matches = len(re.findall(r'\b' + re.escape(keyword) + r'\b', normalized_text))
-        
-        # Betrachte Komposita zusätzlich mit geringerem Gewicht
-        partial_matches = len(re.findall(r'\b\w*' + re.escape(keyword) + r'\w*\b', normalized_text)) - exact_matches
-        
+    # Ein Durchlauf über alle Wörter: Jedes unterschiedliche Wort wird nur einmal durch den
+    # Keyword-Automaten geschickt. Stimmt das Wort mit dem Keyword überein, ist es ein exakter
+    # Treffer, andernfalls ein Kompositum (entspricht \bkw\b bzw. \b\w*kw\w*\b).
+    exact_matches = defaultdict(int)
+    partial_matches = defaultdict(int)
+    for word, count in Counter(_WORD_PATTERN.findall(text_lower)).items():
+        for index in _keywords_in_word(word):
+            if word == _KEYWORD_ITEMS[index][0]:
+                exact_matches[index] += count
+            else:
+                partial_matches[index] += count
+    
+    # Keywords mit Nicht-Wortzeichen werden wie bisher per Regex gezählt
+    if _IRREGULAR_KEYWORDS:
+        normalized_text = WHITESPACE_PATTERN.sub(' ', text_lower)
+        for index, exact_pattern, partial_pattern in _IRREGULAR_KEYWORDS:
+            exact_count = len(exact_pattern.findall(normalized_text))
+            if exact_count > 0:
+                exact_matches[index] += exact_count
+            partial_count = len(partial_pattern.findall(normalized_text)) - exact_count
+            if partial_count > 0:
+                partial_matches[index] += partial_count
+    
+    # Vektor in Vokabularreihenfolge aufbauen, damit die Schlüsselreihenfolge stabil bleibt
+    for index in sorted(exact_matches.keys() | partial_matches.keys()):
+        keyword, weight = _KEYWORD_ITEMS[index]
         # Gewichte exakte Übereinstimmungen stärker
-        if exact_matches > 0:
-            semantic_vector[keyword] = exact_matches * weight
-        if partial_matches > 0:
-            semantic_vector[keyword] += partial_matches * (weight * 0.4)  # Reduktion für Teilübereinstimmungen
+        if exact_matches[index] > 0:
+            semantic_vector[keyword] = exact_matches[index] * weight
+        if partial_matches[index] > 0:
+            semantic_vector[keyword] += partial_matches[index] * (weight * 0.4)  # Reduktion für Teilübereinstimmungen
     
     # Berücksichtige Positionsgewichtung (Begriffe am Anfang sind oft wichtiger)
     first_paragraph = text_segment.split('\n\n', 1)[0] if '\n\n' in text_segment else text_segment[:500]
     first_paragraph_lower = first_paragraph.lower()
     
-    for keyword, weight in keywords.items():
-        if keyword in first_paragraph_lower:
-            # Verstärke Gewichtung für Schlüsselwörter im ersten Absatz
-            semantic_vector[keyword] *= 1.5
+    first_paragraph_keywords = set()
+    for word in set(_WORD_PATTERN.findall(first_paragraph_lower)):
+        first_paragraph_keywords.update(_keywords_in_word(word))
+    for index, _, _ in _IRREGULAR_KEYWORDS:
+        if _KEYWORD_ITEMS[index][0] in first_paragraph_lower:
+            first_paragraph_keywords.add(index)
+    
+    for index in sorted(first_paragraph_keywords):
+        # Verstärke Gewichtung für Schlüsselwörter im ersten Absatz
+        semantic_vector[_KEYWORD_ITEMS[index][0]] *= 1.5
     
     # Spezifischere Erkennung von Gesetzesverweisen
     # Reguläre §-Verweise
-    bgb_references = len(re.findall(r'§\s*\d+\s*(?:bgb|bürgerliches\s+gesetzbuch)', text_lower))
-    if bgb_references > 0:
-        semantic_vector['bgb'] = bgb_references * 5.0
-    
-    stgb_references = len(re.findall(r'§\s*\d+\s*(?:stgb|strafgesetzbuch)', text_lower))
-    if stgb_references > 0:
-        semantic_vector['stgb'] = stgb_references * 5.0
-    
-    hgb_references = len(re.findall(r'§\s*\d+\s*(?:hgb|handelsgesetzbuch)', text_lower))
-    if hgb_references > 0:
-        semantic_vector['hgb'] = hgb_references * 5.0
-    
-    zpo_references = len(re.findall(r'§\s*\d+\s*(?:zpo|zivilprozessordnung)', text_lower))
-    if zpo_references > 0:
-        semantic_vector['zpo'] = zpo_references * 5.0
+    for keyword, pattern in _LAW_REFERENCE_PATTERNS:
+        references = len(pattern.findall(text_lower))
+        if references > 0:
+            semantic_vector[keyword] = references * 5.0
     
     # Allgemeine §-Verweise
-    general_norm_references = len(re.findall(r'§\s*\d+', text_segment))
+    general_norm_references = len(_GENERAL_NORM_PATTERN.findall(text_segment))
     semantic_vector['gesetzesreferenz'] = general_norm_references * 4.5
     
     # Artikelverweise
-    artikel_references = len(re.findall(r'Art(?:ikel)?\.\s*\d+', text_segment))
+    artikel_references = len(_ARTIKEL_PATTERN.findall(text_segment))
     semantic_vector['artikelreferenz'] = artikel_references * 4.5
     
     # Erkennung von Strukturelementen
     # Zwischenüberschriften - verschiedene Formate
-    roman_numerals = len(re.findall(r'^[IVX]+\.\s+', text_segment, re.MULTILINE))
+    roman_numerals = len(_ROMAN_HEADING_PATTERN.findall(text_segment))
     semantic_vector['gliederung_römisch'] = roman_numerals * 4.0
     
-    numeric_headings = len(re.findall(r'^\d+\.\s+', text_segment, re.MULTILINE))
+    numeric_headings = len(_NUMERIC_HEADING_PATTERN.findall(text_segment))
     semantic_vector['gliederung_numerisch'] = numeric_headings * 3.5
     
-    alphabetic_headings = len(re.findall(r'^[A-Z]\.\s+', text_segment, re.MULTILINE))
+    alphabetic_headings = len(_ALPHABETIC_HEADING_PATTERN.findall(text_segment))
     semantic_vector['gliederung_alphabetisch'] = alphabetic_headings * 3.5
     
     # Wichtige Wörter in Großbuchstaben (oft Überschriften oder Betonungen)
-    capitalized_words = len(re.findall(r'\b[A-Z]{3,}\b', text_segment))
+    capitalized_words = len(_CAPITALIZED_WORD_PATTERN.findall(text_segment))
     semantic_vector['betonung'] = capitalized_words * 2.5
     
     # Gutachtenspezifische Erkennungsmerkmale
-    legal_opinion_markers = [
-        r'(?:im folgenden|im weiteren) ist zu prüfen', 
-        r'(?:im ergebnis|zusammenfassend) (?:ist|lässt sich) festzuhalten',
-        r'dem ist zu entgegnen', 
-        r'fraglich ist, ob', 
-        r'zu prüfen ist',
-        r'folgende rechtsfragen'
-    ]
-    
-    for marker in legal_opinion_markers:
-        if re.search(marker, text_lower):
+    for marker in _LEGAL_OPINION_MARKERS:
+        if marker.search(text_lower):
             semantic_vector['gutachtenstil'] = semantic_vector.get('gutachtenstil', 0) + 4.0
     
     return semantic_vector
 
-def calculate_semantic_similarity(vector1, vector2):
+def semantic_vector_to_array(vector):
     """
-    Berechnet die semantische Ähnlichkeit zwischen zwei semantischen Vektoren
-    mit verbesserter Berücksichtigung juristischer Fachbegriffe und Kategorien.
+    Überführt einen semantischen Vektor (Dictionary aus get_semantic_embeddings) in eine
+    Zeile über SEMANTIC_VOCABULARY.
     
     Args:
-        vector1: Der erste semantische Vektor (Dictionary)
-        vector2: Der zweite semantische Vektor (Dictionary)
+        vector: Der semantische Vektor (Dictionary) oder bereits ein NumPy-Array
         
     Returns:
-        Ein Wert zwischen 0 und 1, der die Ähnlichkeit angibt
+        Ein eindimensionales NumPy-Array der Länge len(SEMANTIC_VOCABULARY). Begriffe außerhalb
+        des Vokabulars werden ignoriert.
     """
-    # Robustheitsprüfung für die Eingabe
-    if not vector1 or not vector2:
-        return 0.0
+    if isinstance(vector, np.ndarray):
+        return vector
+    row = np.zeros(len(SEMANTIC_VOCABULARY), dtype=FEATURE_DTYPE)
+    if isinstance(vector, dict):
+        for term, weight in vector.items():
+            index = VOCABULARY_INDEX.get(term)
+            if index is not None and isinstance(weight, (int, float)):
+                row[index] = weight
+    return row
+
+def get_semantic_feature_matrix(text_segments):
+    """
+    Berechnet die semantischen Vektoren mehrerer Textabschnitte als dichte Merkmalsmatrix.
+    
+    Args:
+        text_segments: Liste der Textabschnitte (z.B. Absätze eines Dokuments)
         
-    # Stelle sicher, dass beide Vektoren Dictionaries sind
-    if not isinstance(vector1, dict) or not isinstance(vector2, dict):
-        print(f"Warnung: Nicht-Dictionary-Vektor in calculate_semantic_similarity")
-        if not isinstance(vector1, dict):
-            vector1 = {}
-        if not isinstance(vector2, dict):
-            vector2 = {}
-        return 0.0  # Keine Ähnlichkeit, wenn keine gültigen Vektoren
+    Returns:
+        Ein NumPy-Array der Form (len(text_segments), len(SEMANTIC_VOCABULARY)).
+        Abschnitte, für die kein Vektor berechnet werden kann, ergeben eine Nullzeile.
+    """
+    matrix = np.zeros((len(text_segments), len(SEMANTIC_VOCABULARY)), dtype=FEATURE_DTYPE)
+    for row, text_segment in enumerate(text_segments):
+        try:
+            vector = get_semantic_embeddings(text_segment)
+        except Exception as e:
+            print(f"Fehler bei Vektorgenerierung: {str(e)}")
+            continue
+        for term, weight in vector.items():
+            index = VOCABULARY_INDEX.get(term)
+            if index is not None:
+                matrix[row, index] = weight
+    return matrix
+
+def calculate_category_sums(matrix):
+    """
+    Aggregiert die Termgewichte eines oder mehrerer semantischer Vektoren pro Konzeptkategorie.
     
-    # Prüfe, ob die Vektoren Daten enthalten
-    if not vector1 or not vector2:
-        return 0.0
+    Das Ergebnis kann an calculate_semantic_similarities übergeben werden, damit Vektoren, die
+    wiederholt verglichen werden (z.B. der laufende Segmentvektor), nicht jedes Mal neu aggregiert werden.
+    Da die Projektion linear ist, gilt für gewichtete Summen von Vektoren dasselbe für ihre Kategoriesummen.
     
-    # Definiere Kategorien für juristische Konzepte, um ähnliche Konzepte zu gruppieren
-    # Dies verbessert die Ähnlichkeitserkennung, selbst wenn nicht exakt dieselben Begriffe verwendet werden
-    concept_categories = {
-        'sachverhalt': ['sachverhalt', 'tatbestand', 'lebenssachverhalt', 'fall', 'geschehen', 'vorgang', 
-                       'situation', 'ausgangslage', 'umstände', 'tatsachen', 'ereignis'],
-        
-        'normenbezug': ['gesetz', 'paragraph', 'artikel', 'vorschrift', 'bestimmung', 'regelung', 'norm', 
-                        'richtlinie', 'verordnung', 'kodifikation', 'gesetzbuch', 'gesetzesreferenz', 
-                        'artikelreferenz', 'bgb', 'stgb', 'hgb', 'zpo'],
-        
-        'auslegung': ['auslegung', 'wortlaut', 'systematik', 'teleologie', 'telos', 'historisch', 'genese', 
-                     'zweck', 'sinn', 'gesetzgebung', 'materialien', 'gesetzgeber', 'interpretation', 
-                     'wörtlich', 'grammatikalisch', 'systematische', 'teleologische', 'historische'],
-        
-        'subsumtion': ['subsumtion', 'erfüllt', 'tatbestandsmerkmal', 'voraussetzung', 'merkmal', 'prüfung', 
-                      'anwendung', 'tatbestand', 'rechtsfolge', 'gegeben', 'vorliegend', 'einschlägig', 
-                      'tatbestandlich', 'erforderlich', 'hinreichend'],
-        
-        'argumentation': ['argument', 'begründung', 'wertung', 'abwägung', 'dogmatik', 'ansicht', 'meinung', 
-                         'auffassung', 'vertretbar', 'herrschend', 'minderheit', 'streit', 'umstritten', 
-                         'streitig', 'eindeutig', 'unstreitig', 'unklar', 'fraglich', 'problematisch'],
-        
-        'struktur': ['gliederung', 'gliederung_römisch', 'gliederung_numerisch', 'gliederung_alphabetisch', 
-                    'betonung', 'gutachtenstil', 'aufbau', 'struktur', 'darstellung'],
+    Args:
+        matrix: NumPy-Array der Form (n, len(SEMANTIC_VOCABULARY)) oder eine einzelne Zeile
         
-        'ergebnis': ['ergebnis', 'fazit', 'schlussfolgerung', 'zusammenfassung', 'zwischenergebnis', 
-                    'gesamtergebnis', 'lösung', 'bewertung', 'beurteilung'],
-                    
-        'gutachtenstil': ['gutachtenstil', 'aufbauschema', 'syllogismus', 'obersatz', 'untersatz', 
-                         'schlusssatz', 'hauptteil', 'hilfsgutachten', 'prüfungsschema'],
-                         
-        'methodenlehre': ['methodenlehre', 'auslegungsmethode', 'normenhierarchie', 'verfassungskonforme', 
-                         'analogie', 'rechtsfortbildung', 'lückenfüllung', 'teleologische', 'reduktion']
-    }
+    Returns:
+        Ein NumPy-Array der Form (n, len(CONCEPT_CATEGORIES) + 1) bzw. eine einzelne Zeile
+    """
+    return matrix @ _CATEGORY_PROJECTION
+
+def calculate_semantic_similarities(matrix1, matrix2, categories1=None, categories2=None):
+    """
+    Berechnet die semantische Ähnlichkeit zeilenweise für zwei Merkmalsmatrizen gleicher Form,
+    d.h. Zeile i von matrix1 wird mit Zeile i von matrix2 verglichen.
     
-    # Erzeuge einen Kategorie-zu-Term-Mapping
-    term_to_category = {}
-    for category, terms in concept_categories.items():
-        for term in terms:
-            term_to_category[term] = category
+    Die Ähnlichkeit kombiniert direkte Term-Übereinstimmungen (70%) mit Übereinstimmungen
+    auf Ebene juristischer Konzeptkategorien (30%).
     
-    # Berechne kategoriebasierte Ähnlichkeit
-    category_scores = {}
+    Args:
+        matrix1: NumPy-Array der Form (n, len(SEMANTIC_VOCABULARY))
+        matrix2: NumPy-Array der Form (n, len(SEMANTIC_VOCABULARY))
+        categories1: Optional bereits berechnete Kategoriesummen von matrix1 (siehe calculate_category_sums)
+        categories2: Optional bereits berechnete Kategoriesummen von matrix2
+        
+    Returns:
+        Ein NumPy-Array der Länge n mit Werten zwischen 0 und 1
+    """
+    matrix1 = np.atleast_2d(matrix1)
+    matrix2 = np.atleast_2d(matrix2)
     
-    # Aggregiere Termgewichte pro Kategorie mit verbesserter Fehlerbehandlung
-    for vector, is_first in [(vector1, True), (vector2, False)]:
-        for term, weight in vector.items():
-            if not isinstance(weight, (int, float)):
-                # Wenn weight kein numerischer Wert ist, setze einen Standardwert
-                weight = 1.0
-                
-            category = term_to_category.get(term, 'other')
-            
-            # Robustere Initialisierung mit expliziter Fehlerbehandlung
-            try:
-                if is_first:
-                    if category not in category_scores:
-                        category_scores[category] = [0, 0]
-                    category_scores[category][0] += weight
-                else:
-                    if category in category_scores:
-                        category_scores[category][1] += weight
-                    else:
-                        category_scores[category] = [0, weight]
-            except Exception as e:
-                print(f"Fehler bei der Ähnlichkeitsberechnung für Term '{term}': {str(e)}")
-                # Erstelle einen neuen Eintrag für diese Kategorie
-                category_scores[category] = [weight if is_first else 0, 0 if is_first else weight]
-    
-    # Berechne die Ähnlichkeit basierend auf Kategoriescores
-    category_min_sum = 0
-    category_total_sum = 0
-    
-    for cat_scores in category_scores.values():
-        # Sicherstellen, dass beide Vektoren Werte für diese Kategorie haben
-        if cat_scores[0] > 0 and cat_scores[1] > 0:
-            category_min_sum += min(cat_scores[0], cat_scores[1])
-        category_total_sum += cat_scores[0] + cat_scores[1]
-    
-    # Berechne auch direkte Term-Übereinstimmungen für höhere Präzision
-    common_keys = set(vector1.keys()) & set(vector2.keys())
-    term_min_sum = 0
-    
-    # Fehlerbehandlung für die term_min_sum-Berechnung
-    for key in common_keys:
-        try:
-            v1 = vector1[key]
-            v2 = vector2[key]
-            
-            # Stelle sicher, dass wir numerische Werte haben
-            if not isinstance(v1, (int, float)):
-                v1 = 1.0
-            if not isinstance(v2, (int, float)):
-                v2 = 1.0
-                
-            term_min_sum += min(v1, v2)
-        except Exception as e:
-            print(f"Fehler bei direkter Termähnlichkeitsberechnung für '{key}': {str(e)}")
-            # Überspringe diesen Term bei Fehlern
-            continue
+    # Aggregiere Termgewichte pro Kategorie, sofern nicht bereits bekannt
+    categories1 = calculate_category_sums(matrix1) if categories1 is None else np.atleast_2d(categories1)
+    categories2 = calculate_category_sums(matrix2) if categories2 is None else np.atleast_2d(categories2)
     
-    term_total_sum = sum(vector1.values()) + sum(vector2.values())
+    # Da alle Gewichte nichtnegativ sind, liefert das Minimum nur dort einen Beitrag,
+    # wo beide Vektoren Werte für die Kategorie bzw. den Term haben
+    category_min_sum = np.minimum(categories1, categories2).sum(axis=1)
+    category_total_sum = categories1.sum(axis=1) + categories2.sum(axis=1)
+    term_min_sum = np.minimum(matrix1, matrix2).sum(axis=1)
+    term_total_sum = matrix1.sum(axis=1) + matrix2.sum(axis=1)
     
     # Gewichtete Kombination aus kategoriebasierter und direkter Ähnlichkeit
-    if category_total_sum == 0 or term_total_sum == 0:
-        return 0.0
+    valid = (category_total_sum > 0) & (term_total_sum > 0)
+    similarities = np.zeros(len(valid), dtype=FEATURE_DTYPE)
+    category_similarity = (2 * category_min_sum[valid]) / category_total_sum[valid]
+    term_similarity = (2 * term_min_sum[valid]) / term_total_sum[valid]
     
-    category_similarity = (2 * category_min_sum) / category_total_sum if category_total_sum > 0 else 0
-    term_similarity = (2 * term_min_sum) / term_total_sum if term_total_sum > 0 else 0
-    
-    # Kombiniere beide Ähnlichkeitsmaße mit Gewichtung
     # Erhöhe die Gewichtung der direkten Übereinstimmungen für höhere Präzision
-    combined_similarity = (0.7 * term_similarity) + (0.3 * category_similarity)
+    similarities[valid] = (0.7 * term_similarity) + (0.3 * category_similarity)
+    return similarities
+
+def calculate_semantic_similarity(vector1, vector2):
+    """
+    Berechnet die semantische Ähnlichkeit zwischen zwei semantischen Vektoren
+    mit verbesserter Berücksichtigung juristischer Fachbegriffe und Kategorien.
     
-    return combined_similarity
+    Args:
+        vector1: Der erste semantische Vektor (Dictionary oder Zeile über SEMANTIC_VOCABULARY)
+        vector2: Der zweite semantische Vektor (Dictionary oder Zeile über SEMANTIC_VOCABULARY)
+        
+    Returns:
+        Ein Wert zwischen 0 und 1, der die Ähnlichkeit angibt
+    """
+    # Robustheitsprüfung für die Eingabe
+    if vector1 is None or vector2 is None:
+        return 0.0
+    if not isinstance(vector1, (dict, np.ndarray)) or not isinstance(vector2, (dict, np.ndarray)):
+        print(f"Warnung: Ungültiger Vektortyp in calculate_semantic_similarity")
+        return 0.0  # Keine Ähnlichkeit, wenn keine gültigen Vektoren
+    
+    return float(calculate_semantic_similarities(semantic_vector_to_array(vector1),
+                                                 semantic_vector_to_array(vector2))[0])
 
 def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0.25, max_segment_length=4000):
     """
@@ -347,39 +498,8 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     Returns:
         Eine Liste von Textsegmenten
     """
-    # Liste der Schlüsselwörter, die typischerweise einen neuen Abschnitt in juristischen Texten einleiten
-    legal_section_markers = [
-        # Allgemeine Übergangsmarker
-        r"\b[Ii]m [Ff]olgenden\b", r"\b[Zz]unächst\b", r"\b[Ii]m [Ee]rgebnis\b", r"\b[Ff]erner\b",
-        r"\b[Dd]es [Ww]eiteren\b", r"\b[Ii]m [Üü]brigen\b", r"\b[Dd]arüber hinaus\b",
-        r"\b[Ss]chließlich\b", r"\b[Zz]usammenfassend\b", r"\b[Aa]bschließend\b",
-        r"\b[Ee]ine andere [Ff]rage\b", r"\b[Zz]u [Bb]eachten ist\b", r"\b[Hh]iergegen\b",
-        r"\b[Aa]nders als\b", r"\b[Ii]m [Gg]egensatz\b", r"\b[Zz]u [Pp]rüfen ist\b",
-        r"\b[Ee]s bleibt [Ff]estzuhalten\b", r"\b[Ee]s ist noch [Aa]nzumerken\b",
-        r"\b[Aa]us den genannten [Gg]ründen\b", r"\b[Mm]aßgeblich ist\b",
-        
-        # Ergänzte Marker für spezifische Strukturen in Rechtsgutachten
-        r"\b[Dd]ie [Pp]rüfung ergibt\b", r"\b[Dd]ie [Bb]eurteilung\b", r"\b[Ii]n [Bb]ezug auf\b",
-        r"\b[Nn]unmehr\b", r"\b[Dd]emnach\b", r"\b[Ff]olglich\b", r"\b[Dd]araus ergibt sich\b",
-        r"\b[Ee]s ist davon auszugehen\b", r"\b[Ee]ine [Aa]usnahme\b", r"\b[Ii]m [Gg]rundsatz\b",
-        r"\b[Gg]rundsätzlich\b", r"\b[Ww]eiterhin\b", r"\b[Aa]llerdings\b", r"\b[Jj]edoch\b",
-        r"\b[Dd]emzufolge\b", r"\b[Dd]iesem [Gg]rundsatz folgend\b",
-        r"\b[Uu]nter [Bb]erücksichtigung\b", r"\b[Ii]n [Aa]nbetracht\b",
-        
-        # Gutachtenspezifische strukturelle Marker
-        r"\b[Dd]ie [Rr]echtsfolge\b", r"\b[Dd]er [Tt]atbestand\b", r"\b[Dd]ie [Tt]atbestandsmerkmale\b",
-        r"\b[Ff]raglich ist [Ff]olgendes\b", r"\b[Ii]m [Mm]ittelpunkt steht\b", r"\b[Zz]entral ist\b",
-        r"\b[Dd]abei ist zu beachten\b", r"\b[Aa]us rechtlicher [Ss]icht\b", r"\b[Dd]ies führt zu\b",
-        r"\b[Ii]n der [Ss]ache gilt\b", r"\b[Rr]echtlich gesehen\b",
-        
-        # Fortgeschrittene normbasierte Marker
-        r"\b[Dd]er Anwendungsbereich des\b", r"\b[Dd]ie [Vv]oraussetzungen des\b", 
-        r"\b[Nn]ach ständiger [Rr]echtsprechung\b", r"\b[Dd]ie herrschende [Mm]einung\b",
-        r"\b[Ii]m [Ss]chrifttum wird vertreten\b", r"\b[Nn]ach der [Gg]esetzesbegründung\b"
-    ]
-
     # Teile Text in Absätze auf - verbesserte Methode, die Absatztrennungen besser erkennt
-    paragraphs = [p.strip() for p in re.split(r'(\n\s*\n|\n\s{3,}\n)', text) if p.strip()]
+    paragraphs = [p.strip() for p in PARAGRAPH_SPLIT_PATTERN.split(text) if p.strip()]
     
     if not paragraphs:
         return [text] if text.strip() else []
@@ -388,26 +508,19 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     if len(text) < min_segment_length * 2:
         return [text]
     
-    # Berechne semantische Vektoren für jeden Absatz
-    paragraph_vectors = []
-    paragraph_text_lengths = []  # Speichere auch die Länge der Absätze für bessere Entscheidungen
-    
-    for p in paragraphs:
-        try:
-            # Versuche den semantischen Vektor zu berechnen, mit erweiterter Fehlerbehandlung
-            vector = get_semantic_embeddings(p)
-            if not isinstance(vector, dict):
-                vector = {}  # Fallback falls kein Dictionary zurückkommt
-                print(f"Warnung: get_semantic_embeddings gab keinen Dictionary für einen Absatz zurück")
-            
-            # Speichere Vektor und Textlänge
-            paragraph_vectors.append(vector)
-            paragraph_text_lengths.append(len(p))
-        except Exception as e:
-            # Bei Fehlern, leeres Dictionary als Fallback mit zusätzlicher Diagnose
-            print(f"Fehler bei Vektorgenerierung: {str(e)}")
-            paragraph_vectors.append({})
-            paragraph_text_lengths.append(len(p))
+    # Berechne semantische Vektoren für alle Absätze als Merkmalsmatrix (eine Zeile pro Absatz)
+    paragraph_vectors = get_semantic_feature_matrix(paragraphs)
+    paragraph_categories = calculate_category_sums(paragraph_vectors)
+    paragraph_text_lengths = [len(p) for p in paragraphs]  # Speichere auch die Länge der Absätze für bessere Entscheidungen
+    
+    # Ähnlichkeit jedes Absatzes zu seinem Vorgänger in einem einzigen Aufruf. Besteht das aktuelle
+    # Segment nur aus dem vorherigen Absatz, entspricht dies genau der benötigten Segmentähnlichkeit.
+    try:
+        adjacent_similarities = calculate_semantic_similarities(paragraph_vectors[:-1], paragraph_vectors[1:],
+                                                                paragraph_categories[:-1], paragraph_categories[1:])
+    except Exception as e:
+        print(f"Fehler bei Ähnlichkeitsberechnung: {str(e)}")
+        adjacent_similarities = None
             
     # Überprüfe jeden Absatz auf Übergangsmarker mit verbesserter Erkennung
     transition_markers = [False] * len(paragraphs)
@@ -415,12 +528,12 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     
     for i, paragraph in enumerate(paragraphs):
         # Überprüfe, ob der Absatz mit einem juristischen Übergangsmarker beginnt
-        if any(re.search(pattern, paragraph[:max(100, len(paragraph) // 3)]) for pattern in legal_section_markers):
+        if LEGAL_SECTION_MARKER_PATTERN.search(paragraph[:max(100, len(paragraph) // 3)]):
             transition_markers[i] = True
             context_importance[i] = 1.5  # Erhöhe die Wichtigkeit von Übergangsparagraphen
         
         # Erkenne Überschriften oder besonders hervorgehobenen Text (z.B. durch Großbuchstaben)
-        if i > 0 and len(paragraph) < 200 and (paragraph.isupper() or re.match(r'^[A-Z][a-z]*(\s+[A-Z][a-z]*)+$', paragraph)):
+        if i > 0 and len(paragraph) < 200 and (paragraph.isupper() or CAPITALIZED_HEADING_PATTERN.match(paragraph)):
             transition_markers[i] = True
             context_importance[i] = 2.0  # Noch höheres Gewicht für potenzielle Überschriften
         
@@ -432,14 +545,21 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     
     # Gruppiere Absätze in Segmente basierend auf semantischer Ähnlichkeit und Übergangsmarkern
     segments = []
+    segment_paragraph_ranges = []  # Absatzbereich [start, ende) jedes Segments für die spätere Wiederverwendung der Vektoren
+    current_segment_start = 0
     current_segment = [paragraphs[0]]
     current_vector = paragraph_vectors[0].copy()  # Wichtig: Kopiere den Vektor, um ihn zu isolieren
+    current_categories = paragraph_categories[0].copy()  # Kategoriesummen werden parallel mitgeführt
     current_segment_len = len(paragraphs[0])
     
     for i in range(1, len(paragraphs)):
         # Berechne die semantische Ähnlichkeit mit erhöhter Robustheit
         try:
-            similarity = calculate_semantic_similarity(current_vector, paragraph_vectors[i])
+            if len(current_segment) == 1 and adjacent_similarities is not None:
+                similarity = float(adjacent_similarities[i - 1])
+            else:
+                similarity = float(calculate_semantic_similarities(current_vector, paragraph_vectors[i],
+                                                                   current_categories, paragraph_categories[i])[0])
         except Exception as e:
             print(f"Fehler bei Ähnlichkeitsberechnung: {str(e)}")
             similarity = 0.0  # Fallback: Betrachte als unähnlich bei Fehlern
@@ -463,8 +583,11 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
            (similarity < dynamic_threshold and current_segment_len >= min_segment_length) or
            (new_segment_len > max_segment_length and current_segment_len >= min_segment_length)):
             segments.append('\n\n'.join(current_segment))
+            segment_paragraph_ranges.append((current_segment_start, i))
+            current_segment_start = i
             current_segment = [paragraphs[i]]
             current_vector = paragraph_vectors[i].copy()  # Isolierter Vektor für das neue Segment
+            current_categories = paragraph_categories[i].copy()
             current_segment_len = len(paragraphs[i])
         else:
             # Füge Absatz zum aktuellen Segment hinzu
@@ -473,19 +596,34 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
             # Neue Absätze erhalten mehr Gewicht, um thematische Übergänge besser zu erkennen
             weight = 1.2 * context_importance[i]  # Gewichtung basierend auf Kontextwichtigkeit
             
-            # Sichere Vektor-Kombination, die mit der neuen Sicherheitsebene robust ist
-            if isinstance(paragraph_vectors[i], dict):
-                for key, value in paragraph_vectors[i].items():
-                    if key in current_vector:
-                        current_vector[key] = current_vector[key] + (value * weight)
-                    else:
-                        current_vector[key] = value * weight
+            current_vector += paragraph_vectors[i] * weight
+            current_categories += paragraph_categories[i] * weight
             
             current_segment_len += len(paragraphs[i])
     
     # Füge das letzte Segment hinzu
     if current_segment:
         segments.append('\n\n'.join(current_segment))
+        segment_paragraph_ranges.append((current_segment_start, len(paragraphs)))
+    
+    prefix_features_cache = {}
+    
+    def segment_prefix_features(segment_index, prefix_length=1000):
+        """
+        Liefert Merkmalsvektor und Kategoriesummen für die ersten prefix_length Zeichen eines Segments
+        (entspricht get_semantic_embeddings(segments[segment_index][:prefix_length])). Besteht der Anfang
+        aus genau einem vollständigen Absatz, wird dessen bereits berechneter Vektor wiederverwendet;
+        sonst wird nur der abgeschnittene Anfang vektorisiert, da Positionsgewichtung und Gutachtenstil
+        nicht über Absätze hinweg addiert werden können.
+        """
+        if segment_index not in prefix_features_cache:
+            start, end = segment_paragraph_ranges[segment_index]
+            if end - start == 1 and paragraph_text_lengths[start] <= prefix_length:
+                prefix_features_cache[segment_index] = (paragraph_vectors[start], paragraph_categories[start])
+            else:
+                vector = get_semantic_feature_matrix([segments[segment_index][:prefix_length]])[0]
+                prefix_features_cache[segment_index] = (vector, calculate_category_sums(vector))
+        return prefix_features_cache[segment_index]
     
     # Verbesserte Strategie für das Zusammenführen kurzer Segmente
     final_segments = []
@@ -496,19 +634,15 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
         if len(segments[i]) < min_segment_length and i + 1 < len(segments):
             # Prüfe thematische Ähnlichkeit für intelligentere Zusammenführung
             if i > 0:
-                # Versuche die Ähnlichkeit mit dem vorherigen und dem nächsten Segment zu vergleichen
-                prev_segment_vector = get_semantic_embeddings(segments[i-1][:1000])
-                current_segment_vector = get_semantic_embeddings(segments[i][:1000])
-                next_segment_vector = get_semantic_embeddings(segments[i+1][:1000])
-                
-                # Stelle sicher, dass alle Vektoren Dictionaries sind
-                if not isinstance(prev_segment_vector, dict): prev_segment_vector = {}
-                if not isinstance(current_segment_vector, dict): current_segment_vector = {}
-                if not isinstance(next_segment_vector, dict): next_segment_vector = {}
-                
                 try:
-                    similarity_with_prev = calculate_semantic_similarity(current_segment_vector, prev_segment_vector)
-                    similarity_with_next = calculate_semantic_similarity(current_segment_vector, next_segment_vector)
+                    # Vergleiche den Anfang des Segments mit dem Anfang des vorherigen und des nächsten Segments
+                    prev_vector, prev_categories = segment_prefix_features(i - 1)
+                    segment_vector, segment_categories = segment_prefix_features(i)
+                    next_vector, next_categories = segment_prefix_features(i + 1)
+                    
+                    similarity_with_prev, similarity_with_next = calculate_semantic_similarities(
+                        np.stack([segment_vector, segment_vector]), np.stack([prev_vector, next_vector]),
+                        np.stack([segment_categories, segment_categories]), np.stack([prev_categories, next_categories]))
                     
                     # Füge das Segment zum ähnlicheren Nachbarn hinzu
                     if similarity_with_prev > similarity_with_next:
@@ -545,13 +679,24 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
         if i + 1 < len(final_segments):
             next_segment = final_segments[i+1]
             
-            # Prüfe auf signifikante gemeinsame Phrasen (3-5 Wörter), die auf überlappende Inhalte hindeuten
-            current_phrases = set([' '.join(current_segment.split()[j:j+4]) 
-                                  for j in range(len(current_segment.split()) - 4)])
-            next_phrases = set([' '.join(next_segment.split()[j:j+4]) 
-                               for j in range(min(20, len(next_segment.split()) - 4))])  # Prüfe nur Anfang des nächsten Segments
+            # Prüfe auf signifikante gemeinsame Phrasen (4 Wörter), die auf überlappende Inhalte hindeuten.
+            # Jedes Segment wird nur einmal tokenisiert; die 4-Gramme werden als Tupel gehasht und nur gegen
+            # die (höchstens 20) Phrasen am Anfang des nächsten Segments geprüft, das ist linear in der Segmentlänge.
+            current_words = current_segment.split()
+            next_words = next_segment.split()
+            next_phrases = {}  # Tupel -> Phrase, in Reihenfolge des Auftretens im nächsten Segment
+            for j in range(min(20, len(next_words) - 4)):  # Prüfe nur Anfang des nächsten Segments
+                next_phrases.setdefault(tuple(next_words[j:j+4]), None)
             
-            common_phrases = current_phrases.intersection(next_phrases)
+            found_phrases = set()
+            if next_phrases:
+                for j in range(len(current_words) - 4):
+                    gram = tuple(current_words[j:j+4])
+                    if gram in next_phrases:
+                        found_phrases.add(gram)
+                        if len(found_phrases) == len(next_phrases):
+                            break
+            common_phrases = [' '.join(gram) for gram in next_phrases if gram in found_phrases]
             
             # Wenn signifikante Überlappungen gefunden werden und die Segmente nicht zu lang werden
             if len(common_phrases) > 2 and len(current_segment) + len(next_segment) < max_segment_length * 1.2:
@@ -582,7 +727,7 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     for segment in optimized_segments:
         if len(segment) > max_segment_length * 1.5:  # Besonders lange Segmente
             # Teile das Segment an Satzgrenzen
-            sentences = re.split(r'(?<=[.!?])\s+', segment)
+            sentences = SENTENCE_SPLIT_PATTERN.split(segment)
             current_chunk = ""
             for sentence in sentences:
                 if len(current_chunk) + len(sentence) <= max_segment_length:
@@ -598,107 +743,145 @@ def detect_logical_segments(text, min_segment_length=400, similarity_threshold=0
     
     return extra_long_segments
 
+# Standard-Signalphrasen für thematische Übergänge (siehe detect_topic_transitions)
+TOPIC_TRANSITION_PATTERNS = (
+    # Allgemeine Übergangssignale
+    r'Im Folgenden',
+    r'Zunächst',
+    r'Anschließend',
+    r'Abschließend',
+    r'Zusammenfassend',
+    r'Es ist festzuhalten',
+    r'Im Ergebnis',
+    r'Daraus folgt',
+    r'Anders als',
+    r'Im Gegensatz dazu',
+    r'Davon ausgehend',
+    r'Hiervon ausgehend',
+    r'Weiterhin ist zu beachten',
+    r'Deshalb',
+    r'Dennoch',
+    r'Darüber hinaus',
+    r'Was .* betrifft',
+    r'In Bezug auf',
+    
+    # Juristische Fachsprache und Gliederungssignale
+    r'Im Rahmen der Prüfung',
+    r'Fraglich ist',
+    r'Zu prüfen ist',
+    r'Bei der Auslegung',
+    r'Nach der Rechtsprechung',
+    r'Nach h\.M\.',
+    r'Nach herrschender Meinung',
+    r'Umstritten ist',
+    r'Die Subsumtion ergibt',
+    r'Im vorliegenden Fall',
+    r'Streitig ist',
+    r'Aus rechtlicher Sicht',
+    r'Materiell-rechtlich',
+    r'Formell-rechtlich',
+    r'Prozessual betrachtet',
+    
+    # Einleitung neuer Argumentationsketten
+    r'Als Erstes',
+    r'Als Zweites',
+    r'Als Nächstes',
+    r'Zum einen',
+    r'Zum anderen',
+    r'Einerseits',
+    r'Andererseits',
+    r'Vielmehr',
+    r'Insbesondere',
+    r'Problematisch ist',
+    r'Demgegenüber',
+    r'Somit gilt',
+    r'Letztendlich',
+    r'Schließlich',
+    
+    # Normspezifische Überleitungen
+    r'Die Voraussetzungen des § \d+',
+    r'Nach § \d+ (?:[A-Za-z]+)',
+    r'Gemäß § \d+ (?:[A-Za-z]+)',
+    r'Laut § \d+ (?:[A-Za-z]+)',
+    r'Die Tatbestandsvoraussetzungen',
+    r'Als Rechtsfolge ergibt sich',
+    r'Die Anspruchsgrundlage',
+    r'Die gesetzliche Grundlage',
+)
+
+# Marker, bei denen auch dicht aufeinanderfolgende Übergänge erhalten bleiben sollen
+_IMPORTANT_TRANSITION_MARKERS = ('§', 'prüfung', 'fraglich', 'tatbestand', 'rechtsprechung')
+
+@lru_cache(maxsize=32)
+def _compile_transition_patterns(transition_patterns):
+    """
+    Kompiliert die Übergangsmuster einmalig und bestimmt den Mindestabstand je Muster.
+    
+    Args:
+        transition_patterns: Tupel von Regex-Mustern für Übergangssignale
+        
+    Returns:
+        Ein Tupel (kompilierte Muster, Mindestabstände je Muster)
+    """
+    compiled = tuple(re.compile(pattern, re.IGNORECASE) for pattern in transition_patterns)
+    min_distances = tuple(
+        30 if any(imp in pattern.lower() for imp in _IMPORTANT_TRANSITION_MARKERS) else 100
+        for pattern in transition_patterns)
+    return compiled, min_distances
+
+def _has_transition_within(transitions, position, min_distance):
+    """Prüft in der sortierten Liste transitions, ob ein Eintrag näher als min_distance an position liegt."""
+    index = bisect_left(transitions, position)
+    if index < len(transitions) and transitions[index] - position < min_distance:
+        return True
+    return index > 0 and position - transitions[index - 1] < min_distance
+
 def detect_topic_transitions(text, transition_patterns=None):
     """
     Erkennt thematische Übergänge im Text basierend auf bestimmten Signalphrasen.
     
+    Satzgrenzen werden einmal pro Dokument bestimmt und die bereits gefundenen Übergänge
+    sortiert gehalten, sodass Satzanfang, Satzende und Abstandsprüfung per Binärsuche erfolgen.
+    
     Args:
         text: Der zu analysierende Text
-        transition_patterns: Regex-Muster für Übergangssignale
+        transition_patterns: Regex-Muster für Übergangssignale (Standard: TOPIC_TRANSITION_PATTERNS)
         
     Returns:
         Eine Liste von Indizes, an denen Themenübergänge identifiziert wurden
     """
     if transition_patterns is None:
-        transition_patterns = [
-            # Allgemeine Übergangssignale
-            r'Im Folgenden',
-            r'Zunächst',
-            r'Anschließend',
-            r'Abschließend',
-            r'Zusammenfassend',
-            r'Es ist festzuhalten',
-            r'Im Ergebnis',
-            r'Daraus folgt',
-            r'Anders als',
-            r'Im Gegensatz dazu',
-            r'Davon ausgehend',
-            r'Hiervon ausgehend',
-            r'Weiterhin ist zu beachten',
-            r'Deshalb',
-            r'Dennoch',
-            r'Darüber hinaus',
-            r'Was .* betrifft',
-            r'In Bezug auf',
-            
-            # Juristische Fachsprache und Gliederungssignale
-            r'Im Rahmen der Prüfung',
-            r'Fraglich ist',
-            r'Zu prüfen ist',
-            r'Bei der Auslegung',
-            r'Nach der Rechtsprechung',
-            r'Nach h\.M\.',
-            r'Nach herrschender Meinung',
-            r'Umstritten ist',
-            r'Die Subsumtion ergibt',
-            r'Im vorliegenden Fall',
-            r'Streitig ist',
-            r'Aus rechtlicher Sicht',
-            r'Materiell-rechtlich',
-            r'Formell-rechtlich',
-            r'Prozessual betrachtet',
-            
-            # Einleitung neuer Argumentationsketten
-            r'Als Erstes',
-            r'Als Zweites',
-            r'Als Nächstes',
-            r'Zum einen',
-            r'Zum anderen',
-            r'Einerseits',
-            r'Andererseits',
-            r'Vielmehr',
-            r'Insbesondere',
-            r'Problematisch ist',
-            r'Demgegenüber',
-            r'Somit gilt',
-            r'Letztendlich',
-            r'Schließlich',
-            
-            # Normspezifische Überleitungen
-            r'Die Voraussetzungen des § \d+',
-            r'Nach § \d+ (?:[A-Za-z]+)',
-            r'Gemäß § \d+ (?:[A-Za-z]+)',
-            r'Laut § \d+ (?:[A-Za-z]+)',
-            r'Die Tatbestandsvoraussetzungen',
-            r'Als Rechtsfolge ergibt sich',
-            r'Die Anspruchsgrundlage',
-            r'Die gesetzliche Grundlage',
-        ]
-    
-    transitions = []
-    for pattern in transition_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
+        transition_patterns = TOPIC_TRANSITION_PATTERNS
+    transition_patterns = tuple(transition_patterns)
+    if not transition_patterns:
+        return []
+    compiled, min_distances = _compile_transition_patterns(transition_patterns)
+    
+    # Satzgrenzen werden einmal pro Dokument bestimmt
+    sentence_ends = [match.start() for match in re.finditer(r'\.', text)]
+    
+    transitions = []  # stets sortiert, damit die Abstandsprüfung per Binärsuche erfolgen kann
+    for index, pattern in enumerate(compiled):
+        for match in pattern.finditer(text):
+            match_start, match_end = match.span()
             # Finde den Satzanfang für bessere Segmentierung
-            sentence_start = text.rfind('.', 0, match.start())
-            if sentence_start == -1:
-                sentence_start = 0
-            else:
-                sentence_start += 1  # Überspringe den Punkt
+            dot_index = bisect_left(sentence_ends, match_start)
+            sentence_start = sentence_ends[dot_index - 1] + 1 if dot_index > 0 else 0  # Überspringe den Punkt
             
             # Vermeide zu nah beieinander liegende Übergänge, aber berücksichtige wichtige juristische Marker
-            is_important_marker = any(imp in pattern.lower() for imp in ['§', 'prüfung', 'fraglich', 'tatbestand', 'rechtsprechung'])
-            min_distance = 30 if is_important_marker else 100
+            min_distance = min_distances[index]
+            
+            if not _has_transition_within(transitions, sentence_start, min_distance):
+                insort(transitions, sentence_start)
             
-            if not any(abs(t - sentence_start) < min_distance for t in transitions):
-                transitions.append(sentence_start)
-                
                 # Suche auch nach dem Ende des kompletten Satzes, um den Kontext besser zu erhalten
-                sentence_end = text.find('.', match.end())
-                if sentence_end != -1 and not any(abs(t - sentence_end) < min_distance for t in transitions):
-                    transitions.append(sentence_end + 1)
+                dot_index = bisect_left(sentence_ends, match_end)
+                if dot_index < len(sentence_ends):
+                    sentence_end = sentence_ends[dot_index]
+                    if not _has_transition_within(transitions, sentence_end, min_distance):
+                        insort(transitions, sentence_end + 1)
     
-    # Sortiere die Übergänge nach Position
-    return sorted(transitions)
+    return transitions
 
 def enhanced_segment_text(text_content):
     """
@@ -816,17 +999,17 @@ def enhanced_segment_text(text_content):
                     
                     # Verfeinerte Erkennung durch kontextuelle Muster im ersten Absatz
                     if segment_type == "Allgemein":
-                        if re.search(r'(?:im folgenden|zunächst|dabei) (?:ist|wird|soll|möchte ich) (?:zu )?(?:prüfen|untersuchen|klären|erörtern)', first_paragraph_lower):
+                        if SUBSEGMENT_EXAMINATION_START_PATTERN.search(first_paragraph_lower):
                             segment_type = "Prüfungsbeginn"
-                        elif re.search(r'(?:im ergebnis|zusammenfassend|abschließend|daher|somit|demnach) (?:ist|lässt sich|kann) (?:fest(?:zu)?halten|festzustellen|feststellen|sagen|konstatieren)', first_paragraph_lower):
+                        elif SUBSEGMENT_RESULT_PATTERN.search(first_paragraph_lower):
                             segment_type = "Ergebnis"
-                        elif re.search(r'(?:fraglich|problematisch|umstritten|zu klären) ist(?: (?:dabei|hier|nunmehr|also|jedoch|demnach))?, ob', first_paragraph_lower):
+                        elif SUBSEGMENT_LEGAL_QUESTION_PATTERN.search(first_paragraph_lower):
                             segment_type = "Rechtsfrage"
-                        elif re.search(r'(?:es gilt|zu prüfen ist|zu untersuchen ist|geprüft werden muss|geklärt werden muss)', first_paragraph_lower):
+                        elif SUBSEGMENT_EXAMINATION_STEP_PATTERN.search(first_paragraph_lower):
                             segment_type = "Prüfungsschritt"
                     
                     # Füge einen Gesetzeskontext hinzu, wenn erkennbar
-                    law_references = re.findall(r'§\s*\d+[a-z]?\s*(?:[A-Za-zäöüÄÖÜß]+)', subsegment[:500])
+                    law_references = LAW_REFERENCE_PATTERN.findall(subsegment[:500])
                     law_context = ""
                     if law_references:
                         unique_laws = set()
@@ -1019,17 +1202,17 @@ def enhanced_segment_text(text_content):
             
             # Verfeinerte Erkennung spezifischer Abschnittstypen durch Textmuster
             if segment_type == "Allgemein" or segment_score < 4.0:  # Schwacher Score oder Allgemeine Klassifikation
-                if re.search(r'(?:zu\s+)?(?:prüfen|untersuchen|beantworten)\s+(?:ist|sei|wäre)', first_paragraph_lower[:100]):
+                if SEGMENT_QUESTION_PATTERN.search(first_paragraph_lower[:100]):
                     segment_type = "Prüfungsfragestellung"
-                elif re.search(r'(?:im\s+ergebnis|zusammenfassend|abschließend|somit)(?:\s+ist|\s+lässt\s+sich|\s+kann\s+festgehalten\s+werden)', first_paragraph_lower[:100]):
+                elif SEGMENT_RESULT_PATTERN.search(first_paragraph_lower[:100]):
                     segment_type = "Ergebnis"
-                elif re.search(r'(?:nach|gemäß|laut|entsprechend)\s+§\s*\d+', first_paragraph_lower[:100]):
+                elif SEGMENT_NORM_PATTERN.search(first_paragraph_lower[:100]):
                     segment_type = "Normprüfung"
-                elif re.search(r'(?:es\s+handelt\s+sich|vorliegend\s+geht\s+es|der\s+fall|im\s+vorliegenden\s+fall)', first_paragraph_lower[:100]):
+                elif SEGMENT_FACTS_PATTERN.search(first_paragraph_lower[:100]):
                     segment_type = "Sachverhalt"
             
             # Überprüfe, ob das Segment Gesetzesreferenzen enthält
-            law_references = re.findall(r'§\s*\d+[a-z]?\s*(?:[A-Za-zäöüÄÖÜß]+)', segment_start)
+            law_references = LAW_REFERENCE_PATTERN.findall(segment_start)
             law_context = ""
             
             if law_references:
@@ -1058,7 +1241,7 @@ def enhanced_segment_text(text_content):
             else:
                 # Versuche einen beschreibenden Titel zu finden
                 # Erkenne potenzielle Überschriften im Text
-                potential_heading = re.search(r'^([A-Z][a-zäöüß]+(?: [A-Za-zÄÖÜäöüß]+){1,5})[\.\n]', segment[:200])
+                potential_heading = POTENTIAL_HEADING_PATTERN.search(segment[:200])
                 if potential_heading:
                     custom_heading = potential_heading.group(1).strip()
                     heading = f"{custom_heading} [{i}/{len(logical_segments)}]{law_context}"
@@ -0,0 +1,72 @@
+"""
+Tests für JsonArrayReader (jsonl_io.py).
+
+Der Leser decodiert Listenelemente blockweise. Ein an der Blockgrenze abgeschnittenes Element muss
+nachgelesen werden, ein fehlerhaftes Element dagegen sofort gemeldet werden, ohne den Rest der
+Datei in den Speicher zu laden.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jsonl_io import JsonArrayReader
+
+# Elemente mit Token, die an jeder Stelle abgeschnitten werden können
+ELEMENTS = [
+    {"text": "Erbschein gemäß § 352 FamFG über den Nachlass", "nummer": 12345},
+    {"escape": "Zeile 1\nZeile 2 \"zitiert\" \\ € 😀", "liste": [1, -2.5e-10, 3.25E+2, 0]},
+    {"werte": [True, False, None, float("inf"), float("-inf")], "leer": {}, "leere_liste": []},
+    "nur eine Zeichenkette",
+    -1234567890.125,
+    [[], [[]], {"a": {"b": [1, {"c": "d"}]}}],
+]
+
+class JsonArrayReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, content):
+        path = os.path.join(self.directory.name, 'daten.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def read_all(self, path, chunk_size):
+        return list(JsonArrayReader(path, chunk_size=chunk_size))
+
+    def test_values_across_block_boundaries(self):
+        # Jede Blockgröße schneidet die Elemente an anderen Stellen ab
+        content = json.dumps(ELEMENTS, ensure_ascii=False, indent=1)
+        path = self.write_file(content)
+        expected = json.loads(content)
+        for chunk_size in range(1, 48):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.read_all(path, chunk_size), expected)
+
+    def test_malformed_element_fails_without_reading_tail(self):
+        tail = ', '.join(json.dumps({"text": "x" * 1000, "nummer": index}) for index in range(5000))
+        path = self.write_file('[{"a": 1}, {bad}, ' + tail + ']')
+        reader = JsonArrayReader(path, chunk_size=4096)
+        items = []
+        with self.assertRaises(json.JSONDecodeError):
+            for item in reader:
+                items.append(item)
+        self.assertEqual(items, [{"a": 1}])
+        # Gelesen wurde höchstens ein Bruchteil der etwa 5 MB großen Datei
+        self.assertLess(reader.bytes_read, reader.total_bytes // 100)
+
+    def test_truncated_file_fails(self):
+        path = self.write_file('[{"a": 1}, {"text": "abgeschnitten')
+        with self.assertRaises(json.JSONDecodeError):
+            self.read_all(path, 8)
+
+if __name__ == '__main__':
+    unittest.main()
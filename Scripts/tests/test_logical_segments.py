@@ -0,0 +1,41 @@
+"""
+Laufzeit-Regressionstest für detect_logical_segments (semantic_segmentation.py).
+
+Die Überlappungsprüfung der zweiten Phase war früher quadratisch in der Segmentlänge, weil der
+Text für jede 4-Wort-Position neu zerlegt wurde. Ein Segment mit 50.000 Wörtern muss deutlich
+unter einer Sekunde verarbeitet werden.
+"""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from semantic_segmentation import detect_logical_segments
+
+# Obergrenze in Sekunden; die lineare Prüfung benötigt einen Bruchteil davon,
+# die frühere quadratische mehrere Minuten
+TIME_LIMIT = 1.0
+
+class OverlapStageTimingTest(unittest.TestCase):
+
+    def test_long_segment_is_linear(self):
+        # Ein Absatz mit 50.000 Wörtern ohne die Anfangsphrasen des nächsten Segments, sodass die
+        # Überlappungsprüfung das ganze Segment durchsuchen muss
+        long_segment = ' '.join(f'wort{i % 997}' for i in range(50000))
+        next_segment = 'II. Weitere Prüfung\n\n' + ' '.join(f'folge{i}' for i in range(300))
+        text = long_segment + '\n\n' + next_segment
+        
+        start = time.perf_counter()
+        segments = detect_logical_segments(text)
+        elapsed = time.perf_counter() - start
+        
+        # Beide Segmente müssen die Überlappungsprüfung erreichen
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(len(segments[0].split()), 50000)
+        self.assertLess(elapsed, TIME_LIMIT)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,258 @@
+"""
+Äquivalenztests für get_semantic_embeddings (semantic_segmentation.py).
+
+reference_get_semantic_embeddings ist eine unveränderte Kopie der ursprünglichen, regex-basierten
+Implementierung (je Schlüsselwort zwei Regex-Suchen). Die Tests prüfen, dass der Keyword-Automat
+für feste Absätze exakt dieselben Vektoren liefert.
+"""
+
+import re
+import sys
+import unittest
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from semantic_segmentation import get_semantic_embeddings
+
+def reference_get_semantic_embeddings(text_segment):
+    """
+    Erstellt eine verbesserte semantische Repräsentation eines juristischen Textsegments
+    basierend auf Fachterminologie, Gesetzen und strukturellen Elementen.
+    
+    In einer produktiven Umgebung könnte hier ein fortschrittliches Embedding-Modell verwendet werden.
+    
+    Args:
+        text_segment: Der Textabschnitt, für den eine semantische Repräsentation erstellt werden soll.
+        
+    Returns:
+        Ein Dictionary mit Schlüsselwörtern und deren Gewichtung
+    """
+    # Stelle sicher, dass ein Textstring übergeben wurde
+    if not isinstance(text_segment, str) or not text_segment.strip():
+        return {}
+        
+    # Verbesserte Keyword-basierte Analyse
+    semantic_vector = defaultdict(float)
+    
+    # Juristische Terminologie und deren Gewichtung - erweitert und kategorisiert
+    keywords = {
+        # Sachverhalt-Terminologie
+        'sachverhalt': 6.0, 'tatbestand': 6.0, 'lebenssachverhalt': 6.0, 'fall': 3.0,
+        'geschehen': 2.0, 'vorgang': 2.0, 'situation': 2.0, 'ausgangslage': 2.5,
+        'umstände': 2.0, 'tatsachen': 2.5, 'ereignis': 2.0, 
+        
+        # Hauptkategorien juristischer Gutachten
+        'frage': 5.0, 'rechtsfrage': 5.5, 'fragestellung': 5.0, 'problematik': 4.5,
+        'lösung': 4.5, 'ergebnis': 5.0, 'bewertung': 4.0, 'beurteilung': 4.0,
+        'lösungsansatz': 4.0, 'fazit': 5.0, 'schlussfolgerung': 5.0, 'zusammenfassung': 4.5,
+        
+        # Prozessuale Begriffe
+        'klage': 4.5, 'antrag': 4.5, 'verfahren': 4.5, 'instanz': 3.5, 'revision': 4.5,
+        'berufung': 4.5, 'beschwerde': 4.5, 'einspruch': 4.5, 'widerspruch': 4.5,
+        'kläger': 3.5, 'beklagte': 3.5, 'gericht': 3.5, 'entscheidung': 4.0,
+        'zuständigkeit': 4.0, 'frist': 3.5, 'zulässigkeit': 4.5, 'begründetheit': 4.5,
+        
+        # Normen-Terminologie
+        'gesetz': 3.5, 'paragraph': 4.0, 'artikel': 3.5, 'vorschrift': 3.5, 'bestimmung': 3.5,
+        'regelung': 3.0, 'norm': 4.0, 'richtlinie': 3.5, 'verordnung': 3.5, 'kodifikation': 3.0,
+        'gesetzbuch': 3.5, 'bgb': 4.5, 'stgb': 4.5, 'hgb': 4.5, 'zpo': 4.5, 'stvo': 4.5,
+        'erbrecht': 4.0, 'familienrecht': 4.0, 'schuldrecht': 4.0, 'sachenrecht': 4.0,
+        
+        # Auslegungsmethoden
+        'auslegung': 5.0, 'wortlaut': 4.5, 'systematik': 4.5, 'teleologie': 4.5, 'telos': 4.0,
+        'historisch': 4.0, 'genese': 4.0, 'zweck': 4.0, 'sinn': 3.5, 'gesetzgebung': 3.5,
+        'materialien': 3.5, 'gesetzgeber': 4.0, 'interpretation': 4.0, 'wörtlich': 4.0,
+        'grammatikalisch': 4.0, 'systematische': 4.0, 'teleologische': 4.0, 'historische': 4.0,
+        
+        # Subsumtion
+        'subsumtion': 6.0, 'erfüllt': 4.0, 'tatbestandsmerkmal': 5.0, 'voraussetzung': 4.5,
+        'merkmal': 3.5, 'prüfung': 4.5, 'anwendung': 4.0, 'tatbestand': 5.0, 'rechtsfolge': 5.0,
+        'gegeben': 3.5, 'vorliegend': 4.0, 'einschlägig': 4.0, 'passend': 3.0, 
+        'tatbestandlich': 4.5, 'erforderlich': 3.5, 'hinreichend': 3.5,
+        
+        # Argumentationstechnik und Dogmatik
+        'argument': 3.0, 'begründung': 4.0, 'wertung': 3.5, 'abwägung': 4.0, 'dogmatik': 4.5,
+        'ansicht': 3.0, 'meinung': 3.0, 'auffassung': 3.0, 'vertretbar': 3.0, 'herrschend': 3.5,
+        'minderheit': 3.0, 'streit': 3.5, 'umstritten': 4.0, 'streitig': 4.0, 'eindeutig': 3.5,
+        'unstreitig': 3.5, 'unklar': 3.0, 'fraglich': 4.0, 'problematisch': 4.0,
+        
+        # Rechtsprechung und Literatur
+        'rechtsprechung': 4.5, 'bgh': 4.5, 'bundesgerichtshof': 4.5, 'olg': 4.0, 
+        'oberlandesgericht': 4.0, 'lg': 3.5, 'ag': 3.5, 'bverfg': 4.5, 'bundesverfassungsgericht': 4.5,
+        'literatur': 3.5, 'lehre': 3.5, 'kommentar': 3.5, 'monographie': 3.0, 'aufsatz': 3.0,
+        'palandt': 4.0, 'münchener': 4.0, 'staudinger': 4.0, 'larenz': 3.5, 'canaris': 3.5,
+        
+        # Rechtsfolgen und Rechtsinstitute
+        'rechtsfolge': 5.0, 'folge': 3.0, 'konsequenz': 3.5, 'rechtsverhältnis': 4.0,
+        'wirkung': 3.0, 'geltung': 3.0, 'rechtswirkung': 4.0, 'rechtsnatur': 4.0,
+        'anspruch': 4.5, 'einrede': 4.0, 'einwendung': 4.0, 'schuldverhältnis': 4.0,
+        'vertrag': 3.5, 'eigentum': 3.5, 'besitz': 3.5, 'haftung': 4.0, 'schadenersatz': 4.0,
+        
+        # Gutachtenstruktur
+        'gutachten': 5.0, 'stellungnahme': 4.0, 'zwischenergebnis': 4.0, 'gesamtergebnis': 4.5,
+        'definitionen': 3.5, 'obersatz': 4.0, 'voraussetzungen': 4.0, 'aufbau': 3.0,
+        'gliederung': 3.0, 'struktur': 3.0, 'darstellung': 3.0, 'rechtsschema': 4.0,
+        
+        # Erweiterte juristische Termini für Gutachten
+        'gutachtenstil': 5.0, 'aufbauschema': 4.5, 'syllogismus': 4.0, 'obersatz': 4.5, 
+        'untersatz': 4.5, 'schlusssatz': 4.5, 'hauptteil': 4.0, 'hilfsgutachten': 5.0,
+        'nebenprüfung': 4.0, 'inzidentprüfung': 4.5, 'exkurs': 3.5, 'prüfungsschema': 4.5,
+        'prüfungsreihenfolge': 4.0, 'anspruchsgrundlage': 5.0, 'anspruchsaufbau': 4.5,
+        'fallbearbeitung': 4.0, 'fallanalyse': 4.0, 'fallgestaltung': 4.0,
+        
+        # Abstrakte juristische Bewertungsbegriffe
+        'verhältnismäßigkeit': 4.5, 'zumutbar': 4.0, 'angemessen': 4.0, 'erforderlich': 4.0,
+        'geeignet': 3.5, 'abwehrrecht': 4.0, 'leistungsrecht': 4.0, 'schutzpflicht': 4.0, 
+        'schutzbereich': 4.0, 'kernbereich': 4.0, 'einzelfall': 3.5, 'rechtsgut': 4.0,
+        
+        # Methodenlehre und juristische Argumentation
+        'methodenlehre': 4.5, 'auslegungsmethode': 4.5, 'normenhierarchie': 4.5, 
+        'verfassungskonforme': 4.5, 'analogie': 4.5, 'rechtsfortbildung': 4.5, 'lückenfüllung': 4.0,
+        'teleologische': 4.0, 'reduktion': 3.5, 'größenschluss': 4.0, 'erst-recht-schluss': 4.0,
+        'umkehrschluss': 4.0, 'derogation': 4.0, 'generalklausel': 4.0
+    }
+    
+    # Zähle Vorkommen der Keywords mit Kontextgewichtung
+    text_lower = text_segment.lower()
+    
+    # Normalisiere Leerzeichen und entferne Sonderzeichen für bessere Erkennung
+    normalized_text = re.sub(r'\s+', ' ', text_lower)
+    
+    for keyword, weight in keywords.items():
+        # Zähle exakte Wortvorkommnisse (mit Wortgrenzenerkennung)
+        exact_matches = len(re.findall(r'\b' + re.escape(keyword) + r'\b', normalized_text))
+        
+        # Betrachte Komposita zusätzlich mit geringerem Gewicht
+        partial_matches = len(re.findall(r'\b\w*' + re.escape(keyword) + r'\w*\b', normalized_text)) - exact_matches
+        
+        # Gewichte exakte Übereinstimmungen stärker
+        if exact_matches > 0:
+            semantic_vector[keyword] = exact_matches * weight
+        if partial_matches > 0:
+            semantic_vector[keyword] += partial_matches * (weight * 0.4)  # Reduktion für Teilübereinstimmungen
+    
+    # Berücksichtige Positionsgewichtung (Begriffe am Anfang sind oft wichtiger)
+    first_paragraph = text_segment.split('\n\n', 1)[0] if '\n\n' in text_segment else text_segment[:500]
+    first_paragraph_lower = first_paragraph.lower()
+    
+    for keyword, weight in keywords.items():
+        if keyword in first_paragraph_lower:
+            # Verstärke Gewichtung für Schlüsselwörter im ersten Absatz
+            semantic_vector[keyword] *= 1.5
+    
+    # Spezifischere Erkennung von Gesetzesverweisen
+    # Reguläre §-Verweise
+    bgb_references = len(re.findall(r'§\s*\d+\s*(?:bgb|bürgerliches\s+gesetzbuch)', text_lower))
+    if bgb_references > 0:
+        semantic_vector['bgb'] = bgb_references * 5.0
+    
+    stgb_references = len(re.findall(r'§\s*\d+\s*(?:stgb|strafgesetzbuch)', text_lower))
+    if stgb_references > 0:
+        semantic_vector['stgb'] = stgb_references * 5.0
+    
+    hgb_references = len(re.findall(r'§\s*\d+\s*(?:hgb|handelsgesetzbuch)', text_lower))
+    if hgb_references > 0:
+        semantic_vector['hgb'] = hgb_references * 5.0
+    
+    zpo_references = len(re.findall(r'§\s*\d+\s*(?:zpo|zivilprozessordnung)', text_lower))
+    if zpo_references > 0:
+        semantic_vector['zpo'] = zpo_references * 5.0
+    
+    # Allgemeine §-Verweise
+    general_norm_references = len(re.findall(r'§\s*\d+', text_segment))
+    semantic_vector['gesetzesreferenz'] = general_norm_references * 4.5
+    
+    # Artikelverweise
+    artikel_references = len(re.findall(r'Art(?:ikel)?\.\s*\d+', text_segment))
+    semantic_vector['artikelreferenz'] = artikel_references * 4.5
+    
+    # Erkennung von Strukturelementen
+    # Zwischenüberschriften - verschiedene Formate
+    roman_numerals = len(re.findall(r'^[IVX]+\.\s+', text_segment, re.MULTILINE))
+    semantic_vector['gliederung_römisch'] = roman_numerals * 4.0
+    
+    numeric_headings = len(re.findall(r'^\d+\.\s+', text_segment, re.MULTILINE))
+    semantic_vector['gliederung_numerisch'] = numeric_headings * 3.5
+    
+    alphabetic_headings = len(re.findall(r'^[A-Z]\.\s+', text_segment, re.MULTILINE))
+    semantic_vector['gliederung_alphabetisch'] = alphabetic_headings * 3.5
+    
+    # Wichtige Wörter in Großbuchstaben (oft Überschriften oder Betonungen)
+    capitalized_words = len(re.findall(r'\b[A-Z]{3,}\b', text_segment))
+    semantic_vector['betonung'] = capitalized_words * 2.5
+    
+    # Gutachtenspezifische Erkennungsmerkmale
+    legal_opinion_markers = [
+        r'(?:im folgenden|im weiteren) ist zu prüfen', 
+        r'(?:im ergebnis|zusammenfassend) (?:ist|lässt sich) festzuhalten',
+        r'dem ist zu entgegnen', 
+        r'fraglich ist, ob', 
+        r'zu prüfen ist',
+        r'folgende rechtsfragen'
+    ]
+    
+    for marker in legal_opinion_markers:
+        if re.search(marker, text_lower):
+            semantic_vector['gutachtenstil'] = semantic_vector.get('gutachtenstil', 0) + 4.0
+    
+    return semantic_vector
+
+
+PARAGRAPHS = (
+    # Einfache Treffer und Komposita ('frage' in 'rechtsfrage', 'vertrag' in 'erbvertrag')
+    "Die Rechtsfrage ist, ob der Erbvertrag wirksam ist. Die Frage der Auslegung stellt sich erneut.",
+    # Schlüsselwort mit Nicht-Wortzeichen, exakt und als Teil eines Kompositums
+    "Ein Erst-Recht-Schluss liegt nahe; der erst-recht-schlussartige Gedanke trägt ebenfalls.",
+    # Positionsgewichtung: Schlüsselwörter im ersten Absatz werden verstärkt
+    "Sachverhalt und Tatbestand\n\nIm Ergebnis ist festzuhalten, dass der Anspruch aus § 433 BGB besteht.",
+    # Ohne Absatzgrenze zählen die ersten 500 Zeichen als erster Absatz
+    "Fazit: " + "Die Voraussetzungen sind erfüllt. " * 20 + "Die Subsumtion am Ende ergibt eine Rechtsfolge.",
+    # Gesetzes- und Artikelverweise, Gliederung, Betonung und Gutachtenstil
+    "I. Sachverhalt\nA. Vorbemerkung\n1. Zu prüfen ist, ob § 1922 BGB, § 242 StGB, § 343 HGB und § 91 ZPO "
+    "greifen. Art. 21 EuErbVO und Artikel 3 GG sind zu beachten. Fraglich ist, ob der BGH dies so sieht. "
+    "ACHTUNG: Im Ergebnis lässt sich festhalten, dass zusammenfassend ist festzuhalten gilt.",
+    # Umlaute, Großschreibung und Mehrfachtreffer innerhalb eines Wortes
+    "VERHÄLTNISMÄSSIGKEIT und Verhältnismäßigkeit; Schadenersatzanspruchsgrundlage, Gesetzgebungsmaterialien.",
+    # Keine Schlüsselwörter
+    "Lorem ipsum dolor sit amet.",
+    # Leere Eingaben
+    "",
+    "   \n\n  ",
+)
+
+class SemanticEmbeddingEquivalenceTest(unittest.TestCase):
+
+    def assert_same_vector(self, text):
+        expected = reference_get_semantic_embeddings(text)
+        actual = get_semantic_embeddings(text)
+        self.assertEqual(dict(actual), dict(expected), msg=repr(text[:60]))
+
+    def test_fixed_paragraphs(self):
+        for text in PARAGRAPHS:
+            with self.subTest(text=text[:40]):
+                self.assert_same_vector(text)
+
+    def test_compounds(self):
+        vector = get_semantic_embeddings("Die Rechtsfrage bleibt offen.")
+        self.assertIn('frage', vector)
+        self.assert_same_vector("Die Rechtsfrage bleibt offen.")
+
+    def test_erst_recht_schluss(self):
+        text = "Weiter greift ein erst-recht-schluss."
+        self.assertGreater(get_semantic_embeddings(text)['erst-recht-schluss'], 0)
+        self.assert_same_vector(text)
+
+    def test_first_paragraph_boost(self):
+        boosted = get_semantic_embeddings("Sachverhalt\n\nWeiterer Text.")
+        plain = get_semantic_embeddings("Weiterer Text.\n\nSachverhalt")
+        self.assertEqual(boosted['sachverhalt'], plain['sachverhalt'] * 1.5)
+        self.assert_same_vector("Sachverhalt\n\nWeiterer Text.")
+        self.assert_same_vector("Weiterer Text.\n\nSachverhalt")
+
+    def test_combined_paragraphs(self):
+        self.assert_same_vector("\n\n".join(PARAGRAPHS))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,304 @@
+"""
+Austauschbare Token-Zähler für die Vorbereitung von Trainingsdaten.
+
+Die Token-Limits (-t) von segment_and_prepare_training_data.py und dataset_splitter.py werden
+über einen TokenCounter ausgewertet. Zur Auswahl stehen:
+
+- chars:      Zeichenanzahl (bisherige Näherung in segment_and_prepare_training_data.py)
+- words:      Wortanzahl * 0.75 (bisherige Näherung in dataset_splitter.py)
+- calibrated: Zeichenanzahl geteilt durch ein Zeichen-pro-Token-Verhältnis; das Verhältnis wird
+              entweder vorgegeben oder an den ersten Texten gegen einen BPE-Tokenizer kalibriert
+- bpe:        Echte Tokenisierung mit einer lokal vorliegenden BPE-Vokabeldatei
+              (*.tiktoken über tiktoken, tokenizer.json über tokenizers), ohne Netzwerkzugriff
+
+Der BPE-Zähler arbeitet stapelweise und merkt sich die Ergebnisse in einem LRU-Cache, dessen
+Schlüssel ein Hash des Textes ist. Wiederkehrende Texte wie System-Prompts und Rollen werden so nur
+einmal tokenisiert.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+# Optionale BPE-Backends
+try:
+    import tiktoken
+    from tiktoken.load import load_tiktoken_bpe
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+TOKEN_COUNTER_CHOICES = ('chars', 'words', 'calibrated', 'bpe')
+
+# Anzahl der im LRU-Cache gehaltenen Token-Zählungen
+DEFAULT_CACHE_SIZE = 100_000
+
+# Startwert für den kalibrierten Zähler, falls weder Verhältnis noch Referenz-Tokenizer angegeben sind
+# (deutschsprachige juristische Texte liegen bei gängigen BPE-Vokabularen etwa in dieser Größenordnung)
+DEFAULT_CHARS_PER_TOKEN = 3.5
+
+# Zeichenmenge, an der der kalibrierte Zähler das Verhältnis gegen den Referenz-Tokenizer bestimmt
+DEFAULT_CALIBRATION_CHARS = 200_000
+
+# Aufschlag pro Chat-Nachricht und pro Beispiel für die Formatierungstokens des Chat-Formats
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_EXAMPLE = 3
+
+# Vorsegmentierung von cl100k_base; wird für *.tiktoken-Dateien verwendet, sofern kein anderes Muster angegeben ist
+CL100K_PATTERN = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]++[\r\n]*|\s*[\r\n]|\s+(?!\S)|\s+"""
+
+class TokenCounter:
+    """
+    Basisklasse aller Token-Zähler.
+
+    Unterklassen implementieren _count_texts(texts) und liefern für eine Liste von Texten die
+    jeweilige Tokenanzahl.
+    """
+
+    name = 'base'
+    unit = 'Tokens'
+
+    def _count_texts(self, texts):
+        raise NotImplementedError
+
+    def count(self, text):
+        """Zählt die Tokens eines einzelnen Textes."""
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts):
+        """Zählt die Tokens mehrerer Texte und gibt eine Liste in derselben Reihenfolge zurück."""
+        return self._count_texts(list(texts))
+
+    def count_examples(self, examples):
+        """
+        Zählt die Tokens mehrerer Chat-Trainingsbeispiele in einem Stapel.
+
+        Args:
+            examples: Liste von (messages, serialisierte_zeile)-Paaren, wobei messages die Liste der
+                      Nachrichten mit 'role' und 'content' ist
+
+        Returns:
+            Liste der Tokenanzahl pro Beispiel (Rollen und Inhalte zuzüglich Formatierungstokens)
+        """
+        texts = []
+        for messages, _ in examples:
+            for message in messages:
+                texts.append(message.get('role', ''))
+                texts.append(message.get('content', ''))
+        counts = iter(self.count_batch(texts))
+        totals = []
+        for messages, _ in examples:
+            total = TOKENS_PER_EXAMPLE
+            for _ in messages:
+                total += TOKENS_PER_MESSAGE + next(counts) + next(counts)
+            totals.append(total)
+        return totals
+
+    def describe(self):
+        """Kurzbeschreibung für die Parameterausgabe."""
+        return self.name
+
+class CharTokenCounter(TokenCounter):
+    """
+    Zählt Zeichen statt Tokens.
+
+    Für Trainingsbeispiele wird wie bisher die Länge der serialisierten JSON-Zeile verwendet.
+    """
+
+    name = 'chars'
+    unit = 'Zeichen'
+
+    def _count_texts(self, texts):
+        return [len(text) for text in texts]
+
+    def count_examples(self, examples):
+        return [len(line) for _, line in examples]
+
+    def describe(self):
+        return "Zeichenanzahl (Proxy für Tokens)"
+
+class WordTokenCounter(TokenCounter):
+    """Grobe Schätzung über die Wortanzahl (~0.75 Tokens pro Wort)."""
+
+    name = 'words'
+
+    def _count_texts(self, texts):
+        return [int(len(text.split()) * 0.75) for text in texts]
+
+    def describe(self):
+        return "Wortanzahl * 0.75 (Schätzung)"
+
+class CachedTokenCounter(TokenCounter):
+    """
+    Token-Zähler mit LRU-Cache.
+
+    Schlüssel ist ein BLAKE2b-Hash des Textes, sodass der Cache nicht die Texte selbst hält. Nur
+    Texte, die noch nicht im Cache liegen, werden gesammelt an _count_texts übergeben.
+    """
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _text_key(text):
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def count_batch(self, texts):
+        texts = list(texts)
+        if self.cache_size <= 0:
+            return self._count_texts(texts)
+
+        cache = self._cache
+        results = [0] * len(texts)
+        missing = {}  # Schlüssel -> (Text, Indizes)
+        for index, text in enumerate(texts):
+            key = self._text_key(text)
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                results[index] = cached
+                self.cache_hits += 1
+            elif key in missing:
+                missing[key][1].append(index)
+                self.cache_hits += 1
+            else:
+                missing[key] = (text, [index])
+                self.cache_misses += 1
+
+        if missing:
+            entries = list(missing.items())
+            counts = self._count_texts([text for _, (text, _) in entries])
+            for (key, (_, indices)), count in zip(entries, counts):
+                cache[key] = count
+                for index in indices:
+                    results[index] = count
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return results
+
+class BpeTokenCounter(CachedTokenCounter):
+    """
+    Zählt echte BPE-Tokens anhand einer lokalen Vokabeldatei.
+
+    Unterstützt werden tiktoken-Rangdateien (*.tiktoken, z.B. cl100k_base.tiktoken) und
+    Hugging-Face-Tokenizer (tokenizer.json). Beide Backends tokenisieren Stapel parallel in
+    nativem Code.
+    """
+
+    name = 'bpe'
+
+    def __init__(self, vocab_path, cache_size=DEFAULT_CACHE_SIZE, pattern=CL100K_PATTERN, num_threads=None):
+        super().__init__(cache_size)
+        if not os.path.isfile(vocab_path):
+            raise FileNotFoundError(f"BPE-Vokabeldatei '{vocab_path}' nicht gefunden")
+        self.vocab_path = vocab_path
+        self.num_threads = num_threads or os.cpu_count() or 1
+
+        if vocab_path.lower().endswith('.json'):
+            if not TOKENIZERS_AVAILABLE:
+                raise ImportError("Für tokenizer.json-Dateien wird das Paket 'tokenizers' benötigt (pip install tokenizers)")
+            self._tokenizer = Tokenizer.from_file(vocab_path)
+            self._encoding = None
+        else:
+            if not TIKTOKEN_AVAILABLE:
+                raise ImportError("Für *.tiktoken-Dateien wird das Paket 'tiktoken' benötigt (pip install tiktoken)")
+            self._tokenizer = None
+            self._encoding = tiktoken.Encoding(
+                name=os.path.splitext(os.path.basename(vocab_path))[0],
+                pat_str=pattern,
+                mergeable_ranks=load_tiktoken_bpe(vocab_path),
+                special_tokens={},
+            )
+
+    def _count_texts(self, texts):
+        if not texts:
+            return []
+        if self._encoding is not None:
+            return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(texts, num_threads=self.num_threads)]
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+    def describe(self):
+        return f"BPE ({os.path.basename(self.vocab_path)})"
+
+class CalibratedTokenCounter(TokenCounter):
+    """
+    Schätzt Tokens über ein Zeichen-pro-Token-Verhältnis.
+
+    Ist kein Verhältnis vorgegeben, aber ein Referenz-Zähler (z.B. BpeTokenCounter), werden die
+    ersten calibration_chars Zeichen exakt mit der Referenz gezählt. Daraus wird das Verhältnis
+    bestimmt und alle weiteren Texte werden nur noch geschätzt. Ohne beides gilt
+    DEFAULT_CHARS_PER_TOKEN.
+    """
+
+    name = 'calibrated'
+
+    def __init__(self, chars_per_token=None, reference=None, calibration_chars=DEFAULT_CALIBRATION_CHARS):
+        if chars_per_token is not None and chars_per_token <= 0:
+            raise ValueError("chars_per_token muss größer als 0 sein")
+        if chars_per_token is None and reference is None:
+            chars_per_token = DEFAULT_CHARS_PER_TOKEN
+        self.chars_per_token = chars_per_token
+        self.reference = reference
+        self.calibration_chars = calibration_chars
+        self._sample_chars = 0
+        self._sample_tokens = 0
+
+    def _count_texts(self, texts):
+        if self.chars_per_token is None:
+            # Kalibrierungsphase: exakt zählen und das Verhältnis mitführen
+            counts = self.reference.count_batch(texts)
+            self._sample_chars += sum(len(text) for text in texts)
+            self._sample_tokens += sum(counts)
+            if self._sample_chars >= self.calibration_chars and self._sample_tokens > 0:
+                self.chars_per_token = self._sample_chars / self._sample_tokens
+            return counts
+        return [round(len(text) / self.chars_per_token) for text in texts]
+
+    def describe(self):
+        if self.chars_per_token is None:
+            return f"kalibriert gegen {self.reference.describe()} (Kalibrierung läuft)"
+        if self.reference is not None:
+            return f"kalibriert gegen {self.reference.describe()} ({self.chars_per_token:.2f} Zeichen pro Token)"
+        return f"kalibriert ({self.chars_per_token:.2f} Zeichen pro Token)"
+
+def create_token_counter(kind, vocab_path=None, chars_per_token=None, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Erzeugt einen Token-Zähler.
+
+    Args:
+        kind: Einer der Werte aus TOKEN_COUNTER_CHOICES
+        vocab_path: Pfad zur BPE-Vokabeldatei (erforderlich für 'bpe', optional für 'calibrated')
+        chars_per_token: Festes Verhältnis für 'calibrated'
+        cache_size: Größe des LRU-Caches für 'bpe'
+
+    Returns:
+        Eine TokenCounter-Instanz
+
+    Raises:
+        ValueError: Unbekannter Zählertyp oder fehlende Vokabeldatei für 'bpe'
+        FileNotFoundError: Die Vokabeldatei existiert nicht
+        ImportError: Das für die Vokabeldatei benötigte Backend ist nicht installiert
+    """
+    if kind == 'chars':
+        return CharTokenCounter()
+    if kind == 'words':
+        return WordTokenCounter()
+    if kind == 'bpe':
+        if not vocab_path:
+            raise ValueError("Für den Token-Zähler 'bpe' muss eine Vokabeldatei angegeben werden (--vocab)")
+        return BpeTokenCounter(vocab_path, cache_size=cache_size)
+    if kind == 'calibrated':
+        reference = None
+        if chars_per_token is None and vocab_path:
+            reference = BpeTokenCounter(vocab_path, cache_size=cache_size)
+        return CalibratedTokenCounter(chars_per_token=chars_per_token, reference=reference)
+    raise ValueError(f"Unbekannter Token-Zähler '{kind}' (erlaubt: {', '.join(TOKEN_COUNTER_CHOICES)})")
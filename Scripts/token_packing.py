@@ -0,0 +1,169 @@
+"""
+Auswahl von Trainingsbeispielen, die ein Token-Budget möglichst vollständig ausschöpfen.
+
+Die Funktionen arbeiten nur auf den Tokenanzahlen (Gewichten) der Elemente, nicht auf den Texten,
+und geben die Indizes der ausgewählten Elemente aufsteigend sortiert zurück. So kann die Ausgabe
+in Eingabereihenfolge sequentiell aus einer Auslagerungsdatei kopiert werden.
+
+- greedy:   Elemente absteigend nach Größe, jedes wird genommen, solange es noch passt
+            (First-Fit-Decreasing; bei Wert = Tokenanzahl ist das die Auswahl nach Dichte)
+- knapsack: Teilsummen-Optimierung (0/1-Rucksack mit Wert = Gewicht) über auf höchstens
+            KNAPSACK_RESOLUTION Stufen skalierte Gewichte, der Rest wird greedy aufgefüllt;
+            verwendet wird die bessere der beiden Auswahlen
+- priority: Elemente in der Reihenfolge der Prioritäten (Standard: Eingabereihenfolge), jedes wird
+            genommen, solange es noch passt, nicht passende werden übersprungen. Anders als bei
+            greedy und knapsack hängt die Auswahl nicht von der Größe der Elemente ab, bei
+            zufälligen Prioritäten ist sie eine unverzerrte Stichprobe
+"""
+
+from collections import defaultdict
+
+PACKING_METHODS = ('greedy', 'knapsack', 'priority')
+
+# Maximale Anzahl der Kapazitätsstufen der Rucksack-Optimierung. Die Gewichte werden aufgerundet
+# skaliert, sodass die Auswahl das Budget nie überschreitet; die Rundung kostet höchstens
+# eine Stufe pro ausgewähltem Element.
+KNAPSACK_RESOLUTION = 20_000
+
+def _fill_in_order(weights, ordered, budget):
+    """Nimmt aus ordered der Reihe nach jedes Element, das noch ins Budget passt."""
+    selected = []
+    used = 0
+    for index in ordered:
+        weight = weights[index]
+        if used + weight <= budget:
+            selected.append(index)
+            used += weight
+    return selected, used
+
+def _fill_greedy(weights, candidates, budget, priorities=None):
+    """Nimmt aus candidates (absteigend nach Gewicht) jedes Element, das noch ins Budget passt."""
+    if priorities is None:
+        ordered = sorted(candidates, key=lambda i: weights[i], reverse=True)
+    else:
+        ordered = sorted(candidates, key=lambda i: (-weights[i], priorities[i]))
+    return _fill_in_order(weights, ordered, budget)
+
+def _subset_sum(weights, candidates, budget, resolution):
+    """
+    Bestimmt eine Teilmenge von candidates, deren skalierte Gewichtssumme der skalierten Kapazität
+    möglichst nahe kommt.
+
+    Die erreichbaren Summen werden als Bitmenge in einer Python-Ganzzahl geführt. Für jede Summe wird
+    nur das Element gespeichert, mit dem sie zuerst erreicht wurde; die Auswahl wird daraus rückwärts
+    rekonstruiert, da die Restsumme zu diesem Zeitpunkt bereits mit früheren Elementen erreichbar war.
+    """
+    granularity = max(1, -(-budget // resolution))
+    capacity = budget // granularity
+    if capacity <= 0:
+        return []
+    scaled = {index: -(-weights[index] // granularity) for index in candidates}
+    mask = (1 << (capacity + 1)) - 1
+    reachable = 1
+    first_item = [-1] * (capacity + 1)
+
+    for index in candidates:
+        weight = scaled[index]
+        if weight > capacity:
+            continue
+        new_sums = ((reachable << weight) & mask) & ~reachable
+        if not new_sums:
+            continue
+        reachable |= new_sums
+        bits = bin(new_sums)[:1:-1]  # niedrigstes Bit zuerst
+        position = bits.find('1')
+        while position != -1:
+            first_item[position] = index
+            position = bits.find('1', position + 1)
+        if reachable >> capacity:
+            break  # Kapazität exakt erreicht
+
+    best_sum = reachable.bit_length() - 1
+    selected = []
+    while best_sum > 0:
+        index = first_item[best_sum]
+        selected.append(index)
+        best_sum -= scaled[index]
+    return selected
+
+def pack_items(weights, budget, method='greedy', candidates=None, resolution=KNAPSACK_RESOLUTION, priorities=None):
+    """
+    Wählt Elemente aus, deren Gesamtgewicht das Budget möglichst vollständig ausschöpft.
+
+    Args:
+        weights: Gewicht (Tokenanzahl) je Element
+        budget: Maximales Gesamtgewicht
+        method: 'greedy', 'knapsack' oder 'priority'
+        candidates: Optional die zu berücksichtigenden Indizes (Standard: alle)
+        resolution: Anzahl der Kapazitätsstufen für 'knapsack'
+        priorities: Optional Rangfolge je Element (kleinere zuerst; Standard: Index); bei 'priority'
+                    die Reihenfolge der Auswahl, sonst nur bei gleichem Gewicht entscheidend
+
+    Returns:
+        Aufsteigend sortierte Liste der ausgewählten Indizes
+    """
+    if method not in PACKING_METHODS:
+        raise ValueError(f"Unbekannte Packing-Methode '{method}' (erlaubt: {', '.join(PACKING_METHODS)})")
+    if candidates is None:
+        candidates = range(len(weights))
+    candidates = [index for index in candidates if weights[index] <= budget]
+    if budget <= 0 or not candidates:
+        return []
+
+    if method == 'priority':
+        if priorities is not None:
+            candidates.sort(key=lambda i: priorities[i])
+        return sorted(_fill_in_order(weights, candidates, budget)[0])
+
+    selected, used = _fill_greedy(weights, candidates, budget, priorities)
+    if method == 'knapsack' and used < budget and len(selected) < len(candidates):
+        # Die Skalierung kann bei vielen kleinen Elementen schlechter abschneiden als greedy;
+        # es wird die bessere der beiden Auswahlen verwendet
+        knapsack_selected = _subset_sum(weights, candidates, budget, resolution)
+        knapsack_used = sum(weights[index] for index in knapsack_selected)
+        chosen = set(knapsack_selected)
+        rest, rest_used = _fill_greedy(weights, [index for index in candidates if index not in chosen],
+                                       budget - knapsack_used, priorities)
+        if knapsack_used + rest_used > used:
+            selected = knapsack_selected + rest
+    return sorted(selected)
+
+def pack_items_stratified(weights, strata, budget, method='greedy', resolution=KNAPSACK_RESOLUTION, priorities=None):
+    """
+    Wie pack_items, verteilt das Budget aber anteilig auf Schichten (z.B. Rechtsbezüge).
+
+    Jede Schicht erhält den Anteil des Budgets, der ihrem Anteil am Gesamtgewicht entspricht, und wird
+    für sich gepackt. Nicht ausgeschöpftes Budget wird anschließend mit den übrigen Elementen aller
+    Schichten aufgefüllt.
+
+    Args:
+        weights: Gewicht (Tokenanzahl) je Element
+        strata: Schichtzugehörigkeit je Element (beliebige hashbare Werte)
+        budget: Maximales Gesamtgewicht
+        method: 'greedy', 'knapsack' oder 'priority'
+        resolution: Anzahl der Kapazitätsstufen für 'knapsack'
+        priorities: Optional Rangfolge je Element (siehe pack_items)
+
+    Returns:
+        Aufsteigend sortierte Liste der ausgewählten Indizes
+    """
+    members = defaultdict(list)
+    for index, stratum in enumerate(strata):
+        members[stratum].append(index)
+    total_weight = sum(weights)
+    if total_weight <= budget:
+        return list(range(len(weights)))
+
+    selected = []
+    used = 0
+    for stratum, indices in members.items():
+        stratum_weight = sum(weights[index] for index in indices)
+        stratum_budget = budget * stratum_weight // total_weight
+        stratum_selected = pack_items(weights, stratum_budget, method, indices, resolution, priorities)
+        selected.extend(stratum_selected)
+        used += sum(weights[index] for index in stratum_selected)
+
+    chosen = set(selected)
+    remaining = [index for index in range(len(weights)) if index not in chosen]
+    selected.extend(pack_items(weights, budget - used, method, remaining, resolution, priorities))
+    return sorted(selected)